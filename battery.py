@@ -0,0 +1,105 @@
+import numpy as np
+
+SCAN_BLOCK = 64  # Steps BatteryBank.run() scans together before chaining the blocks
+
+
+class BatteryBank:
+    """Battery bank whose per-unit state lives in NumPy arrays and advances with an explicit dt.
+
+    energy and capacity are in Wh, powers in W. C-rate limits cap the charge/discharge power of a
+    unit at c_rate * capacity; None means no limit. The whole bank updates in one vectorized step.
+    """
+
+    def __init__(self, count=5, capacity=100.0, charge_efficiency=0.95, discharge_efficiency=0.95,
+                 max_charge_c_rate=None, max_discharge_c_rate=None, initial_soc=0.0):
+        self.capacity = np.full(count, capacity, dtype=float)
+        self.energy = self.capacity * initial_soc
+        self.charge_efficiency = np.full(count, charge_efficiency, dtype=float)
+        self.discharge_efficiency = np.full(count, discharge_efficiency, dtype=float)
+        self.max_charge_c_rate = np.full(count, np.inf if max_charge_c_rate is None else max_charge_c_rate)
+        self.max_discharge_c_rate = np.full(count, np.inf if max_discharge_c_rate is None else max_discharge_c_rate)
+
+        # Scratch buffers so step() doesn't allocate
+        self._charge = np.empty(count)
+        self._discharge = np.empty(count)
+        self._limit = np.empty(count)
+
+    @property
+    def count(self):
+        return len(self.capacity)
+
+    def state_of_charge(self):
+        return self.energy / self.capacity
+
+    def average_soc(self):
+        return float(self.energy.sum() / self.capacity.sum()) if self.count else 0.0
+
+    def step(self, charge_power, discharge_power, dt):
+        # charge_power / discharge_power: W per unit (scalars or arrays broadcasting to count), dt in seconds
+        hours = dt / 3600.0
+
+        # Apply the C-rate limits
+        np.multiply(self.max_charge_c_rate, self.capacity, out=self._limit)
+        np.minimum(charge_power, self._limit, out=self._charge)
+        np.multiply(self.max_discharge_c_rate, self.capacity, out=self._limit)
+        np.minimum(discharge_power, self._limit, out=self._discharge)
+
+        # Stored energy gains charge * eff and loses discharge / eff
+        self._charge *= self.charge_efficiency
+        self._discharge /= self.discharge_efficiency
+        self._charge -= self._discharge
+        self._charge *= hours
+        self.energy += self._charge
+        np.clip(self.energy, 0.0, self.capacity, out=self.energy)
+
+    def run(self, charge_powers, discharge_powers, dt):
+        """Advances one step() per row of charge_powers / discharge_powers ((steps, count) W) at once.
+
+        Returns the stored energy after every step, (steps, count) Wh. A step's energy change does
+        not depend on the stored energy, only the clip to 0..capacity does, so every step maps
+        energy x to clip(x + delta, 0, capacity). Those maps compose into maps of the same form,
+        clip(x + shift, low, high), so scans find every prefix in a few array passes instead of one
+        step() per row: one within each block of SCAN_BLOCK steps, one over the blocks.
+        """
+        charge = np.minimum(charge_powers, self.max_charge_c_rate * self.capacity) * self.charge_efficiency
+        discharge = np.minimum(discharge_powers, self.max_discharge_c_rate * self.capacity) / self.discharge_efficiency
+        steps = len(charge)
+        if steps == 0:
+            return np.empty((0, self.count))
+
+        # Whole blocks, the last one padded with maps that change nothing
+        blocks = -(-steps // SCAN_BLOCK)
+        shift = np.zeros((blocks * SCAN_BLOCK, self.count))
+        np.multiply(charge - discharge, dt / 3600.0, out=shift[:steps])
+        low = np.full(shift.shape, -np.inf)
+        low[:steps] = 0.0
+        high = np.full(shift.shape, np.inf)
+        high[:steps] = self.capacity
+
+        # Prefixes within each block (the step within the block as first axis), then over the blocks
+        in_block = [a.reshape(blocks, SCAN_BLOCK, self.count).swapaxes(0, 1) for a in (shift, low, high)]
+        _scan_clip_shift(*in_block)
+        block_shift, block_low, block_high = (a[-1].copy() for a in in_block)
+        _scan_clip_shift(block_shift, block_low, block_high)
+
+        # Energy entering each block, then after every step
+        start = np.empty((blocks, self.count))
+        start[0] = self.energy
+        start[1:] = np.clip(self.energy + block_shift[:-1], block_low[:-1], block_high[:-1])
+        shift, low, high = in_block
+        energy = np.clip(start + shift, low, high).swapaxes(0, 1).reshape(-1, self.count)[:steps]
+        self.energy = energy[-1].copy()
+        return energy
+
+
+def _scan_clip_shift(shift, low, high):
+    # In place along the first axis: row i becomes the clip(x + shift, low, high) map of rows 0..i applied in turn
+    width = 1
+    while width < len(shift):
+        # Prefix i becomes prefix i - width followed by the maps already folded into i
+        later_shift, later_low, later_high = shift[width:], low[width:], high[width:]
+        shifted_low = np.clip(low[:-width] + later_shift, later_low, later_high)
+        shifted_high = np.clip(high[:-width] + later_shift, later_low, later_high)
+        shift[width:] = shift[:-width] + later_shift
+        low[width:], high[width:] = shifted_low, shifted_high
+        width *= 2
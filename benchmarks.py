@@ -0,0 +1,383 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from engine import FRAME_TIME, SimulationEngine
+from irradiance import clear_sky_irradiance, poa_irradiance
+from solar import (compute_solar_efficiencies, compute_solar_efficiency, compute_sun_positions, get_panel_normal,
+                   get_sun_direction)
+from tracker import SunTracker
+
+SEED = 0
+BATCH_SIZE = 10000  # Samples per call for the batched kernels
+SCALED_COUNT = 5000  # Batteries / panels in the scaled draw passes
+DEFAULT_THRESHOLD = 20.0  # Slowdown (%) against the baseline that counts as a regression
+
+# name -> (group, setup); setup() returns the zero-argument callable to time
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a setup that cannot run here (e.g. no display); the benchmark is left out of the results."""
+
+
+def benchmark(name, group="kernels"):
+    def register(setup):
+        BENCHMARKS[name] = (group, setup)
+        return setup
+    return register
+
+
+def measure(fn, min_time=0.5, rounds=7):
+    """Per-call time of fn in seconds: (median, min) over rounds of enough calls to last min_time / rounds."""
+    fn()  # Warm up caches, display lists and lazy imports
+
+    # Calibrate the calls per round so timer resolution does not matter
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / rounds / 4:
+            break
+        number *= 4
+    number = max(1, int(number * (min_time / rounds) / elapsed))
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return statistics.median(timings), min(timings), number
+
+
+# --- Physics kernels ---
+
+@benchmark("solar.compute_solar_efficiency")
+def bench_solar_efficiency():
+    engine = SimulationEngine(seed=SEED)
+    normal = get_panel_normal(30, 10)
+    return lambda: compute_solar_efficiency(normal, engine.sun_dir)
+
+
+@benchmark("solar.get_sun_direction")
+def bench_sun_direction():
+    return lambda: get_sun_direction(35.0, 20.0)
+
+
+@benchmark("solar.get_panel_normal")
+def bench_panel_normal():
+    return lambda: get_panel_normal(30.0, 10.0)
+
+
+@benchmark("solar.single_step")
+def bench_solar_single_step():
+    # The solar geometry of one engine step: sun direction, panel normal and their cosine
+    def run():
+        sun = get_sun_direction(35.0, 20.0)
+        return compute_solar_efficiency(get_panel_normal(30.0, 10.0), sun)
+    return run
+
+
+@benchmark(f"solar.compute_solar_efficiencies[{BATCH_SIZE}]")
+def bench_solar_efficiencies():
+    rng = np.random.default_rng(SEED)
+    normals = rng.normal(size=(BATCH_SIZE, 3))
+    directions = rng.normal(size=(BATCH_SIZE, 3))
+    return lambda: compute_solar_efficiencies(normals, directions)
+
+
+@benchmark(f"solar.compute_sun_positions[{BATCH_SIZE}]")
+def bench_sun_positions():
+    times = np.linspace(0, 24, BATCH_SIZE)
+    return lambda: compute_sun_positions(40.0, 10.0, times)
+
+
+@benchmark(f"irradiance.clear_sky_irradiance[{BATCH_SIZE}]")
+def bench_clear_sky():
+    altitudes = np.linspace(-10, 90, BATCH_SIZE)
+    return lambda: clear_sky_irradiance(altitudes, 172)
+
+
+@benchmark(f"irradiance.poa_irradiance[{BATCH_SIZE}]")
+def bench_poa():
+    times = np.linspace(0, 24, BATCH_SIZE)
+    altitudes, azimuths = compute_sun_positions(40.0, 10.0, times)
+    return lambda: poa_irradiance(30.0, 0.0, altitudes, azimuths, 172)
+
+
+@benchmark("engine.update_batteries")
+def bench_update_batteries():
+    # The per-frame battery update that used to run inside display()
+    engine = SimulationEngine(seed=SEED)
+    engine.step()
+    return lambda: engine._update_batteries(FRAME_TIME)
+
+
+@benchmark("engine.step")
+def bench_engine_step():
+    engine = SimulationEngine(seed=SEED)
+    return engine.step
+
+
+@benchmark(f"engine.run_batch[{BATCH_SIZE}]")
+def bench_engine_run_batch():
+    # Headless batched stepping with a running clock and a slew-limited tracker
+    engine = SimulationEngine(seed=SEED)
+    engine.clock_start = np.datetime64("2025-06-21T05:00")
+    engine.tracker = SunTracker("dual", slew_rate=0.05)
+    return lambda: engine.run_batch(BATCH_SIZE, 1.0)
+
+
+# --- Startup, each in a fresh interpreter ---
+
+def _startup(code):
+    command = [sys.executable, "-c", code]
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return lambda: subprocess.run(command, cwd=directory, check=True)
+
+
+@benchmark("startup.headless", "startup")
+def bench_startup_headless():
+    # What engine.py and batch jobs pay before the first step
+    return _startup("import engine; engine.SimulationEngine()")
+
+
+@benchmark("startup.control_panel", "startup")
+def bench_startup_control_panel():
+    # controls.py up to its finished window, kept withdrawn; the engine follows once the window is drawn,
+    # the renderer on "Start Simulation"
+    probe = subprocess.run([sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"], capture_output=True)
+    if probe.returncode:
+        raise SkipBenchmark("no display")
+    return _startup("import controls; controls.root.withdraw(); controls.root.update_idletasks(); "
+                    "controls.root.destroy()")
+
+
+@benchmark("startup.renderer", "startup")
+def bench_startup_renderer():
+    # Loaded by "Start Simulation"; the control panel used to pay this before showing anything
+    return _startup("import simulation")
+
+
+# --- Draw passes, in an offscreen context ---
+
+_renderer = None
+
+
+def _draw_pass(draw):
+    global _renderer
+
+    if _renderer is None:
+        # Imported here so the kernel benchmarks run without any GL platform
+        try:
+            import offscreen
+            import simulation
+            from OpenGL.error import Error as GLError
+        except ImportError as error:
+            raise SkipBenchmark(f"no offscreen GL: {error}") from error
+        try:
+            _renderer = offscreen.OffscreenRenderer(640, 480)
+        except RuntimeError as error:
+            raise SkipBenchmark(f"no offscreen GL: {error}") from error
+        except GLError as error:
+            call = getattr(error.baseOperation, "__name__", "GL call")
+            raise SkipBenchmark(f"no offscreen GL: {call} failed") from error
+        simulation.engine = SimulationEngine(seed=SEED)
+        for _ in range(100):
+            simulation.engine.step()
+        simulation.render_scene()  # Leaves the camera transform and LOD view set up for the passes
+
+    from OpenGL.GL import glFinish
+
+    def run():
+        draw()
+        glFinish()  # Count the GL work, not just the command submission
+    return run
+
+
+def _simulation():
+    import simulation
+    return simulation
+
+
+@benchmark("draw.grasses", "draw")
+def bench_draw_grasses():
+    return _draw_pass(lambda: _simulation().draw_grasses())
+
+
+@benchmark("draw.grasses[cached]", "draw")
+def bench_draw_grasses_cached():
+    return _draw_pass(lambda: _simulation().geometry.draw("grasses", _simulation().draw_grasses))
+
+
+@benchmark("draw.sky_with_clouds", "draw")
+def bench_draw_sky():
+    return _draw_pass(lambda: _simulation().draw_sky_with_clouds())
+
+
+@benchmark("draw.sun", "draw")
+def bench_draw_sun():
+    return _draw_pass(lambda: _simulation().draw_sun())
+
+
+@benchmark("draw.battery_bank", "draw")
+def bench_draw_battery_bank():
+    return _draw_pass(lambda: _simulation().draw_battery_bank(_simulation().engine.battery_bank))
+
+
+@benchmark("draw.house", "draw")
+def bench_draw_house():
+    return _draw_pass(lambda: _simulation().draw_house())
+
+
+@benchmark("draw.cables_to_batteries", "draw")
+def bench_draw_cables():
+    return _draw_pass(lambda: _simulation().draw_cached_cables())
+
+
+@benchmark("draw.solar_panel", "draw")
+def bench_draw_solar_panel():
+    return _draw_pass(lambda: _simulation().draw_solar_panel())
+
+
+def _scaled_bank():
+    # SCALED_COUNT batteries at seeded charge levels
+    from battery import BatteryBank
+
+    bank = BatteryBank(SCALED_COUNT)
+    bank.energy[:] = bank.capacity * np.random.default_rng(SEED).random(SCALED_COUNT)
+    return bank
+
+
+@benchmark(f"draw.battery_bank[{SCALED_COUNT}]", "draw")
+def bench_draw_battery_bank_scaled():
+    bank = _scaled_bank()
+    return _draw_pass(lambda: _simulation().draw_battery_bank(bank))
+
+
+@benchmark(f"draw.cables_to_batteries[{SCALED_COUNT}]", "draw")
+def bench_draw_cables_scaled():
+    return _draw_pass(lambda: _simulation().draw_cached_cables(SCALED_COUNT))
+
+
+@benchmark(f"draw.panel_array[{SCALED_COUNT}]", "draw")
+def bench_draw_panel_array():
+    # A tracking plant: the panels turn a little every frame, so the batch is rebuilt each time
+    from plant import PVPlant
+
+    run = _draw_pass(lambda: (plant.set_orientation(next(tilts), 0.0), _simulation().draw_panel_array(plant)))
+    plant = PVPlant.grid(50, SCALED_COUNT // 50, origin=_simulation().PLANT_ORIGIN, tilt=20.0)
+    tilts = itertools.cycle(np.linspace(-45.0, 45.0, 91))
+    return run
+
+
+@benchmark("draw.render_scene", "draw")
+def bench_render_scene():
+    return _draw_pass(lambda: _simulation().render_scene())
+
+
+def run_benchmarks(names=None, min_time=0.5, rounds=7, include_draw=True):
+    results = {}
+    for name, (group, setup) in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        if group == "draw" and not include_draw:
+            continue
+        try:
+            fn = setup()
+        except SkipBenchmark as reason:
+            print(f"{name:<40} skipped ({reason})", file=sys.stderr)
+            continue
+        median, best, number = measure(fn, min_time, rounds)
+        results[name] = {"group": group, "median_us": median * 1e6, "min_us": best * 1e6,
+                         "calls_per_round": number, "rounds": rounds}
+        print(f"{name:<40} {median * 1e6:12.2f} us", file=sys.stderr)
+    return results
+
+
+def environment():
+    info = {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "processor": platform.processor(), "seed": SEED}
+    if _renderer is not None:
+        from OpenGL.GL import GL_RENDERER, glGetString
+        info["gl_renderer"] = glGetString(GL_RENDERER).decode()
+    return info
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, statistic="min_us"):
+    """Percentage change of each result against the baseline; returns (rows, regressions).
+
+    The fastest round is compared by default: it is the least affected by other load on the machine.
+    """
+    rows = []
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            rows.append((name, None, result[statistic], None))
+            continue
+        before = baseline[name][statistic]
+        delta = (result[statistic] - before) / before * 100
+        rows.append((name, before, result[statistic], delta))
+        if delta > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_comparison(rows, regressions):
+    print(f"{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'delta':>9}")
+    for name, before, after, delta in rows:
+        if before is None:
+            print(f"{name:<40} {'-':>12} {after:12.2f} {'new':>9}")
+        else:
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<40} {before:12.2f} {after:12.2f} {delta:+8.1f}%{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the physics kernels and draw passes against a baseline.")
+    parser.add_argument("names", nargs="*", help="Only run benchmarks whose name contains one of these")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline instead")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown in %% that fails the comparison")
+    parser.add_argument("--statistic", choices=("min_us", "median_us"), default="min_us",
+                        help="Per-call time compared against the baseline")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds spent timing each benchmark")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--no-draw", action="store_true", help="Skip the draw passes (no GL needed)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.names, args.min_time, args.rounds, not args.no_draw)
+    document = {"environment": environment(), "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        rows, regressions = compare(results, baseline, args.threshold, args.statistic)
+        print_comparison(rows, regressions)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:g}%")
+            sys.exit(1)
+    elif not args.output:
+        json.dump(document, sys.stdout, indent=2)
+        print()
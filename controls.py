@@ -1,8 +1,26 @@
+import argparse
+import os
+import subprocess
+import sys
 import threading
 import tkinter as tk
 from tkinter import ttk
 
-import simulation
+STATS_RATE_HZ = 10  # How often the simulation pushes stats to the panel
+RENDERER_POLL_MS = 250  # How often the panel checks whether the renderer process is still running
+RENDERER_STOP_TIMEOUT = 2.0  # Seconds the renderer process gets to close its window before it is killed
+
+parser = argparse.ArgumentParser(description="Tkinter control panel for the solar panel simulation.")
+parser.add_argument("--renderer-process", action="store_true",
+                    help="Run the OpenGL window in its own process, exchanging state through shared memory")
+# Imported (e.g. by benchmarks.py) the panel is built on the defaults and does not start its event loop
+args = parser.parse_args() if __name__ == "__main__" else parser.parse_args([])
+
+# The physics model the panel talks to. It is created once the window is on screen (connect_engine),
+# and the OpenGL renderer only loads when the simulation is started.
+engine = None
+exchange = None  # engine.exchange, or the shared-memory block of the renderer process
+renderer = None  # subprocess.Popen of the renderer process
 
 # -------------------------
 # Main Window Setup
@@ -98,13 +116,57 @@ control_frame.pack(pady=10)
 
 
 # --- Start Button ---
+def run_simulation():
+    import simulation  # PyOpenGL and the scene are imported here, on the first start, not at panel startup
+
+    simulation.engine = engine
+    simulation.sim_start()
+
+
 def start_simulation_thread():
-    sim_thread = threading.Thread(target=simulation.sim_start)
+    sim_thread = threading.Thread(target=run_simulation)
     sim_thread.daemon = True
     sim_thread.start()
 
 
-start_button = ttk.Button(control_frame, text="▶️ Start Simulation", command=start_simulation_thread)
+def start_renderer_process():
+    # The renderer gets its own interpreter (and GIL); the engine there runs on this panel's controls
+    global renderer
+    exchange.request_stop(False)
+    simulation_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulation.py")
+    renderer = subprocess.Popen([sys.executable, simulation_path, "--shared-state", exchange.name])
+    start_button.state(["disabled"])
+    root.after(RENDERER_POLL_MS, watch_renderer)
+
+
+def watch_renderer():
+    # Once the window is closed the simulation can be started again
+    if renderer.poll() is None:
+        root.after(RENDERER_POLL_MS, watch_renderer)
+    else:
+        start_button.state(["!disabled"])
+
+
+def stop_renderer():
+    if renderer is not None and renderer.poll() is None:
+        exchange.request_stop()
+        try:
+            renderer.wait(RENDERER_STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            renderer.kill()
+            renderer.wait()
+
+
+def on_close():
+    stop_renderer()
+    if args.renderer_process and exchange is not None:
+        exchange.close()
+    root.destroy()
+
+
+start_button = ttk.Button(control_frame, text="▶️ Start Simulation",
+                          command=start_renderer_process if args.renderer_process else start_simulation_thread,
+                          state="disabled")
 start_button.grid(row=0, column=0, columnspan=2, pady=10, padx=20)
 
 # -------------------------
@@ -112,25 +174,32 @@ start_button.grid(row=0, column=0, columnspan=2, pady=10, padx=20)
 # -------------------------
 stats_frame = ttk.LabelFrame(scrollable_frame, text="📊 Power Output Stats", padding=10)
 stats_labels = {}
+stats_texts = {}  # Text currently shown by each label
+
+
+def format_stats(snapshot):
+    return {
+        "Current Tilt": f"{float(snapshot.tilt_angle):.2f}°",
+        "Sun Altitude": f"{float(snapshot.sun_altitude):.2f}°",
+        "Sun Azimuth": f"{float(snapshot.sun_azimuth):.2f}°",
+        "Efficiency": f"{float(snapshot.efficiency * 100):.2f}%",
+        "Power Output": f"{float(snapshot.p_out):.2f} W",
+        "Incident Output": f"{float(snapshot.p_in):.2f} W",
+        "Instant Power Output": f"{float(snapshot.ipo):.2f}%"
+    }
+
+
+def build_stats(snapshot):
+    for key, value in format_stats(snapshot).items():
+        row = ttk.Frame(stats_frame)
+        row.pack(fill="x", pady=4)
+        label = ttk.Label(row, text=f"{key}: ", width=22, anchor="w")
+        label.pack(side="left")
+        value_label = ttk.Label(row, text=value, width=15, anchor="w")
+        value_label.pack(side="left")
+        stats_labels[key] = value_label
+        stats_texts[key] = value
 
-stats_data = {
-    "Current Tilt": f"{float(simulation.tilt_angle):.2f}°",
-    "Sun Altitude": f"{float(simulation.sun_altitude):.2f}°",
-    "Sun Azimuth": f"{float(simulation.sun_azimuth):.2f}°",
-    "Efficiency": f"{float(simulation.efficiency * 100):.2f}%",
-    "Power Output": f"{float(simulation.p_out):.2f} W",
-    "Incident Output": f"{float(simulation.p_in):.2f} W",
-    "Instant Power Output": f"{float(simulation.ipo):.2f}%"
-}
-
-for key, value in stats_data.items():
-    row = ttk.Frame(stats_frame)
-    row.pack(fill="x", pady=4)
-    label = ttk.Label(row, text=f"{key}: ", width=22, anchor="w")
-    label.pack(side="left")
-    value_label = ttk.Label(row, text=value, width=15, anchor="w")
-    value_label.pack(side="left")
-    stats_labels[key] = value_label
 
 stats_visible = False
 
@@ -138,30 +207,41 @@ stats_visible = False
 # -------------------------
 # Show Stats and Periodic Update
 # -------------------------
+def newest_snapshot():
+    # Only the newest sample matters; the renderer process's block always holds just that
+    if args.renderer_process:
+        return exchange.latest()
+    samples = engine.telemetry.drain()
+    return samples[-1] if samples else None
+
+
+def apply_telemetry():
+    # Only labels whose text changed are touched
+    snapshot = newest_snapshot()
+    if snapshot is not None:
+        for key, value in format_stats(snapshot).items():
+            if stats_texts[key] != value:
+                stats_texts[key] = value
+                stats_labels[key].config(text=value)
+
+    root.after(int(1000 / STATS_RATE_HZ), lambda: root.after_idle(apply_telemetry))
+
+
 def update_stats_periodically():
     global stats_visible
-    if not stats_visible:
-        stats_frame.pack(after=battery_frame, fill="x", padx=40)
-        stats_visible = True
-
-    updated_stats = {
-        "Current Tilt": f"{float(simulation.tilt_angle):.2f}°",
-        "Sun Altitude": f"{float(simulation.sun_altitude):.2f}°",
-        "Sun Azimuth": f"{float(simulation.sun_azimuth):.2f}°",
-        "Efficiency": f"{float(simulation.efficiency * 100):.2f}%",
-        "Power Output": f"{float(simulation.p_out):.2f} W",
-        "Incident Output": f"{float(simulation.p_in):.2f} W",
-        "Instant Power Output": f"{float(simulation.ipo):.2f}%"
-    }
+    if stats_visible:
+        return
 
-    for key, value in updated_stats.items():
-        stats_labels[key].config(text=value)
+    stats_frame.pack(after=battery_frame, fill="x", padx=40)
+    stats_visible = True
 
-    root.after(1000, update_stats_periodically)
+    engine.telemetry.set_rate(STATS_RATE_HZ)
+    root.after_idle(apply_telemetry)
 
 
 # --- Show Stats Button ---
-stats_button = ttk.Button(scrollable_frame, text="📈 Show Power Output", command=update_stats_periodically)
+stats_button = ttk.Button(scrollable_frame, text="📈 Show Power Output", command=update_stats_periodically,
+                          state="disabled")
 stats_button.pack(pady=10)
 
 # -------------------------
@@ -173,23 +253,21 @@ orientation_frame.pack(pady=10, fill="x", padx=40)
 
 # --- Tilt Angle Slider ---
 def on_tilt_change(val):
-    simulation.tilt_angle = float(val)
+    exchange.submit("tilt_angle", float(val))
 
 
 tilt_slider = tk.Scale(orientation_frame, from_=-90, to=90, orient="horizontal",
-                       label="Tilt Angle (°)", command=on_tilt_change, bg=frame_bg)
-tilt_slider.set(simulation.tilt_angle)
+                       label="Tilt Angle (°)", command=on_tilt_change, bg=frame_bg, state="disabled")
 tilt_slider.pack(fill="x", pady=5)
 
 
 # --- Azimuth Angle Slider ---
 def on_azimuth_change(val):
-    simulation.azimuth_angle = float(val)
+    exchange.submit("azimuth_angle", float(val))
 
 
 azimuth_slider = tk.Scale(orientation_frame, from_=-90, to=90, orient="horizontal",
-                          label="Azimuth (°)", command=on_azimuth_change, bg=frame_bg)
-azimuth_slider.set(simulation.azimuth_angle)
+                          label="Azimuth (°)", command=on_azimuth_change, bg=frame_bg, state="disabled")
 azimuth_slider.pack(fill="x", pady=5)
 
 # -------------------------
@@ -202,11 +280,11 @@ battery_charging = tk.BooleanVar(value=True)
 
 
 def toggle_battery():
-    simulation.battery_enabled = battery_charging.get()
+    exchange.submit("battery_enabled", battery_charging.get())
 
 
 battery_check = ttk.Checkbutton(battery_frame, text="Enable Battery Charging",
-                                variable=battery_charging, command=toggle_battery)
+                                variable=battery_charging, command=toggle_battery, state="disabled")
 battery_check.pack(anchor="w", pady=5)
 
 # -------------------------
@@ -218,7 +296,39 @@ footer_frame.pack(side="bottom", fill="x", pady=15)
 footer_label = ttk.Label(footer_frame, text="• 2025", font=("Segoe UI", 9, "italic"), anchor="center")
 footer_label.pack()
 
+
+# -------------------------
+# Physics
+# -------------------------
+def connect_engine():
+    # NumPy and the model load only after the window has been drawn, so it appears at once;
+    # the controls that need the engine stay disabled until then
+    global engine, exchange
+    root.update_idletasks()
+    from engine import SimulationEngine
+
+    engine = SimulationEngine()
+    exchange = engine.exchange
+    if args.renderer_process:
+        from state import SharedStateExchange
+
+        exchange = SharedStateExchange.create(engine.snapshot())
+
+    # The simulation publishes a complete snapshot after every step; the GUI only ever reads those
+    snapshot = exchange.latest()
+    build_stats(snapshot)
+    for widget in (start_button, stats_button, battery_check):
+        widget.state(["!disabled"])
+    for slider, value in ((tilt_slider, snapshot.tilt_angle), (azimuth_slider, snapshot.azimuth_angle)):
+        slider.config(state="normal")
+        slider.set(value)
+
+
 # -------------------------
 # Run the GUI
 # -------------------------
-root.mainloop()
+root.protocol("WM_DELETE_WINDOW", on_close)
+
+if __name__ == "__main__":
+    root.after_idle(connect_engine)
+    root.mainloop()
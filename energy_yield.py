@@ -0,0 +1,185 @@
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from ephemeris import Site, day_of_year, sun_positions
+from irradiance import ALBEDO, clear_sky_irradiance, plane_of_array
+from solar import (IRRADIANCE, PANEL_AREA, PANEL_EFFICIENCY, compute_angle_efficiencies, compute_sun_positions,
+                   get_sun_directions, solar_declination)
+from tracker import TRACKER_MODES, SunTracker
+from weather import WeatherData
+
+
+@dataclass
+class YieldResult:
+    """Time series and totals of an energy yield run, fixed or tracking."""
+    times: np.ndarray  # datetime64 start of each interval
+    sun_altitude: np.ndarray  # degrees
+    sun_azimuth: np.ndarray  # degrees
+    tilt: np.ndarray  # degrees, the fixed tilt or the tracker's per interval
+    azimuth: np.ndarray  # degrees
+    efficiency: np.ndarray  # cosine of the incidence angle, 0 at night
+    poa: np.ndarray  # W/m² on the panel plane
+    p_in: np.ndarray  # W
+    p_out: np.ndarray  # W
+    energy: np.ndarray  # Wh produced in each interval
+    total_energy: float  # Wh over the whole range
+
+
+@dataclass
+class WeatherYieldResult:
+    """Totals of a fixed or tracking run over measured weather, accumulated chunk by chunk."""
+    start: np.datetime64
+    end: np.datetime64
+    samples: int
+    total_energy: float  # Wh
+    peak_p_out: float  # W
+    total_poa: float  # Wh/m² on the panel plane
+
+
+def make_time_range(start, end, step_minutes):
+    # Interval start times from start (inclusive) to end (exclusive)
+    step = np.timedelta64(int(round(step_minutes * 60)), "s")
+    return np.arange(np.datetime64(start, "s"), np.datetime64(end, "s"), step)
+
+
+def sun_series(latitude, times, longitude=None, utc_offset=0.0):
+    # Sun altitude/azimuth for every timestamp. With a longitude the timestamps are local standard
+    # time of that site (UTC + utc_offset hours); without one they are taken as local solar time.
+    if longitude is not None:
+        return sun_positions(Site(latitude, longitude, utc_offset), times)
+    time_of_day = (times - times.astype("datetime64[D]")) / np.timedelta64(1, "h")
+    return compute_sun_positions(latitude, solar_declination(day_of_year(times)), time_of_day)
+
+
+def simulate_yield(latitude, start, end, step_minutes=60, tilt=0.0, azimuth=0.0,
+                   irradiance=IRRADIANCE, panel_area=PANEL_AREA, panel_efficiency=PANEL_EFFICIENCY,
+                   longitude=None, utc_offset=0.0, clear_sky=True, albedo=ALBEDO, tracker=None):
+    times = make_time_range(start, end, step_minutes)
+    sun_altitude, sun_azimuth = sun_series(latitude, times, longitude, utc_offset)
+
+    # A tracker.SunTracker turns the panel every interval, starting from tilt/azimuth
+    if tracker is not None:
+        tilt, azimuth = tracker.series(get_sun_directions(sun_altitude, sun_azimuth), step_minutes * 60, tilt, azimuth)
+
+    # Direct-beam efficiency, no generation while the sun is below the horizon
+    efficiency = compute_angle_efficiencies(tilt, azimuth, sun_altitude, sun_azimuth)
+    efficiency[sun_altitude <= 0] = 0.0
+
+    # Clear-sky beam + diffuse on the panel plane, or the fixed beam `irradiance` without clear_sky
+    if clear_sky:
+        dni, dhi, ghi = clear_sky_irradiance(sun_altitude, day_of_year(times))
+        poa = plane_of_array(efficiency, np.cos(np.radians(tilt)), dni, dhi, ghi, albedo).total
+    else:
+        poa = irradiance * efficiency
+
+    p_in = panel_area * poa
+    p_out = panel_efficiency * p_in
+    energy = p_out * (step_minutes / 60.0)
+
+    return YieldResult(times, sun_altitude, sun_azimuth, np.broadcast_to(tilt, times.shape),
+                       np.broadcast_to(azimuth, times.shape), efficiency, poa, p_in, p_out, energy, float(energy.sum()))
+
+
+def simulate_weather_yield(weather, tilt=0.0, azimuth=0.0, site=None, start=None, end=None,
+                           panel_area=PANEL_AREA, panel_efficiency=PANEL_EFFICIENCY, albedo=ALBEDO, tracker=None):
+    """Energy of a fixed or tracking panel under measured weather (weather.WeatherData), streamed in chunks.
+
+    Each sample's irradiance is held until the next timestamp; the last sample of the range uses
+    the spacing before it. Only one chunk of the memory-mapped columns is in use at a time.
+    A tracker.SunTracker starts from tilt/azimuth and may turn for as long as each sample lasts.
+    """
+    site = site or weather.site
+    if site is None:
+        raise ValueError("The weather file has no site, pass one (latitude, longitude, utc_offset)")
+
+    times = weather.times
+    samples = 0
+    total_energy = total_poa = peak = 0.0
+    first_time = last_time = None
+    for row, chunk in weather.chunks(start, end):
+        chunk_times = np.asarray(chunk["time"])
+
+        # Sample durations up to the following timestamp, which may be the first of the next chunk
+        following = row + len(chunk_times)
+        if following < len(times):
+            hours = np.diff(chunk_times, append=times[following]) / np.timedelta64(1, "h")
+        else:
+            # The file's last sample lasts the spacing before it, which is in the previous chunk for a single row
+            hours = np.diff(chunk_times, append=chunk_times[-1]) / np.timedelta64(1, "h")
+            if len(times) > 1:
+                hours[-1] = (times[-1] - times[-2]) / np.timedelta64(1, "h")
+
+        sun_altitude, sun_azimuth = sun_positions(site, chunk_times)
+        if tracker is not None:
+            # The motor state carries over from the previous chunk
+            tilts, azimuths = tracker.series(get_sun_directions(sun_altitude, sun_azimuth), hours * 3600,
+                                             tilt, azimuth)
+            tilt, azimuth = tilts[-1], azimuths[-1]
+        else:
+            tilts, azimuths = tilt, azimuth
+        efficiency = compute_angle_efficiencies(tilts, azimuths, sun_altitude, sun_azimuth)
+        poa = plane_of_array(efficiency, np.cos(np.radians(tilts)), np.nan_to_num(chunk["dni"]),
+                             np.nan_to_num(chunk["dhi"]), np.nan_to_num(chunk["ghi"]), albedo).total
+        p_out = panel_efficiency * panel_area * poa
+
+        total_energy += float(p_out @ hours)
+        total_poa += float(poa @ hours)
+        peak = max(peak, float(p_out.max()))
+        samples += len(chunk_times)
+        first_time = chunk_times[0] if first_time is None else first_time
+        last_time = chunk_times[-1]
+
+    return WeatherYieldResult(first_time, last_time, samples, total_energy, peak, total_poa)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Energy yield of a fixed or tracking panel over a date range.")
+    parser.add_argument("--latitude", type=float, default=40.0)
+    parser.add_argument("--longitude", type=float, default=None,
+                        help="Degrees east; timestamps are then local clock time instead of solar time")
+    parser.add_argument("--utc-offset", type=float, default=0.0, help="Hours of the local time zone")
+    parser.add_argument("--start", default=None, help="Default: 2025-01-01, or the start of the weather file")
+    parser.add_argument("--end", default=None, help="Default: 2026-01-01, or the end of the weather file")
+    parser.add_argument("--step", type=float, default=60, help="Time step in minutes")
+    parser.add_argument("--tilt", type=float, default=30.0)
+    parser.add_argument("--azimuth", type=float, default=0.0)
+    parser.add_argument("--fixed-irradiance", action="store_true",
+                        help="Constant 1000 W/m² beam instead of the clear-sky model")
+    parser.add_argument("--weather", default=None, help="CSV/TMY3 weather file to use instead of the clear sky")
+    parser.add_argument("--tracker", choices=TRACKER_MODES, default=None,
+                        help="Follow the sun, starting from --tilt/--azimuth")
+    parser.add_argument("--backtracking", action="store_true", help="Single-axis rows avoid shading each other")
+    parser.add_argument("--slew-rate", type=float, default=None, help="Tracker motor limit in degrees per second")
+    args = parser.parse_args()
+
+    tracker = None
+    if args.tracker:
+        tracker = SunTracker(args.tracker, backtracking=args.backtracking, slew_rate=args.slew_rate)
+
+    weather = WeatherData(args.weather) if args.weather else None
+    if weather is not None and weather.site is None and args.longitude is None:
+        parser.error(f"{args.weather} has no site (TMY3 header); pass --longitude, and --latitude/--utc-offset "
+                     "if they differ from the defaults")
+
+    started = time.perf_counter()
+    if weather is not None:
+        site = Site(args.latitude, args.longitude, args.utc_offset) if args.longitude is not None else None
+        result = simulate_weather_yield(weather, args.tilt, args.azimuth, site, args.start, args.end, tracker=tracker)
+        elapsed = time.perf_counter() - started
+
+        print(f"Samples: {result.samples} ({result.start} to {result.end}) in {elapsed * 1000:.1f} ms")
+        print(f"Irradiation: {result.total_poa / 1000:.1f} kWh/m² on the panel plane")
+        print(f"Total Energy: {result.total_energy / 1000:.1f} kWh")
+        print(f"Peak Output Power: {result.peak_p_out:.2f} W")
+    else:
+        result = simulate_yield(args.latitude, args.start or "2025-01-01", args.end or "2026-01-01", args.step,
+                                args.tilt, args.azimuth, longitude=args.longitude, utc_offset=args.utc_offset,
+                                clear_sky=not args.fixed_irradiance, tracker=tracker)
+        elapsed = time.perf_counter() - started
+
+        print(f"Samples: {len(result.times)} in {elapsed * 1000:.1f} ms")
+        print(f"Total Energy: {result.total_energy / 1000:.1f} kWh")
+        print(f"Peak Output Power: {result.p_out.max():.2f} W")
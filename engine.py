@@ -0,0 +1,471 @@
+import argparse
+import math
+import time
+
+import numpy as np
+
+from battery import BatteryBank
+from ephemeris import Site, day_of_year, sun_position_at, sun_positions_at
+from irradiance import ALBEDO, clear_sky_irradiance, plane_of_array
+from plant import PVPlant
+from recorder import Recorder
+from shading import SCENE_PANEL_SIZE, ShadingEngine, scene_occluders, unique_keys
+from solar import (IRRADIANCE, PANEL_AREA, PANEL_EFFICIENCY, compute_solar_efficiencies, compute_solar_efficiency,
+                   compute_sun_position, get_panel_normal, get_panel_normals, get_sun_direction, get_sun_directions)
+from state import FrameSnapshot, StateExchange
+from telemetry import TelemetryPublisher
+from tracker import TRACKER_MODES, SunTracker
+from weather import WeatherData
+
+FRAME_TIME = 0.016  # Seconds per frame the per-frame battery rates were tuned for
+FRAME_TO_WATTS = 3600.0 / FRAME_TIME  # Converts a per-frame Wh amount into W
+
+
+class SimulationEngine:
+    """Solar panel and battery model, advanced with step(dt) and independent of any rendering."""
+
+    def __init__(self, battery_count=5, battery_capacity=100.0, seed=None):
+        # Panel variables
+        self.tilt_angle = 0
+        self.azimuth_angle = 0
+        self.panel_pos_x = -5
+        self.battery_enabled = True
+
+        # Sun variables
+        self.sun_pos_x = -10
+        self.latitude = 40.0  # Example latitude (in degrees)
+        self.longitude = 0.0  # Degrees east, only used while the clock runs
+        self.utc_offset = 0.0  # Hours of the local time zone, only used while the clock runs
+        self.declination = -23.5  # Starting point, can be calculated based on date
+        self.time_of_day = 12  # 12:00 PM
+        self.sun_altitude, self.sun_azimuth = compute_sun_position(self.latitude, self.declination, self.time_of_day)
+
+        # Local date/time (np.datetime64) at time 0; while set the sun follows the ephemeris,
+        # otherwise it stays where the controls put it. time_scale speeds up the solar clock.
+        self.clock_start = None
+        self.time_scale = 1.0
+        self.sun_dir = get_sun_direction(self.sun_altitude, self.sun_azimuth)
+
+        # Panel characteristics. With clear_sky the irradiance follows the sun altitude (beam, sky
+        # diffuse and ground reflection on the panel plane); without it a fixed beam of `irradiance`.
+        self.clear_sky = True
+        self.albedo = ALBEDO
+        self.weather = None  # weather.WeatherData that replaces the clear sky while the clock runs
+        self._clear_sky_key = self._clear_sky = None  # Last (sun altitude, day) and its clear-sky irradiance
+        self.temp_air = float("nan")  # °C, from the weather data
+        self.irradiance = IRRADIANCE
+        self.panel_area = PANEL_AREA
+        self.panel_efficiency = PANEL_EFFICIENCY
+        self.plant = None  # plant.PVPlant whose total output replaces the single panel's p_in/p_out
+        self.tracker = None  # tracker.SunTracker that sets tilt/azimuth every step, overriding the controls
+
+        # Battery bank, capacity in Wh so a level reads as % with the default 100
+        self.battery_bank = BatteryBank(battery_count, battery_capacity)
+
+        # Shadows of the house and battery bank on the panel; None ignores them
+        self.shading = ShadingEngine(*scene_occluders(battery_count))
+        self._shading_pose = None  # Panel position / orientation the shading engine was set up for
+
+        # Outputs of the last step
+        self.efficiency = 0
+        self.shaded = 0.0  # Fraction of the panel in shadow
+        self.dni = self.dhi = self.ghi = 0.0  # Clear-sky irradiance components, W/m²
+        self.poa = 0.0  # Irradiance on the panel plane, W/m²
+        self.p_in = 0
+        self.p_out = 0
+        self.ipo = 0
+
+        self.time = 0.0  # Simulated seconds
+        self.steps = 0
+        self.rng = np.random.default_rng(seed)
+
+        # Snapshots out to the GUI thread, control inputs in from it
+        self._battery_soc = np.empty(battery_count)  # State of charge published after each step
+        self.exchange = StateExchange(self.snapshot())
+        self.telemetry = TelemetryPublisher()  # Off until a GUI sets a rate
+        self.recorder = None  # Optional recorder.Recorder that keeps every step's snapshot
+
+    def sun_world_pos(self):
+        # Sun position in the scene, offset by sun_pos_x so it can be moved independently
+        return np.array(self.sun_dir) * 20 + np.array([self.sun_pos_x, 8.0, -10.0])
+
+    def panel_world_pos(self):
+        return np.array([self.panel_pos_x, 0.0, 0.0])
+
+    def average_battery(self):
+        # Average state of charge in %
+        return self.battery_bank.average_soc() * 100
+
+    def snapshot(self):
+        battery_soc = self.battery_bank.state_of_charge()
+        battery_soc.flags.writeable = False
+        *scalars, average_battery = self._frame_scalars()
+        return FrameSnapshot(*scalars, battery_soc, average_battery)
+
+    def _frame_scalars(self):
+        # Every scalar FrameSnapshot field, in field order (state.SCALAR_FIELDS)
+        return (self.time, self.steps, self.tilt_angle, self.azimuth_angle, self.panel_pos_x, self.sun_pos_x,
+                self.sun_altitude, self.sun_azimuth, self.battery_enabled, self.efficiency, self.p_in, self.p_out,
+                self.ipo, self.average_battery())
+
+    def _publish(self, record=True):
+        # The exchange and the recorder copy the step's values into buffers of their own; a
+        # FrameSnapshot is only built when the telemetry interval is due
+        bank = self.battery_bank
+        np.divide(bank.energy, bank.capacity, out=self._battery_soc)
+        scalars = self._frame_scalars()
+        self.exchange.publish_frame(scalars, self._battery_soc)
+        if self.telemetry.due():
+            self.telemetry.offer(self.snapshot())
+        if record and self.recorder is not None:
+            self.recorder.record_frame(scalars, self._battery_soc)
+
+    def step(self, dt=FRAME_TIME):
+        # Control inputs queued by other threads only take effect at step boundaries
+        self.exchange.apply_controls(self)
+
+        if self.clock_start is not None:
+            self._update_sun()
+        self.sun_dir = get_sun_direction(self.sun_altitude, self.sun_azimuth)
+
+        to_sun = self._to_sun()
+
+        # A tracker turns the panel (and the plant) towards the sun, as fast as its motor allows on the solar clock
+        if self.tracker is not None:
+            self._update_tracker(to_sun, dt * self.time_scale)
+
+        # Get panel normal based on its tilt and azimuth
+        panel_norm = get_panel_normal(self.tilt_angle, self.azimuth_angle)
+        self.efficiency = compute_solar_efficiency(panel_norm, to_sun)
+        self.shaded = self._shaded_fraction(to_sun)
+
+        # Irradiance: measured weather, the clear sky, or a fixed beam (only effective based on angle)
+        if self.weather is not None and self.clock_start is not None:
+            self.ghi, self.dni, self.dhi, self.temp_air = self.weather.conditions_at(self.clock())
+        elif self.clear_sky:
+            # Reused while the sun stands still (no clock, controls untouched)
+            key = (self.sun_altitude, self._day_of_year())
+            if key != self._clear_sky_key:
+                self._clear_sky = tuple(map(float, clear_sky_irradiance(*key)))
+                self._clear_sky_key = key
+            self.dni, self.dhi, self.ghi = self._clear_sky
+        else:
+            self.dni, self.dhi, self.ghi = float(self.irradiance), 0.0, 0.0
+        self.poa = float(plane_of_array(self.efficiency * (1 - self.shaded), panel_norm[1], self.dni, self.dhi,
+                                        self.ghi, self.albedo).total)
+
+        # Power incident on the panel surface, or on the whole plant when there is one
+        if self.plant is not None:
+            irradiance_power = self.irradiance * self.plant.total_area
+            self.p_in, self.p_out = self.plant.step(self.sun_dir, self.dni, self.dhi, self.ghi, self.albedo)
+        else:
+            irradiance_power = self.irradiance * self.panel_area
+            self.p_in = self.poa * self.panel_area
+            self.p_out = self.panel_efficiency * self.p_in  # Power output from panel
+        self.ipo = self.p_out / irradiance_power if irradiance_power != 0 else 0  # Instantaneous power output ratio
+
+        if self.battery_enabled:
+            self._update_batteries(dt)
+
+        self.time += dt
+        self.steps += 1
+        self._publish()
+
+    def set_tracker(self, tracker):
+        """Hands tilt/azimuth to a tracker.SunTracker, or back to the controls with None.
+
+        A single-axis tracker only turns about its axis, so the panel (and plant) face the axis
+        azimuth from the start instead of slewing there.
+        """
+        self.tracker = tracker
+        if tracker is not None and tracker.mode == "single":
+            self.azimuth_angle = float(tracker.azimuth)
+            if self.plant is not None:
+                self.plant.set_orientation(self.tilt_angle, self.azimuth_angle)
+
+    def charging_efficiency(self):
+        """Efficiency step() charges the batteries with in the current state: the sun's cosine on the
+        panel times the panel's unshaded fraction (before the per-battery noise)."""
+        to_sun = self._to_sun()
+        efficiency = compute_solar_efficiency(get_panel_normal(self.tilt_angle, self.azimuth_angle), to_sun)
+        return efficiency * (1 - self._shaded_fraction(to_sun))
+
+    def run_batch(self, steps, dt=FRAME_TIME):
+        """Advances `steps` steps of dt as arrays over the steps, instead of calling step() for each.
+
+        The same model as step() for headless runs: control inputs are applied once at the start,
+        the recorder gets every step and the exchange / telemetry only the last. Battery noise is
+        drawn for the whole batch at once, so a seed gives other (equally distributed) draws than
+        stepping.
+        """
+        self.exchange.apply_controls(self)
+        if steps <= 0:
+            return
+        times = self.time + np.arange(steps) * dt  # Simulated time at the start of each step
+
+        # Sun, as step() places it
+        clock = day = None
+        if self.clock_start is not None:
+            clock = self.clock_start + (times * self.time_scale * 1e6).astype(np.int64).astype("timedelta64[us]")
+            site = Site(self.latitude, self.longitude, self.utc_offset)
+            sun_altitude, sun_azimuth = sun_positions_at(site, clock)
+            day = day_of_year(clock)
+        else:
+            sun_altitude = np.full(steps, float(self.sun_altitude))
+            sun_azimuth = np.full(steps, float(self.sun_azimuth))
+        sun_dirs = get_sun_directions(sun_altitude, sun_azimuth)
+        to_sun = sun_dirs * 20 + [self.sun_pos_x - self.panel_pos_x, 8.0, -10.0]
+        to_sun /= np.linalg.norm(to_sun, axis=1, keepdims=True)
+
+        # Panel orientation, efficiency and shadows
+        if self.tracker is not None:
+            tilt, azimuth = self.tracker.series(to_sun, dt * self.time_scale, self.tilt_angle, self.azimuth_angle)
+        else:
+            tilt, azimuth = np.full(steps, float(self.tilt_angle)), np.full(steps, float(self.azimuth_angle))
+        normals = get_panel_normals(tilt, azimuth)
+        efficiency = compute_solar_efficiencies(normals, to_sun)
+        shaded = self._shaded_fractions(to_sun, tilt, azimuth)
+
+        # Irradiance and power
+        if self.weather is not None and clock is not None:
+            ghi, dni, dhi, temp_air = self.weather.conditions_series(clock)
+            self.temp_air = float(temp_air[-1])
+        elif self.clear_sky:
+            dni, dhi, ghi = (np.broadcast_to(c, steps) for c in clear_sky_irradiance(sun_altitude, day))
+        else:
+            dni, dhi, ghi = np.full(steps, float(self.irradiance)), np.zeros(steps), np.zeros(steps)
+        poa = plane_of_array(efficiency * (1 - shaded), normals[:, 1], dni, dhi, ghi, self.albedo).total
+        if self.plant is not None:
+            irradiance_power = self.irradiance * self.plant.total_area
+            if self.tracker is not None:
+                p_in, p_out = self.plant.power_series(sun_dirs, dni, dhi, ghi, self.albedo, tilt, azimuth)
+                self.plant.set_orientation(tilt[-1], azimuth[-1])
+            else:
+                p_in, p_out = self.plant.power_series(sun_dirs, dni, dhi, ghi, self.albedo)
+            self.plant.step(sun_dirs[-1], dni[-1], dhi[-1], ghi[-1], self.albedo)  # Per-panel values of the last step
+        else:
+            irradiance_power = self.irradiance * self.panel_area
+            p_in = poa * self.panel_area
+            p_out = self.panel_efficiency * p_in
+        ipo = p_out / irradiance_power if irradiance_power != 0 else np.zeros(steps)
+
+        bank = self.battery_bank
+        if self.battery_enabled:
+            charge_power, load_power = stochastic_battery_powers(self.rng, (efficiency * (1 - shaded))[:, None],
+                                                                 (steps, bank.count))
+            battery_soc = bank.run(charge_power, load_power, dt) / bank.capacity
+        else:
+            battery_soc = np.broadcast_to(bank.state_of_charge(), (steps, bank.count))
+
+        # The engine ends up in the state of the batch's last step
+        if clock is not None:
+            now = clock[-1]
+            self.time_of_day = (now - now.astype("datetime64[D]")) / np.timedelta64(1, "h")
+            self.sun_altitude, self.sun_azimuth = float(sun_altitude[-1]), float(sun_azimuth[-1])
+        self.sun_dir = sun_dirs[-1].tolist()
+        self.tilt_angle, self.azimuth_angle = float(tilt[-1]), float(azimuth[-1])
+        self.efficiency, self.shaded, self.poa = float(efficiency[-1]), float(shaded[-1]), float(poa[-1])
+        self.dni, self.dhi, self.ghi = float(dni[-1]), float(dhi[-1]), float(ghi[-1])
+        self.p_in, self.p_out, self.ipo = float(p_in[-1]), float(p_out[-1]), float(ipo[-1])
+        first_step = self.steps + 1
+        self.time += steps * dt
+        self.steps += steps
+
+        self._publish(record=False)
+        if self.recorder is not None:
+            self.recorder.record_batch({
+                "time": times + dt, "steps": np.arange(first_step, self.steps + 1), "tilt_angle": tilt,
+                "azimuth_angle": azimuth, "panel_pos_x": np.full(steps, self.panel_pos_x),
+                "sun_pos_x": np.full(steps, self.sun_pos_x), "sun_altitude": sun_altitude, "sun_azimuth": sun_azimuth,
+                "battery_enabled": np.full(steps, self.battery_enabled), "efficiency": efficiency, "p_in": p_in,
+                "p_out": p_out, "ipo": ipo, "battery_soc": battery_soc,
+            })
+
+    def clock(self):
+        # Local date/time of the current step, None without a running clock
+        if self.clock_start is None:
+            return None
+        return self.clock_start + np.timedelta64(int(self.time * self.time_scale * 1e6), "us")
+
+    def _day_of_year(self):
+        # Day of the running clock for the sun-distance correction, None (yearly mean) without one
+        now = self.clock()
+        return None if now is None else int(day_of_year(now))
+
+    def _to_sun(self):
+        # Sun direction relative to the panel (sun_world_pos() - panel_world_pos(), normalized), in
+        # plain math since NumPy's per-call overhead dominates for one vector
+        sx, sy, sz = self.sun_dir
+        to_sun = [sx * 20 + self.sun_pos_x - self.panel_pos_x, sy * 20 + 8.0, sz * 20 - 10.0]
+        length = math.sqrt(to_sun[0] ** 2 + to_sun[1] ** 2 + to_sun[2] ** 2)
+        return [c / length for c in to_sun]
+
+    def _update_sun(self):
+        now = self.clock()
+        self.time_of_day = (now - now.astype("datetime64[D]")) / np.timedelta64(1, "h")
+        site = Site(self.latitude, self.longitude, self.utc_offset)
+        self.sun_altitude, self.sun_azimuth = sun_position_at(site, now)
+
+    def _update_tracker(self, to_sun, seconds):
+        angles = self.tracker.step(to_sun, seconds, self.tilt_angle, self.azimuth_angle)
+        if angles == (self.tilt_angle, self.azimuth_angle):
+            return  # Holding still (at the target, or parked at night)
+        self.tilt_angle, self.azimuth_angle = angles
+        if self.plant is not None:
+            self.plant.set_orientation(self.tilt_angle, self.azimuth_angle)
+
+    def _shaded_fraction(self, to_sun):
+        if self.shading is None:
+            return 0.0
+        q = self.shading.quantum
+        self._aim_shading(round(self.tilt_angle / q) * q, round(self.azimuth_angle / q) * q)
+        return float(self.shading.shaded_fractions(to_sun)[0])
+
+    def _shaded_fractions(self, to_sun, tilt, azimuth):
+        # Batched _shaded_fraction: one mask lookup per distinct (pose, sun position) key
+        if self.shading is None:
+            return np.zeros(len(to_sun))
+        q = self.shading.quantum
+        keys = np.concatenate((np.round(np.stack((tilt, azimuth), axis=1) / q) * q,
+                               self.shading.quantize_directions(to_sun)), axis=1)
+        unique, inverse = unique_keys(keys)
+        fractions = np.empty(len(unique))
+        for i, (tilt_key, azimuth_key, altitude_key, sun_azimuth_key) in enumerate(unique.tolist()):
+            self._aim_shading(tilt_key, azimuth_key)
+            fractions[i] = self.shading.mask((altitude_key, sun_azimuth_key))[0]
+        return fractions[inverse]
+
+    def _aim_shading(self, tilt, azimuth):
+        # Angles come rounded like the sun positions, so a tracking panel does not re-cast every step
+        pose = (self.panel_pos_x, tilt, azimuth)
+        if pose == self._shading_pose:
+            return
+        # Moving or turning the panel invalidates the cached shadow masks; turning it in place only refits the BVH
+        if self._shading_pose is not None and self._shading_pose[0] == self.panel_pos_x:
+            self.shading.set_orientation(tilt, azimuth)
+        else:
+            self.shading.set_panels(self.panel_world_pos(), tilt, azimuth, *SCENE_PANEL_SIZE)
+        self._shading_pose = pose
+
+    def _update_batteries(self, dt):
+        charge_power, load_power = stochastic_battery_powers(self.rng, self.efficiency * (1 - self.shaded),
+                                                             self.battery_bank.count)
+        self.battery_bank.step(charge_power, load_power, dt)
+
+
+def stochastic_battery_powers(rng, efficiency, shape):
+    """Random charge and load power (W) of the live battery model, for batteries of any array shape."""
+    # Random solar efficiency per battery (simulate partial shading or dirt)
+    individual_efficiency = efficiency * rng.uniform(0.4, 1.1, shape)  # way more variance
+
+    # Random chance to *not* receive sunlight (like a passing cloud)
+    individual_efficiency[rng.random(shape) < 0.1] = 0.0  # 10% chance of total shadow
+
+    # Random fluctuation in sunlight power per battery
+    power_generated = individual_efficiency * rng.uniform(0.05, 0.15, shape)
+
+    # Random consumption (maybe a connected device turns on)
+    random_consumption = rng.uniform(0.005, 0.02, shape)
+
+    # Random sudden drain (simulate battery stress or faulty circuit)
+    drain = rng.random(shape) < 0.05  # 5% chance of extra power loss
+    random_consumption[drain] += rng.uniform(0.01, 0.05, np.count_nonzero(drain))
+
+    # The amounts above are per frame, the bank integrates power over dt
+    return power_generated * FRAME_TO_WATTS, random_consumption * FRAME_TO_WATTS
+
+
+def run_headless(steps, dt=FRAME_TIME, engine=None, batch=None):
+    # Advance the model without a window, e.g. for batch jobs on render-less servers; with `batch`,
+    # run_batch() advances that many steps at a time
+    if engine is None:
+        engine = SimulationEngine()
+    if batch:
+        for done in range(0, steps, batch):
+            engine.run_batch(min(batch, steps - done), dt)
+        return engine
+    for _ in range(steps):
+        engine.step(dt)
+    return engine
+
+
+def add_environment_arguments(parser, time_scale=1.0):
+    """Sun clock, site, weather, plant, shading and tracker options shared by engine.py and simulation.py."""
+    parser.add_argument("--date", default=None, help="Local start time, e.g. 2025-06-21T06:00; moves the sun")
+    parser.add_argument("--time-scale", type=float, default=time_scale,
+                        help="Solar clock seconds per simulated second")
+    parser.add_argument("--weather", default=None, help="CSV/TMY3 weather file driving the irradiance")
+    parser.add_argument("--latitude", type=float, default=None, help="Default: the weather file's site or 40")
+    parser.add_argument("--longitude", type=float, default=None)
+    parser.add_argument("--utc-offset", type=float, default=None, help="Hours of the local time zone")
+    parser.add_argument("--plant", type=int, nargs=2, metavar=("ROWS", "COLUMNS"), default=None,
+                        help="Simulate a grid plant of ROWS x COLUMNS panels instead of one panel")
+    parser.add_argument("--no-shading", action="store_true", help="Ignore shadows on the panel(s)")
+    parser.add_argument("--tracker", choices=TRACKER_MODES, default=None,
+                        help="Follow the sun instead of the tilt/azimuth controls")
+    parser.add_argument("--backtracking", action="store_true", help="Single-axis rows avoid shading each other")
+    parser.add_argument("--slew-rate", type=float, default=None, help="Tracker motor limit in degrees per second")
+
+
+def configure_from_args(engine, args, plant_origin=(0.0, 0.0, 0.0)):
+    """Applies the add_environment_arguments() options to an engine; the panel angles are set before."""
+    if args.weather:
+        engine.weather = WeatherData(args.weather)
+        if engine.weather.site is not None:
+            engine.latitude, engine.longitude, engine.utc_offset = engine.weather.site
+        engine.clock_start = engine.weather.times[0]  # Unless --date picks another start
+    for name in ("latitude", "longitude", "utc_offset"):
+        if getattr(args, name) is not None:
+            setattr(engine, name, getattr(args, name))
+    if args.date:
+        engine.clock_start = np.datetime64(args.date)
+    engine.time_scale = args.time_scale
+    if args.tracker:
+        engine.set_tracker(SunTracker(args.tracker, backtracking=args.backtracking, slew_rate=args.slew_rate))
+    if args.plant:
+        engine.plant = PVPlant.grid(*args.plant, origin=plant_origin, tilt=engine.tilt_angle,
+                                    azimuth=engine.azimuth_angle)
+        if not args.no_shading and not args.tracker:
+            engine.plant.shading = ShadingEngine.for_plant(engine.plant)  # Row-to-row shading
+    if args.no_shading:
+        engine.shading = None
+    return engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the solar panel simulation without rendering.")
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--dt", type=float, default=FRAME_TIME, help="Seconds per step")
+    parser.add_argument("--tilt", type=float, default=0.0)
+    parser.add_argument("--azimuth", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", default=None, help="Directory to record every step into")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="Advance this many steps at a time as arrays (SimulationEngine.run_batch)")
+    add_environment_arguments(parser)
+    args = parser.parse_args()
+
+    sim = SimulationEngine(seed=args.seed)
+    sim.tilt_angle = args.tilt
+    sim.azimuth_angle = args.azimuth
+    configure_from_args(sim, args)
+    if args.record:
+        sim.recorder = Recorder(args.record, sim.battery_bank.count)
+
+    start = time.perf_counter()
+    run_headless(args.steps, args.dt, sim, args.batch)
+    if sim.recorder is not None:
+        sim.recorder.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Steps: {sim.steps} ({sim.time:.1f} s simulated) in {elapsed:.3f} s "
+          f"-> {sim.steps / elapsed:,.0f} steps/s")
+    if sim.clock_start is not None:
+        print(f"Clock: {sim.clock()} (sun altitude {sim.sun_altitude:.1f}°, azimuth {sim.sun_azimuth:.1f}°)")
+    if sim.tracker is not None:
+        print(f"Tracker: tilt {sim.tilt_angle:.1f}°, azimuth {sim.azimuth_angle:.1f}°")
+    print(f"Efficiency: {sim.efficiency * 100:.2f}%")
+    print(f"Shaded: {sim.shaded * 100:.0f}%")
+    print(f"Incident Power: {sim.p_in:.2f} W")
+    print(f"Output Power: {sim.p_out:.2f} W")
+    print(f"Battery Level: {sim.average_battery():.1f}%")
@@ -0,0 +1,174 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import numpy as np
+
+from battery import BatteryBank
+from engine import FRAME_TIME, SimulationEngine, stochastic_battery_powers
+
+SHARD_SIZE = 5000  # Realizations per shard; shards are also the unit of seeding
+HISTOGRAM_BINS = 1000  # Resolution of the streamed distributions (0.1% of capacity)
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class EnsembleStats:
+    """Streaming, mergeable statistics of an ensemble: per recorded step, histograms of the
+    state of charge of every battery and of the stored energy of every bank, plus their sums.
+
+    Only these fixed-size arrays are kept, never the trajectories, and two instances merge by
+    adding them, so shards can be combined in any order.
+    """
+
+    def __init__(self, samples, bins=HISTOGRAM_BINS):
+        self.bins = bins
+        self.soc_counts = np.zeros((samples, bins), dtype=np.int64)
+        self.bank_counts = np.zeros((samples, bins), dtype=np.int64)  # Bank energy as a fraction of its capacity
+        self.soc_sum = np.zeros(samples)
+        self.bank_sum = np.zeros(samples)
+        self.realizations = 0
+
+    def add(self, sample, soc):
+        # soc: (realizations, batteries) state of charge in 0..1 at one recorded step
+        bins = self.bins
+        soc_index = np.minimum((soc * bins).astype(np.intp), bins - 1)
+        self.soc_counts[sample] += np.bincount(soc_index.ravel(), minlength=bins)
+
+        bank_fraction = soc.mean(axis=1)  # Batteries share one capacity, so this is stored / total
+        bank_index = np.minimum((bank_fraction * bins).astype(np.intp), bins - 1)
+        self.bank_counts[sample] += np.bincount(bank_index, minlength=bins)
+
+        self.soc_sum[sample] += soc.sum()
+        self.bank_sum[sample] += bank_fraction.sum()
+
+    def merge(self, other):
+        self.soc_counts += other.soc_counts
+        self.bank_counts += other.bank_counts
+        self.soc_sum += other.soc_sum
+        self.bank_sum += other.bank_sum
+        self.realizations += other.realizations
+        return self
+
+    def percentiles(self, counts, percentiles):
+        # Percentiles (fractions of 0..1) for every recorded step, interpolated inside the histogram bin
+        cumulative = counts.cumsum(axis=1)
+        total = cumulative[:, -1]
+        result = np.empty((len(percentiles), len(counts)))
+        rows = np.arange(len(counts))
+        for i, q in enumerate(percentiles):
+            target = q / 100.0 * total
+            index = (cumulative >= target[:, None]).argmax(axis=1)
+            before = np.where(index > 0, cumulative[rows, index - 1], 0)
+            in_bin = np.maximum(counts[rows, index], 1)
+            result[i] = (index + (target - before) / in_bin) / self.bins
+        return result
+
+
+@dataclass
+class EnsembleResult:
+    """Percentile bands over time of a Monte Carlo ensemble of the stochastic battery model."""
+    times: np.ndarray  # Simulated seconds of each recorded step
+    percentiles: tuple
+    soc: np.ndarray  # (len(percentiles), samples) battery state of charge in %
+    energy: np.ndarray  # (len(percentiles), samples) stored bank energy in Wh
+    soc_mean: np.ndarray  # %
+    energy_mean: np.ndarray  # Wh
+    realizations: int
+    elapsed: float
+
+
+def _run_shard(seed, realizations, battery_count, capacity, efficiency, steps, dt, record_every):
+    rng = np.random.default_rng(seed)
+    # One flat bank of realizations x battery_count units, viewed as (realizations, batteries) when recorded
+    bank = BatteryBank(realizations * battery_count, capacity)
+    stats = EnsembleStats(steps // record_every)
+    stats.realizations = realizations
+
+    for step in range(1, steps + 1):
+        charge_power, load_power = stochastic_battery_powers(rng, efficiency, bank.count)
+        bank.step(charge_power, load_power, dt)
+        if step % record_every == 0:
+            stats.add(step // record_every - 1, bank.state_of_charge().reshape(realizations, battery_count))
+    return stats
+
+
+def panel_efficiency_at(tilt, azimuth, battery_count=5):
+    # Efficiency the live engine charges its batteries with for this orientation at its default sun,
+    # shadows of the house and of a bank of battery_count batteries included. The engine is not
+    # stepped; it is only built once per ensemble, for its scene and shading.
+    engine = SimulationEngine(battery_count)
+    engine.tilt_angle = tilt
+    engine.azimuth_angle = azimuth
+    return engine.charging_efficiency()
+
+
+def run_ensemble(realizations, steps, dt=FRAME_TIME, battery_count=5, capacity=100.0, efficiency=None,
+                 tilt=0.0, azimuth=0.0, seed=0, record_every=1, workers=None, percentiles=DEFAULT_PERCENTILES):
+    if realizations < 1:
+        raise ValueError(f"An ensemble needs at least one realization, got {realizations}")
+    if record_every < 1 or steps < record_every:
+        raise ValueError(f"steps ({steps}) must be at least record_every ({record_every}, >= 1) "
+                         "so that there is a recorded sample")
+
+    started = time.perf_counter()
+    if efficiency is None:
+        efficiency = panel_efficiency_at(tilt, azimuth, battery_count)
+
+    # Shards (and their independent seed streams) depend only on the ensemble size, not on the
+    # number of workers, so a given seed reproduces the same result everywhere
+    shard_sizes = [len(s) for s in np.array_split(np.arange(realizations), -(-realizations // SHARD_SIZE))]
+    seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+    shard_args = [(s, n, battery_count, capacity, efficiency, steps, dt, record_every)
+                  for s, n in zip(seeds, shard_sizes)]
+
+    stats = EnsembleStats(steps // record_every)
+    workers = min(workers or os.cpu_count() or 1, len(shard_args))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Merge shard statistics as they finish
+            for future in as_completed([pool.submit(_run_shard, *args) for args in shard_args]):
+                stats.merge(future.result())
+    else:
+        for args in shard_args:
+            stats.merge(_run_shard(*args))
+
+    total_capacity = battery_count * capacity
+    soc_units = stats.realizations * battery_count
+    return EnsembleResult(
+        times=np.arange(1, steps // record_every + 1) * record_every * dt,
+        percentiles=tuple(percentiles),
+        soc=stats.percentiles(stats.soc_counts, percentiles) * 100,
+        energy=stats.percentiles(stats.bank_counts, percentiles) * total_capacity,
+        soc_mean=stats.soc_sum / soc_units * 100,
+        energy_mean=stats.bank_sum / stats.realizations * total_capacity,
+        realizations=stats.realizations,
+        elapsed=time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo ensemble of the stochastic battery model.")
+    parser.add_argument("--realizations", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--dt", type=float, default=FRAME_TIME, help="Seconds per step")
+    parser.add_argument("--record-every", type=int, default=10, help="Steps between recorded samples")
+    parser.add_argument("--tilt", type=float, default=0.0)
+    parser.add_argument("--azimuth", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    if args.realizations < 1:
+        parser.error("--realizations must be at least 1")
+    if args.record_every < 1 or args.steps < args.record_every:
+        parser.error("--steps must be at least --record-every (which must be at least 1)")
+
+    result = run_ensemble(args.realizations, args.steps, args.dt, tilt=args.tilt, azimuth=args.azimuth,
+                          seed=args.seed, record_every=args.record_every, workers=args.workers)
+
+    print(f"Realizations: {result.realizations} x {args.steps} steps in {result.elapsed:.2f} s")
+    print(f"Final time: {result.times[-1]:.1f} s")
+    for q, soc, energy in zip(result.percentiles, result.soc[:, -1], result.energy[:, -1]):
+        print(f"P{q:<3} Battery Level: {soc:6.2f}%  Bank Energy: {energy:7.2f} Wh")
+    print(f"Mean Battery Level: {result.soc_mean[-1]:.2f}%")
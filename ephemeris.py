@@ -0,0 +1,104 @@
+import functools
+from typing import NamedTuple
+
+import numpy as np
+
+from solar import compute_sun_positions, equation_of_time, solar_declination
+
+DAY_TABLE_STEP = 60  # Seconds between the samples of a day table
+DAY_CACHE_SIZE = 64  # Day tables kept (per site and date)
+
+
+class Site(NamedTuple):
+    """Where the panel is; hashable so it can key the day table cache."""
+    latitude: float  # degrees, north positive
+    longitude: float = 0.0  # degrees, east positive
+    utc_offset: float = 0.0  # hours of the local standard time zone, e.g. 1 for CET
+
+
+def day_of_year(times):
+    # 1 on January 1st, for datetime64 scalars or arrays
+    times = np.asarray(times, dtype="datetime64[s]")
+    return (times.astype("datetime64[D]") - times.astype("datetime64[Y]")).astype(int) + 1
+
+
+def solar_time(site, times):
+    """Day of year and local apparent solar time (hours) for local standard time timestamps."""
+    times = np.asarray(times, dtype="datetime64[s]")
+    clock_hours = (times - times.astype("datetime64[D]")) / np.timedelta64(1, "h")
+    day = day_of_year(times)
+
+    # 4 minutes per degree away from the time zone's meridian, plus the equation of time
+    correction = 4.0 * (site.longitude - 15.0 * site.utc_offset) + equation_of_time(day)
+    return day, clock_hours + correction / 60.0
+
+
+def sun_positions(site, times):
+    """Sun (altitude, azimuth) in degrees for an array of local standard time timestamps."""
+    day, hours = solar_time(site, times)
+    return compute_sun_positions(site.latitude, solar_declination(day), hours)
+
+
+class DayTable(NamedTuple):
+    """Sun position sampled every `step` seconds over one day, from 00:00 to 24:00 local time."""
+    day: np.datetime64
+    step: int
+    altitude: np.ndarray  # degrees
+    azimuth: np.ndarray  # degrees, unwrapped so it can be interpolated through due north
+
+    def times(self):
+        return self.day + np.arange(len(self.altitude)) * np.timedelta64(self.step, "s")
+
+    def at(self, seconds_of_day):
+        # Linear interpolation between samples; seconds_of_day may be a scalar or an array
+        x = np.asarray(seconds_of_day, dtype=float) / self.step
+        index = np.arange(len(self.altitude))
+        altitude = np.interp(x, index, self.altitude)
+        azimuth = (np.interp(x, index, self.azimuth) + 180.0) % 360.0 - 180.0
+        return altitude, np.where(altitude > 0, azimuth, 0.0)
+
+
+@functools.lru_cache(maxsize=DAY_CACHE_SIZE)
+def _day_table(site, day, step):
+    times = day + np.arange(0, 86400 + step, step) * np.timedelta64(1, "s")
+    altitude, azimuth = sun_positions(site, times)
+    azimuth = np.unwrap(azimuth, period=360.0)
+
+    # Shared between callers through the cache, so nobody may modify them
+    altitude.flags.writeable = False
+    azimuth.flags.writeable = False
+    return DayTable(day, step, altitude, azimuth)
+
+
+def day_table(site, date, step=DAY_TABLE_STEP):
+    """Cached DayTable of a site and date (anything np.datetime64 accepts); computed once per key."""
+    return _day_table(Site(*site), np.datetime64(date, "D"), int(step))
+
+
+def sun_position_at(site, when):
+    """Sun (altitude, azimuth) at one local standard time instant, interpolated from the cached day table."""
+    when = np.datetime64(when, "us")
+    day = when.astype("datetime64[D]")
+    seconds = (when - day) / np.timedelta64(1, "s")
+    altitude, azimuth = day_table(site, day).at(seconds)
+    return float(altitude), float(azimuth)
+
+
+def sun_positions_at(site, times):
+    """Array version of sun_position_at: (altitude, azimuth) arrays from one cached day table per day spanned."""
+    times = np.asarray(times, dtype="datetime64[us]")
+    days = times.astype("datetime64[D]")
+    seconds = (times - days) / np.timedelta64(1, "s")
+    altitude, azimuth = np.empty(times.shape), np.empty(times.shape)
+    for day in np.unique(days):
+        on_day = days == day
+        altitude[on_day], azimuth[on_day] = day_table(site, day).at(seconds[on_day])
+    return altitude, azimuth
+
+
+def cache_info():
+    return _day_table.cache_info()
+
+
+def cache_clear():
+    _day_table.cache_clear()
@@ -0,0 +1,40 @@
+from OpenGL.GL import *
+
+
+class GeometryCache:
+    """Compiles immediate-mode draw functions into OpenGL display lists and replays them.
+
+    Each entry is keyed by a name and an input key (e.g. panel_pos_x); the list is only
+    recompiled when the key changes. Must be used from the thread that owns the GL context.
+    """
+
+    def __init__(self):
+        self.lists = {}  # name -> (display list id, key it was compiled for)
+
+    def build(self, name, draw_func, key=None):
+        entry = self.lists.get(name)
+        if entry is not None:
+            glDeleteLists(entry[0], 1)
+
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        draw_func()
+        glEndList()
+        self.lists[name] = (list_id, key)
+        return list_id
+
+    def draw(self, name, draw_func, key=None):
+        entry = self.lists.get(name)
+        if entry is None or entry[1] != key:
+            list_id = self.build(name, draw_func, key)
+        else:
+            list_id = entry[0]
+        glCallList(list_id)
+
+    def invalidate(self, name=None):
+        # Drop one entry (or all of them) so it is recompiled on next draw
+        names = list(self.lists) if name is None else [name]
+        for n in names:
+            entry = self.lists.pop(n, None)
+            if entry is not None:
+                glDeleteLists(entry[0], 1)
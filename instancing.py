@@ -0,0 +1,118 @@
+import numpy as np
+from OpenGL.GL import *
+
+from shapes import CUBE_CORNERS, CUBE_NORMALS
+
+# Corner pairs of the 4 edges of each cube face (as wire_cube draws them), indices into CUBE_CORNERS
+_FACE_EDGES = (np.arange(24).reshape(6, 4, 1) // 4 * 4 + (np.arange(4)[:, None] + np.arange(2)) % 4).reshape(-1)
+
+
+class InstanceBatch:
+    """Many copies of a shape merged into flat vertex, normal and color arrays.
+
+    The per-instance transforms, sizes and colors are applied with NumPy when the batch is built,
+    so drawing it is one glDrawArrays call however many instances it holds. Works in the legacy
+    contexts the scene is drawn in (no shaders); inside a GeometryCache display list the arrays
+    are copied into the list, so static batches cost nothing to rebuild per frame.
+    """
+
+    def __init__(self, mode, vertices, normals, colors):
+        self.mode = mode
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self.normals = np.ascontiguousarray(np.broadcast_to(normals, self.vertices.shape), dtype=np.float32)
+        self.colors = np.ascontiguousarray(np.broadcast_to(colors, self.vertices.shape), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def draw(self):
+        if not len(self):
+            return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.vertices)
+        glNormalPointer(GL_FLOAT, 0, self.normals)
+        glColorPointer(3, GL_FLOAT, 0, self.colors)
+        glDrawArrays(self.mode, 0, len(self))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def _combine(points, axes):
+    # points (k, 3) as combinations of each instance's axes (n, 3, 3) -> (n, k, 3), in one large matmul
+    # instead of n small ones
+    count = len(axes)
+    flat = np.ascontiguousarray(np.swapaxes(axes, 0, 1)).reshape(3, count * 3)
+    return np.swapaxes((points @ flat).reshape(len(points), count, 3), 0, 1)
+
+
+def _per_vertex(values, count, vertices_each):
+    # (3,) or (count, 3) per instance -> (count * vertices_each, 3)
+    values = np.broadcast_to(np.asarray(values, dtype=float), (count, 3))
+    return np.repeat(values, vertices_each, axis=0)
+
+
+def box_batch(centers, axes, colors):
+    """Solid boxes as GL_QUADS. axes is (n, 3, 3): each box's x/y/z half-extent vectors as rows.
+
+    Axis-aligned boxes of size (w, h, d) have axes diag(w, h, d) / 2, like solid_cube(1) scaled.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    axes = np.broadcast_to(axes, (len(centers), 3, 3))
+    vertices = centers[:, None, :] + _combine(CUBE_CORNERS, axes)
+    # Face normals follow the box's own (unit) axes; GL_RESCALE_NORMAL does not undo per-vertex scaling
+    unit_axes = axes / np.maximum(np.linalg.norm(axes, axis=-1, keepdims=True), 1e-12)  # Flat boxes keep 0 normals
+    normals = _combine(CUBE_NORMALS, unit_axes)
+    return InstanceBatch(GL_QUADS, vertices, normals.reshape(-1, 3), _per_vertex(colors, len(centers), 24))
+
+
+def box_outline_batch(centers, axes, colors):
+    """Edges of the same boxes as GL_LINES, face by face like wire_cube."""
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    axes = np.broadcast_to(axes, (len(centers), 3, 3))
+    vertices = centers[:, None, :] + _combine(CUBE_CORNERS[_FACE_EDGES], axes)
+    normals = np.broadcast_to(CUBE_NORMALS[_FACE_EDGES], vertices.shape)
+    return InstanceBatch(GL_LINES, vertices, normals.reshape(-1, 3),
+                         _per_vertex(colors, len(centers), len(_FACE_EDGES)))
+
+
+def scaled_axes(sizes):
+    # (n, 3) box sizes -> (n, 3, 3) axis-aligned half-extent axes for box_batch
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 3)
+    return sizes[:, :, None] / 2 * np.eye(3)
+
+
+def cylinder_batch(starts, ends, radius, colors, slices=8):
+    """Open cylinders from each start to its end point as GL_QUADS, like gluCylinder with one stack."""
+    starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+    ends = np.broadcast_to(np.asarray(ends, dtype=float), starts.shape)
+    direction = ends - starts
+    length = np.linalg.norm(direction, axis=-1, keepdims=True)
+    keep = length[:, 0] > 0  # No cable between coincident points
+    starts, ends = starts[keep], ends[keep]
+    direction = direction[keep] / length[keep]
+    colors = np.broadcast_to(np.asarray(colors, dtype=float), (len(keep), 3))[keep]
+
+    # Two unit vectors across each cylinder, from whichever world axis is least parallel to it
+    helper = np.eye(3)[np.argmin(np.abs(direction), axis=-1)]
+    u = np.cross(direction, helper)
+    u /= np.linalg.norm(u, axis=-1, keepdims=True)
+    v = np.cross(direction, u)
+
+    angles = 2 * np.pi * np.arange(slices + 1) / slices
+    rims = np.cos(angles)[None, :, None] * u[:, None, :] + np.sin(angles)[None, :, None] * v[:, None, :]
+    # Quad i spans rim directions i and i + 1, at the start and at the end
+    quad = rims[:, np.stack((np.arange(slices), np.arange(slices) + 1, np.arange(slices) + 1,
+                            np.arange(slices)), axis=-1)]  # (n, slices, 4, 3)
+    at_end = np.array([0.0, 0.0, 1.0, 1.0])[None, None, :, None]
+    vertices = (starts[:, None, None, :] + radius * quad
+                + at_end * (ends - starts)[:, None, None, :])
+    return InstanceBatch(GL_QUADS, vertices, quad.reshape(-1, 3), _per_vertex(colors, len(starts), 4 * slices))
+
+
+def merge_batches(*batches):
+    # One batch from several of the same primitive mode
+    return InstanceBatch(batches[0].mode, np.concatenate([b.vertices for b in batches]),
+                         np.concatenate([b.normals for b in batches]), np.concatenate([b.colors for b in batches]))
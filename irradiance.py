@@ -0,0 +1,65 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from solar import compute_angle_efficiencies
+
+SOLAR_CONSTANT = 1367.0  # Extraterrestrial irradiance at mean sun-earth distance, W/m²
+ALBEDO = 0.2  # Ground reflectance of grass
+DIFFUSE_FRACTION = 0.1  # Clear-sky diffuse horizontal irradiance as a fraction of the beam
+
+
+class PlaneOfArray(NamedTuple):
+    """Irradiance on the panel plane in W/m², split by source."""
+    total: np.ndarray
+    beam: np.ndarray
+    sky_diffuse: np.ndarray
+    ground_reflected: np.ndarray
+
+
+def extraterrestrial_irradiance(day_of_year=None):
+    # Solar constant corrected for the eccentricity of the earth's orbit; None gives the yearly mean
+    if day_of_year is None:
+        return SOLAR_CONSTANT
+    return SOLAR_CONSTANT * (1 + 0.033 * np.cos(np.radians(360.0 / 365.0 * np.asarray(day_of_year))))
+
+
+def air_mass(sun_altitude_deg):
+    # Kasten & Young relative air mass, valid down to the horizon; inf below it
+    altitude = np.asarray(sun_altitude_deg, dtype=float)
+    above = np.maximum(altitude, 0.0)
+    mass = 1.0 / (np.sin(np.radians(above)) + 0.50572 * (above + 6.07995) ** -1.6364)
+    return np.where(altitude > 0, mass, np.inf)
+
+
+def clear_sky_irradiance(sun_altitude_deg, day_of_year=None):
+    """Clear-sky (DNI, DHI, GHI) in W/m² for any array of sun altitudes, 0 while the sun is down.
+
+    Beam from Meinel's attenuation with air mass, diffuse as a fixed fraction of the beam.
+    """
+    altitude = np.asarray(sun_altitude_deg, dtype=float)
+    dni = extraterrestrial_irradiance(day_of_year) * 0.7 ** (air_mass(altitude) ** 0.678)
+    dni = np.where(altitude > 0, dni, 0.0)
+    dhi = DIFFUSE_FRACTION * dni
+    ghi = dni * np.sin(np.radians(np.maximum(altitude, 0.0))) + dhi
+    return dni, dhi, ghi
+
+
+def plane_of_array(cos_incidence, cos_tilt, dni, dhi, ghi, albedo=ALBEDO):
+    """Transposes horizontal irradiance onto the panel: beam + isotropic sky diffuse + ground reflection.
+
+    cos_incidence is the clipped cosine between panel normal and sun (compute_solar_efficiency),
+    cos_tilt the vertical component of the panel normal. All arguments broadcast.
+    """
+    beam = np.multiply(dni, cos_incidence)
+    sky_diffuse = np.multiply(dhi, (1 + np.asarray(cos_tilt)) / 2)
+    ground_reflected = np.multiply(ghi, albedo * (1 - np.asarray(cos_tilt)) / 2)
+    return PlaneOfArray(beam + sky_diffuse + ground_reflected, beam, sky_diffuse, ground_reflected)
+
+
+def poa_irradiance(tilt_deg, panel_azimuth_deg, sun_altitude_deg, sun_azimuth_deg, day_of_year=None,
+                   albedo=ALBEDO):
+    # Clear-sky plane-of-array irradiance for a panel orientation over a series of sun positions
+    dni, dhi, ghi = clear_sky_irradiance(sun_altitude_deg, day_of_year)
+    cos_incidence = compute_angle_efficiencies(tilt_deg, panel_azimuth_deg, sun_altitude_deg, sun_azimuth_deg)
+    return plane_of_array(cos_incidence, np.cos(np.radians(tilt_deg)), dni, dhi, ghi, albedo)
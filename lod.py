@@ -0,0 +1,68 @@
+import math
+
+from OpenGL.GL import *
+from OpenGL.GLU import *
+
+SPHERE_LEVELS = (6, 8, 12, 16, 24, 32, 40, 50)  # Slices (= stacks) of the pre-tessellated spheres
+PIXEL_ERROR = 0.5  # Max distance in pixels between the true silhouette and the tessellated one
+
+
+class SphereLOD:
+    """Unit spheres compiled once at several resolutions, picked per draw by projected size.
+
+    The camera position and viewport are set every frame from display()/reshape(); spheres far
+    from the camera or tiny on screen get fewer slices, up close they go up to the caller's max.
+    """
+
+    def __init__(self, levels=SPHERE_LEVELS, pixel_error=PIXEL_ERROR, fov_y=45.0):
+        self.levels = tuple(sorted(levels))
+        self.pixel_error = pixel_error
+        self.fov_y = fov_y
+        self.viewport_height = 960
+        self.camera_pos = (0.0, 0.0, 50.0)
+        self.lists = {}  # slices -> display list id
+
+    def build(self):
+        quadric = gluNewQuadric()
+        gluQuadricNormals(quadric, GLU_SMOOTH)
+        for slices in self.levels:
+            if slices not in self.lists:
+                list_id = glGenLists(1)
+                glNewList(list_id, GL_COMPILE)
+                gluSphere(quadric, 1.0, slices, slices)
+                glEndList()
+                self.lists[slices] = list_id
+        gluDeleteQuadric(quadric)
+
+    def set_view(self, camera_pos, viewport_height=None):
+        self.camera_pos = camera_pos
+        if viewport_height is not None:
+            self.viewport_height = max(1, viewport_height)
+
+    def projected_radius(self, center, radius):
+        # Approximate on-screen radius in pixels of a sphere at center
+        distance = math.dist(center, self.camera_pos)
+        if distance <= radius:
+            return float("inf")
+        pixels_per_unit = (self.viewport_height / 2) / math.tan(math.radians(self.fov_y / 2))
+        return radius / distance * pixels_per_unit
+
+    def select_level(self, center, radius, max_slices=SPHERE_LEVELS[-1]):
+        # A polygon with n sides deviates from its circle by r * (1 - cos(pi / n)) ~ r * (pi / n)^2 / 2,
+        # so keeping that under pixel_error needs n >= pi * sqrt(r / (2 * pixel_error))
+        radius_px = self.projected_radius(center, radius)
+        needed = math.pi * math.sqrt(radius_px / (2 * self.pixel_error)) if radius_px != float("inf") else max_slices
+        for slices in self.levels:
+            if slices >= needed or slices >= max_slices:
+                return min(slices, max_slices)
+        return min(self.levels[-1], max_slices)
+
+    def draw(self, radius, slices):
+        # Draws the closest compiled level at or above slices, scaled to radius
+        if not self.lists:
+            self.build()
+        level = next((s for s in self.levels if s >= slices), self.levels[-1])
+        glPushMatrix()
+        glScalef(radius, radius, radius)
+        glCallList(self.lists[level])
+        glPopMatrix()
@@ -0,0 +1,164 @@
+import argparse
+import ctypes
+import os
+import queue
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# The GL platform has to be chosen before OpenGL is imported anywhere, so import this module
+# before simulation. Without a display server Mesa's surfaceless EGL platform is used.
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+    os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+import numpy as np
+from OpenGL import EGL
+from OpenGL.GL import *
+
+import simulation
+
+
+def encode_png(pixels, path, compression=6):
+    # pixels: (height, width, 3) uint8, bottom row first as read back from GL
+    height, width, _ = pixels.shape
+    rows = np.empty((height, 1 + width * 3), np.uint8)
+    rows[:, 0] = 0  # Filter type "None" for every scanline
+    rows[:, 1:] = pixels[::-1].reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), compression)))
+        f.write(chunk(b"IEND", b""))
+
+
+class OffscreenRenderer:
+    """Runs the simulation's draw pipeline in a window-less EGL context into a framebuffer object."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._create_context()
+        self._create_framebuffer()
+
+        simulation.init_gl()
+        simulation.reshape(width, height)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+
+    def _create_context(self):
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(self.display, None, None):
+            raise RuntimeError("Could not initialize EGL")
+
+        config_attribs = (EGL.EGLint * 7)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                          EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE, 0, 0)
+        config = EGL.EGLConfig()
+        num_configs = EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1,
+                                   ctypes.pointer(num_configs)) or num_configs.value == 0:
+            raise RuntimeError("No EGL config with desktop OpenGL support")
+
+        # Rendering goes to the framebuffer object, the pbuffer only makes the context current
+        surface_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, surface_attribs)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("Could not make the EGL context current")
+
+    def _create_framebuffer(self):
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+
+        self.renderbuffers = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.renderbuffers[0])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.renderbuffers[0])
+        glBindRenderbuffer(GL_RENDERBUFFER, self.renderbuffers[1])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.renderbuffers[1])
+
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Offscreen framebuffer is incomplete")
+
+    def render(self, out):
+        # Draws one frame and reads it back into out, a reused (height, width, 3) uint8 array
+        simulation.render_scene()
+        glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE, out)
+        return out
+
+    def close(self):
+        glDeleteFramebuffers(1, [self.framebuffer])
+        glDeleteRenderbuffers(2, self.renderbuffers)
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglDestroySurface(self.display, self.surface)
+
+
+def render_sequence(output_dir, frames, width=1280, height=960, dt=1 / 30, replay_path=None,
+                    workers=None, name_format="frame_{:06d}.png"):
+    os.makedirs(output_dir, exist_ok=True)
+    if replay_path is not None:
+        simulation.load_replay(replay_path)
+
+    renderer = OffscreenRenderer(width, height)
+    workers = workers or os.cpu_count() or 1
+
+    # A small pool of readback buffers: rendering waits for a free one if encoding falls behind
+    free_buffers = queue.Queue()
+    for _ in range(workers * 2):
+        free_buffers.put(np.empty((height, width, 3), np.uint8))
+
+    def encode(pixels, path):
+        try:
+            encode_png(pixels, path)
+        finally:
+            free_buffers.put(pixels)
+
+    started = time.perf_counter()
+    futures = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:  # zlib releases the GIL while compressing
+            for frame in range(frames):
+                if simulation.replay is not None:
+                    simulation.replay.advance(dt)
+                    simulation.replay.apply(simulation.engine)
+                else:
+                    simulation.engine.step(dt)
+
+                pixels = renderer.render(free_buffers.get())
+                futures.append(pool.submit(encode, pixels, os.path.join(output_dir, name_format.format(frame))))
+        for future in futures:
+            future.result()  # Surface encoding errors
+    finally:
+        renderer.close()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the simulation to numbered PNG images without a window.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=960)
+    parser.add_argument("--dt", type=float, default=1 / 30, help="Simulated (or replayed) seconds per frame")
+    parser.add_argument("--replay", default=None, help="Recording directory to render instead of live physics")
+    parser.add_argument("--yaw", type=float, default=simulation.camera_yaw)
+    parser.add_argument("--pitch", type=float, default=simulation.camera_pitch)
+    parser.add_argument("--distance", type=float, default=simulation.camera_distance)
+    parser.add_argument("--workers", type=int, default=None, help="PNG encoder threads (default: all cores)")
+    args = parser.parse_args()
+
+    simulation.camera_yaw = args.yaw
+    simulation.camera_pitch = args.pitch
+    simulation.camera_distance = args.distance
+
+    elapsed = render_sequence(args.output_dir, args.frames, args.width, args.height, args.dt,
+                              args.replay, args.workers)
+    print(f"Frames: {args.frames} at {args.width}x{args.height} in {elapsed:.2f} s "
+          f"-> {args.frames / elapsed:.1f} FPS")
@@ -0,0 +1,168 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from energy_yield import make_time_range, sun_series
+from ephemeris import day_of_year
+from irradiance import ALBEDO, clear_sky_irradiance
+from solar import IRRADIANCE, PANEL_AREA, PANEL_EFFICIENCY, compute_angle_efficiencies
+
+# Orientation limits, same as the tilt/azimuth sliders in controls.py
+ANGLE_MIN = -90.0
+ANGLE_MAX = 90.0
+
+MAX_BLOCK_SIZE = 4_000_000  # Max candidates x samples evaluated at once, bounds worker memory
+
+# Daytime sun series of the site, set once per worker process by _init_worker
+_sun_altitude = None
+_sun_azimuth = None
+_dni = None  # Beam irradiance per sample, W/m²
+_diffuse = None  # (sky diffuse, ground reflected) irradiance summed over the samples for a flat panel
+_energy_scale = None
+
+
+@dataclass
+class OptimizationResult:
+    """Best orientation found plus the coarse energy surface and run statistics."""
+    tilt: float
+    azimuth: float
+    energy: float  # Wh over the date range at the optimum
+    surface_tilts: np.ndarray  # coarse grid axes (degrees)
+    surface_azimuths: np.ndarray
+    surface_energy: np.ndarray  # Wh, shape (len(surface_tilts), len(surface_azimuths))
+    evaluations: int
+    elapsed: float  # wall-clock seconds
+    workers: int
+
+    @property
+    def throughput(self):
+        # Orientations evaluated per second
+        return self.evaluations / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+def _init_worker(sun_altitude, sun_azimuth, dni, diffuse, energy_scale):
+    global _sun_altitude, _sun_azimuth, _dni, _diffuse, _energy_scale
+    _sun_altitude = sun_altitude
+    _sun_azimuth = sun_azimuth
+    _dni = dni
+    _diffuse = diffuse
+    _energy_scale = energy_scale
+
+
+def _evaluate_chunk(tilts, azimuths):
+    # Integrated energy (Wh) for each (tilt, azimuth) candidate of the chunk
+    block = max(1, MAX_BLOCK_SIZE // max(1, len(_sun_altitude)))
+    energies = np.empty(len(tilts))
+    for i in range(0, len(tilts), block):
+        efficiency = compute_angle_efficiencies(tilts[i:i + block, None], azimuths[i:i + block, None],
+                                                _sun_altitude, _sun_azimuth)
+        energies[i:i + block] = efficiency @ _dni
+
+    # Isotropic diffuse only depends on the tilt, so its sum over time is scaled once per candidate
+    cos_tilt = np.cos(np.radians(tilts))
+    sky_diffuse, ground_reflected = _diffuse
+    energies += sky_diffuse * (1 + cos_tilt) / 2 + ground_reflected * (1 - cos_tilt) / 2
+    return energies * _energy_scale
+
+
+def _evaluate(pool, workers, tilts, azimuths):
+    if pool is None:
+        return _evaluate_chunk(tilts, azimuths)
+
+    # A few chunks per worker so uneven chunks still keep every core busy
+    chunks = max(1, min(len(tilts), workers * 4))
+    futures = [pool.submit(_evaluate_chunk, t, a)
+               for t, a in zip(np.array_split(tilts, chunks), np.array_split(azimuths, chunks))]
+    return np.concatenate([f.result() for f in futures])
+
+
+def optimize_orientation(latitude, start, end, step_minutes=60, coarse_step=10.0, tolerance=0.1,
+                         workers=None, irradiance=IRRADIANCE, panel_area=PANEL_AREA,
+                         panel_efficiency=PANEL_EFFICIENCY, clear_sky=True, albedo=ALBEDO):
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    # Only daytime samples contribute energy, so drop the night before fanning out
+    times = make_time_range(start, end, step_minutes)
+    sun_altitude, sun_azimuth = sun_series(latitude, times)
+    daytime = sun_altitude > 0
+    sun_altitude = np.ascontiguousarray(sun_altitude[daytime])
+    sun_azimuth = np.ascontiguousarray(sun_azimuth[daytime])
+    energy_scale = panel_area * panel_efficiency * (step_minutes / 60.0)
+
+    # Same irradiance model as energy_yield.simulate_yield
+    if clear_sky:
+        dni, dhi, ghi = clear_sky_irradiance(sun_altitude, day_of_year(times[daytime]))
+        diffuse = (float(dhi.sum()), float(albedo * ghi.sum()))
+    else:
+        dni = np.full(len(sun_altitude), float(irradiance))
+        diffuse = (0.0, 0.0)
+
+    init_args = (sun_altitude, sun_azimuth, dni, diffuse, energy_scale)
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args)
+    else:
+        _init_worker(*init_args)
+
+    try:
+        # Coarse grid sweep over the whole slider range
+        surface_tilts = np.arange(ANGLE_MIN, ANGLE_MAX + coarse_step / 2, coarse_step)
+        surface_azimuths = np.arange(ANGLE_MIN, ANGLE_MAX + coarse_step / 2, coarse_step)
+        grid_tilts, grid_azimuths = np.meshgrid(surface_tilts, surface_azimuths, indexing="ij")
+        surface_energy = _evaluate(pool, workers, grid_tilts.ravel(), grid_azimuths.ravel())
+        evaluations = surface_energy.size
+
+        best = int(np.argmax(surface_energy))
+        best_tilt, best_azimuth = grid_tilts.ravel()[best], grid_azimuths.ravel()[best]
+        best_energy = surface_energy[best]
+        surface_energy = surface_energy.reshape(grid_tilts.shape)
+
+        # Local refinement: 5x5 grid around the best point, halving the spacing each round
+        step = coarse_step / 2
+        offsets = np.linspace(-2, 2, 5)
+        while step >= tolerance:
+            tilts, azimuths = np.meshgrid(best_tilt + offsets * step, best_azimuth + offsets * step, indexing="ij")
+            tilts = np.clip(tilts.ravel(), ANGLE_MIN, ANGLE_MAX)
+            azimuths = np.clip(azimuths.ravel(), ANGLE_MIN, ANGLE_MAX)
+            energies = _evaluate(pool, workers, tilts, azimuths)
+            evaluations += energies.size
+
+            best = int(np.argmax(energies))
+            if energies[best] > best_energy:
+                best_tilt, best_azimuth, best_energy = tilts[best], azimuths[best], energies[best]
+            step /= 2
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return OptimizationResult(float(best_tilt), float(best_azimuth), float(best_energy),
+                              surface_tilts, surface_azimuths, surface_energy,
+                              evaluations, time.perf_counter() - started, workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the panel tilt/azimuth with the maximum energy yield.")
+    parser.add_argument("--latitude", type=float, default=40.0)
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end", default="2026-01-01")
+    parser.add_argument("--step", type=float, default=60, help="Time step in minutes")
+    parser.add_argument("--coarse-step", type=float, default=10.0, help="Coarse grid spacing in degrees")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--fixed-irradiance", action="store_true",
+                        help="Constant 1000 W/m² beam instead of the clear-sky model")
+    args = parser.parse_args()
+
+    result = optimize_orientation(args.latitude, args.start, args.end, args.step,
+                                  coarse_step=args.coarse_step, workers=args.workers,
+                                  clear_sky=not args.fixed_irradiance)
+
+    print(f"Optimal Tilt: {result.tilt:.2f}°")
+    print(f"Optimal Azimuth: {result.azimuth:.2f}°")
+    print(f"Energy: {result.energy / 1000:.1f} kWh")
+    print(f"Evaluations: {result.evaluations} in {result.elapsed:.2f} s on {result.workers} worker(s) "
+          f"-> {result.throughput:,.0f} orientations/s")
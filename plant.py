@@ -0,0 +1,187 @@
+import argparse
+import time
+
+import numpy as np
+
+from irradiance import ALBEDO, clear_sky_irradiance, plane_of_array
+from shading import unique_keys
+from solar import PANEL_AREA, PANEL_EFFICIENCY, compute_solar_efficiencies, get_panel_normals, get_sun_directions
+
+MAX_BLOCK_SIZE = 4_000_000  # Max panels x timestamps evaluated at once, bounds memory of output_series
+
+
+class PVPlant:
+    """Many panels as contiguous per-panel arrays (structure of arrays) instead of panel objects.
+
+    positions is (n, 3) in scene units; tilt, azimuth (degrees), area (m²) and efficiency are (n,)
+    and accept scalars for uniform plants. Per-step power uses the same panel normal / cosine math
+    as the single panel, broadcast over all panels at once.
+    """
+
+    def __init__(self, positions, tilt=0.0, azimuth=0.0, area=PANEL_AREA, efficiency=PANEL_EFFICIENCY):
+        self.positions = np.ascontiguousarray(positions, dtype=float).reshape(-1, 3)
+        count = len(self.positions)
+        self.area = np.ascontiguousarray(np.broadcast_to(area, count), dtype=float)
+        self.efficiency = np.ascontiguousarray(np.broadcast_to(efficiency, count), dtype=float)
+        self.set_orientation(tilt, azimuth)
+        self.shading = None  # Optional shading.ShadingEngine; scales each panel's beam by its lit fraction
+
+        # Outputs of the last step(), per panel
+        self.panel_poa = np.zeros(count)  # W/m²
+        self.panel_power = np.zeros(count)  # W
+
+    @classmethod
+    def grid(cls, rows, columns, row_pitch=4.0, column_pitch=1.1, origin=(0.0, 0.0, 0.0), **kwargs):
+        # Regular field: rows along z (north-south pitch), panels of a row along x
+        z, x = np.meshgrid(np.arange(rows) * row_pitch, np.arange(columns) * column_pitch, indexing="ij")
+        positions = np.stack((x.ravel(), np.zeros(x.size), z.ravel()), axis=-1) + origin
+        return cls(positions, **kwargs)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def total_area(self):
+        return float(self.area.sum())
+
+    def set_orientation(self, tilt, azimuth):
+        count = len(self.positions)
+        tilt = np.broadcast_to(tilt, count)
+        azimuth = np.broadcast_to(azimuth, count)
+        if hasattr(self, "tilt") and np.array_equal(tilt, self.tilt) and np.array_equal(azimuth, self.azimuth):
+            return  # A tracker holding still (or at night) re-sends the same angles every step
+        self.tilt = np.ascontiguousarray(tilt, dtype=float)
+        self.azimuth = np.ascontiguousarray(azimuth, dtype=float)
+        self.normals = get_panel_normals(self.tilt, self.azimuth)
+        self.cos_tilt = np.ascontiguousarray(self.normals[:, 1])
+
+        # Output per W/m² of beam (area x efficiency), and of sky / ground diffuse, which do not
+        # depend on the sun position and so fold into one constant each for the whole plant
+        self.weights = self.area * self.efficiency
+        self._sky_factor = (1 + self.cos_tilt) / 2
+        self._ground_factor = (1 - self.cos_tilt) / 2
+        self.sky_weight = float(self.weights @ self._sky_factor)
+        self.ground_weight = float(self.weights @ self._ground_factor)
+        self._sky_area = float(self.area @ self._sky_factor)  # The same for the incident power
+        self._ground_area = float(self.area @ self._ground_factor)
+        if getattr(self, "shading", None) is not None:
+            self.shading.set_orientation(self.tilt, self.azimuth)
+
+    def step(self, sun_direction, dni, dhi, ghi, albedo=ALBEDO):
+        """Plant (p_in, p_out) in W for one sun direction; per-panel values go to panel_poa/panel_power."""
+        cos_incidence = compute_solar_efficiencies(self.normals, sun_direction)
+        np.multiply(cos_incidence, dni, out=self.panel_poa)
+        if self.shading is not None:
+            self.panel_poa *= 1.0 - self.shading.shaded_fractions(sun_direction)
+        self.panel_poa += dhi * self._sky_factor
+        self.panel_poa += ghi * albedo * self._ground_factor
+        np.multiply(self.panel_poa, self.weights, out=self.panel_power)
+        return float(self.panel_poa @ self.area), float(self.panel_power.sum())
+
+    def output_series(self, sun_altitude, sun_azimuth, dni, dhi, ghi, albedo=ALBEDO, tracker=None, seconds=np.inf):
+        """Plant output power (W) for each timestamp of a series, evaluated panels x timestamps in blocks.
+
+        With a tracker.SunTracker every panel follows the same tracked orientation (seconds apart
+        for its slew limit) instead of its own tilt/azimuth.
+        """
+        sun_directions = get_sun_directions(sun_altitude, sun_azimuth)
+        if tracker is None:
+            return self.power_series(sun_directions, dni, dhi, ghi, albedo)[1]
+        tilt, azimuth = tracker.series(sun_directions, seconds, self.tilt.mean(), self.azimuth.mean())
+        return self.power_series(sun_directions, dni, dhi, ghi, albedo, tilt, azimuth)[1]
+
+    def power_series(self, sun_directions, dni, dhi, ghi, albedo=ALBEDO, tilt=None, azimuth=None):
+        """Plant (p_in, p_out) in W for each timestamp, what step() would return for each in turn.
+
+        tilt/azimuth series turn all panels to that orientation at each timestamp (a tracker, as
+        set_orientation() would); without them the panels keep their own.
+        """
+        sun_directions = np.asarray(sun_directions, dtype=float).reshape(-1, 3)
+        count = len(sun_directions)
+        dni, dhi, ghi = (np.broadcast_to(np.asarray(c, dtype=float), count) for c in (dni, dhi, ghi))
+        if tilt is not None:
+            return self._tracked_power_series(sun_directions, dni, dhi, ghi, albedo, tilt, azimuth)
+        p_in = dhi * self._sky_area + ghi * albedo * self._ground_area
+        p_out = dhi * self.sky_weight + ghi * albedo * self.ground_weight
+        if self.shading is not None:
+            keys, key_index = unique_keys(self.shading.quantize_directions(sun_directions))
+
+        # Beam needs the full panels x timestamps cosine matrix; the panel normals are unit vectors,
+        # so the cosine is a plain matrix product, clipped like compute_solar_efficiencies
+        block = max(1, MAX_BLOCK_SIZE // max(1, len(self)))
+        for i in range(0, count, block):
+            cosines = self.normals @ sun_directions[i:i + block].T
+            np.clip(cosines, 0.0, 1.0, out=cosines)
+            if self.shading is not None:
+                # One cached shadow mask per distinct sun position in the block
+                present, column = np.unique(key_index[i:i + block], return_inverse=True)
+                masks = np.stack([self.shading.mask(tuple(key)) for key in keys[present].tolist()], axis=1)
+                cosines *= 1.0 - masks[:, column.ravel()]
+            p_in[i:i + block] += (self.area @ cosines) * dni[i:i + block]
+            p_out[i:i + block] += (self.weights @ cosines) * dni[i:i + block]
+        return p_in, p_out
+
+    def _tracked_power_series(self, sun_directions, dni, dhi, ghi, albedo, tilt, azimuth):
+        # One orientation per timestamp shared by all panels, so the panel sums are the total area / weight,
+        # apart from the beam on shaded panels: that only depends on the (orientation, sun) shading key
+        normals = get_panel_normals(tilt, azimuth)
+        cos_incidence = np.clip(np.einsum("ij,ij->i", normals, sun_directions), 0.0, 1.0)
+        poa = plane_of_array(cos_incidence, normals[:, 1], dni, dhi, ghi, albedo)
+        total_area, total_weight = self.area.sum(), self.weights.sum()
+        p_in, p_out = poa.total * total_area, poa.total * total_weight
+        if self.shading is None:
+            return p_in, p_out
+
+        q = self.shading.quantum
+        keys, key_index = unique_keys(np.concatenate((np.round(np.stack((tilt, azimuth), axis=1) / q) * q,
+                                                      self.shading.quantize_directions(sun_directions)), axis=1))
+        shaded_area, shaded_weight = np.empty(len(keys)), np.empty(len(keys))
+        for i, (tilt_key, azimuth_key, altitude_key, sun_azimuth_key) in enumerate(keys.tolist()):
+            self.shading.set_orientation(tilt_key, azimuth_key)
+            mask = self.shading.mask((altitude_key, sun_azimuth_key))
+            shaded_area[i], shaded_weight[i] = self.area @ mask, self.weights @ mask
+        self.shading.set_orientation(self.tilt, self.azimuth)  # Back to the plant's own orientation
+        p_in -= poa.beam * shaded_area[key_index]
+        p_out -= poa.beam * shaded_weight[key_index]
+        return p_in, p_out
+
+
+if __name__ == "__main__":
+    from ephemeris import Site, day_of_year, sun_positions
+    from energy_yield import make_time_range
+    from tracker import TRACKER_MODES, SunTracker
+
+    parser = argparse.ArgumentParser(description="Clear-sky output of a grid PV plant over a date range.")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--columns", type=int, default=500)
+    parser.add_argument("--tilt", type=float, default=30.0)
+    parser.add_argument("--azimuth", type=float, default=0.0)
+    parser.add_argument("--latitude", type=float, default=40.0)
+    parser.add_argument("--longitude", type=float, default=0.0)
+    parser.add_argument("--start", default="2025-06-21")
+    parser.add_argument("--end", default="2025-06-22")
+    parser.add_argument("--step", type=float, default=1, help="Time step in minutes")
+    parser.add_argument("--tracker", choices=TRACKER_MODES, default=None, help="Panels follow the sun")
+    parser.add_argument("--backtracking", action="store_true", help="Single-axis rows avoid shading each other")
+    args = parser.parse_args()
+
+    plant = PVPlant.grid(args.rows, args.columns, tilt=args.tilt, azimuth=args.azimuth)
+    times = make_time_range(args.start, args.end, args.step)
+    sun_altitude, sun_azimuth = sun_positions(Site(args.latitude, args.longitude), times)
+    dni, dhi, ghi = clear_sky_irradiance(sun_altitude, day_of_year(times))
+
+    started = time.perf_counter()
+    sun_direction = get_sun_directions(sun_altitude[len(times) // 2], sun_azimuth[len(times) // 2])
+    plant.step(sun_direction, dni[len(times) // 2], dhi[len(times) // 2], ghi[len(times) // 2])
+    step_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    tracker = SunTracker(args.tracker, backtracking=args.backtracking) if args.tracker else None
+    power = plant.output_series(sun_altitude, sun_azimuth, dni, dhi, ghi, tracker=tracker, seconds=args.step * 60)
+    elapsed = time.perf_counter() - started
+
+    print(f"Panels: {len(plant)} ({plant.total_area:.0f} m²)")
+    print(f"Single step: {step_time * 1000:.2f} ms")
+    print(f"Series: {len(times)} steps in {elapsed:.2f} s -> {elapsed / len(times) * 1000:.3f} ms/step")
+    print(f"Peak Output Power: {power.max() / 1000:.1f} kW")
+    print(f"Energy: {power.sum() * args.step / 60 / 1000:.1f} kWh")
@@ -0,0 +1,119 @@
+import json
+import time
+
+import numpy as np
+
+
+class FrameProfiler:
+    """Rolling per-pass timings of the render loop: min / avg / p99 over the last `window` samples.
+
+    Passes are run through run(name, fn, *args), which only reads the clock while the profiler is
+    enabled, so leaving the calls in place costs one attribute check per pass. `sync` (e.g. glFinish)
+    is called after each timed pass so GL work is charged to the pass that issued it rather than to
+    whichever call happens to block later.
+    """
+
+    def __init__(self, window=240, sync=None):
+        self.window = window
+        self.sync = sync
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.samples = {}  # Pass name -> ring buffer of durations in seconds
+        self.counts = {}
+        self.frame_samples = {}  # "interval" between frame starts and "duration" of drawing, same layout
+        self.frame_counts = {}
+        self.frame_start = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.reset()
+
+    def _add(self, samples, counts, name, seconds):
+        ring = samples.get(name)
+        if ring is None:
+            ring = samples[name] = np.zeros(self.window)
+            counts[name] = 0
+        ring[counts[name] % self.window] = seconds
+        counts[name] += 1
+
+    def _recent(self, samples, counts, name):
+        # The samples still in the window, oldest first
+        ring = samples.get(name)
+        if ring is None:
+            return np.zeros(0)
+        count = counts[name]
+        if count <= self.window:
+            return ring[:count]
+        start = count % self.window
+        return np.concatenate((ring[start:], ring[:start]))
+
+    def add(self, name, seconds):
+        self._add(self.samples, self.counts, name, seconds)
+
+    def run(self, name, fn, *args):
+        if not self.enabled:
+            return fn(*args)
+        started = time.perf_counter()
+        result = fn(*args)
+        if self.sync is not None:
+            self.sync()
+        self.add(name, time.perf_counter() - started)
+        return result
+
+    def begin_frame(self, now=None):
+        if not self.enabled:
+            return
+        now = time.perf_counter() if now is None else now
+        if self.frame_start is not None:
+            self._add(self.frame_samples, self.frame_counts, "interval", now - self.frame_start)
+        self.frame_start = now
+
+    def end_frame(self, now=None):
+        if not self.enabled or self.frame_start is None:
+            return
+        now = time.perf_counter() if now is None else now
+        self._add(self.frame_samples, self.frame_counts, "duration", now - self.frame_start)
+
+    def stats(self):
+        # Pass name -> {"min", "avg", "p99"} in milliseconds, slowest average first
+        result = {}
+        for name in self.samples:
+            recent = self._recent(self.samples, self.counts, name) * 1000
+            result[name] = {"min": float(recent.min()), "avg": float(recent.mean()),
+                            "p99": float(np.percentile(recent, 99)), "count": self.counts[name]}
+        return dict(sorted(result.items(), key=lambda item: item[1]["avg"], reverse=True))
+
+    def frame_stats(self):
+        # FPS from the spacing of frames, frame time from the time spent drawing them
+        intervals = self._recent(self.frame_samples, self.frame_counts, "interval")
+        durations = self._recent(self.frame_samples, self.frame_counts, "duration") * 1000
+        return {
+            "fps": 1.0 / intervals.mean() if intervals.size and intervals.mean() > 0 else 0.0,
+            "frame_ms": float(durations.mean()) if durations.size else 0.0,
+            "frame_p99_ms": float(np.percentile(durations, 99)) if durations.size else 0.0,
+            "frames": self.frame_counts.get("duration", 0),
+        }
+
+    def lines(self, top=5):
+        # HUD text: frame summary followed by the most expensive passes
+        frame = self.frame_stats()
+        lines = [f"FPS: {frame['fps']:.1f}  frame: {frame['frame_ms']:.2f} ms (p99 {frame['frame_p99_ms']:.2f})"]
+        for name, s in list(self.stats().items())[:top]:
+            lines.append(f"{name}: {s['avg']:.2f} ms  min {s['min']:.2f}  p99 {s['p99']:.2f}")
+        return lines
+
+    def export(self, path):
+        # Summary plus the raw samples of the current window, in milliseconds
+        document = {
+            "window": self.window,
+            "frame": self.frame_stats(),
+            "passes": self.stats(),
+            "samples_ms": {name: (self._recent(self.samples, self.counts, name) * 1000).tolist()
+                           for name in self.samples},
+            "frame_durations_ms": (self._recent(self.frame_samples, self.frame_counts, "duration") * 1000).tolist(),
+        }
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+        return path
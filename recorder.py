@@ -0,0 +1,176 @@
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from state import SCALAR_FIELDS
+
+HEADER_FILE = "header.json"
+FORMAT_VERSION = 1
+
+# Recorded channels: name, dtype, per-sample shape (None = one value per battery)
+CHANNELS = (
+    ("time", "<f8", ()),
+    ("steps", "<i8", ()),
+    ("tilt_angle", "<f4", ()),
+    ("azimuth_angle", "<f4", ()),
+    ("panel_pos_x", "<f4", ()),
+    ("sun_pos_x", "<f4", ()),
+    ("sun_altitude", "<f4", ()),
+    ("sun_azimuth", "<f4", ()),
+    ("battery_enabled", "u1", ()),
+    ("efficiency", "<f4", ()),
+    ("p_in", "<f4", ()),
+    ("p_out", "<f4", ()),
+    ("ipo", "<f4", ()),
+    ("battery_soc", "<f4", None),
+)
+
+
+class Recorder:
+    """Streams FrameSnapshots to disk as one raw binary column file per channel plus a JSON header.
+
+    Samples go into preallocated column chunks; full chunks are handed to a background writer and
+    their buffers reused, so recording allocates nothing per step and holds at most
+    (max_pending + 1) chunks in memory. If the writer falls behind, record() waits for a free chunk.
+    The header is rewritten after every chunk, so a recording can be opened while it grows.
+    """
+
+    def __init__(self, path, battery_count, chunk_rows=65536, max_pending=3):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.battery_count = battery_count
+        self.chunk_rows = chunk_rows
+        self.channels = [(name, np.dtype(dtype), (battery_count,) if shape is None else shape)
+                         for name, dtype, shape in CHANNELS]
+        self._scalar_names = [name for name, _, shape in self.channels if shape == ()]
+        self._scalar_fields = [(name, SCALAR_FIELDS.index(name)) for name in self._scalar_names]
+
+        self._free = queue.Queue()
+        for _ in range(max_pending + 1):
+            self._free.put({name: np.zeros((chunk_rows,) + shape, dtype) for name, dtype, shape in self.channels})
+        self._full = queue.Queue()
+
+        self._files = {name: open(os.path.join(path, f"{name}.bin"), "wb") for name, _, _ in self.channels}
+        self._current = self._free.get()
+        self._row = 0
+        self.rows = 0  # Samples recorded so far
+        self.rows_written = 0  # Samples flushed to disk so far
+
+        self._write_header()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def record(self, snapshot):
+        row = self._row
+        columns = self._current
+        for name in self._scalar_names:
+            columns[name][row] = getattr(snapshot, name)
+        columns["battery_soc"][row] = snapshot.battery_soc
+        self._next_row()
+
+    def record_frame(self, scalars, battery_soc):
+        # One sample from the values an exchange publishes (scalars in state.SCALAR_FIELDS order), no snapshot
+        row = self._row
+        columns = self._current
+        for name, index in self._scalar_fields:
+            columns[name][row] = scalars[index]
+        columns["battery_soc"][row] = battery_soc
+        self._next_row()
+
+    def _next_row(self):
+        self._row += 1
+        self.rows += 1
+        if self._row == self.chunk_rows:
+            self._flush_chunk()
+
+    def record_batch(self, columns):
+        # Many samples at once: {channel: array with one row per sample}, e.g. from SimulationEngine.run_batch
+        count = len(columns["time"])
+        done = 0
+        while done < count:
+            rows = min(count - done, self.chunk_rows - self._row)
+            for name, _, _ in self.channels:
+                self._current[name][self._row:self._row + rows] = columns[name][done:done + rows]
+            done += rows
+            self._row += rows
+            self.rows += rows
+            if self._row == self.chunk_rows:
+                self._flush_chunk()
+
+    def _flush_chunk(self):
+        self._full.put((self._current, self._row))
+        self._current = self._free.get()  # Blocks while every chunk is waiting to be written
+        self._row = 0
+
+    def _write_loop(self):
+        while True:
+            item = self._full.get()
+            if item is None:
+                break
+            columns, rows = item
+            for name, f in self._files.items():
+                f.write(columns[name][:rows])
+                f.flush()
+            self.rows_written += rows
+            self._write_header()
+            self._free.put(columns)
+
+    def _write_header(self):
+        header = {
+            "version": FORMAT_VERSION,
+            "rows": self.rows_written,
+            "battery_count": self.battery_count,
+            "channels": {name: {"dtype": dtype.str, "shape": list(shape)} for name, dtype, shape in self.channels},
+        }
+        tmp_path = os.path.join(self.path, HEADER_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, HEADER_FILE))
+
+    def close(self):
+        if self._writer is None:
+            return
+        if self._row:
+            self._full.put((self._current, self._row))
+        self._full.put(None)
+        self._writer.join()
+        self._writer = None
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Recording:
+    """Read-only view of a recording; every channel is a NumPy memmap, nothing is loaded up front."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            header = json.load(f)
+        if header["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {header['version']}")
+
+        self.path = path
+        self.rows = header["rows"]
+        self.battery_count = header.get("battery_count", 0)  # Other column sets (weather caches) have none
+        self.channels = {}
+        for name, spec in header["channels"].items():
+            dtype = np.dtype(spec["dtype"])
+            shape = (self.rows,) + tuple(spec["shape"])
+            if self.rows:
+                self.channels[name] = np.memmap(os.path.join(path, f"{name}.bin"), dtype, mode="r", shape=shape)
+            else:
+                self.channels[name] = np.empty(shape, dtype)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.channels[name]
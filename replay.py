@@ -0,0 +1,87 @@
+import numpy as np
+
+from recorder import Recording
+from solar import get_sun_direction
+
+REPLAY_SPEEDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)  # Playback speed steps (x real time)
+
+# Recorded channels copied straight onto the engine
+_FLOAT_CHANNELS = ("tilt_angle", "azimuth_angle", "panel_pos_x", "sun_pos_x", "sun_altitude", "sun_azimuth",
+                   "efficiency", "p_in", "p_out", "ipo")
+
+
+class ReplayPlayer:
+    """Plays a recorded run back into a SimulationEngine in place of its physics.
+
+    The playback clock advances by wall time x speed and the row shown is looked up by time, so
+    at high speeds intermediate rows are skipped rather than read. Only the rows actually shown
+    are touched in the memory-mapped recording.
+    """
+
+    def __init__(self, recording, speed=1):
+        if isinstance(recording, str):
+            recording = Recording(recording)
+        if not len(recording):
+            raise ValueError(f"Recording {recording.path} is empty")
+
+        self.recording = recording
+        self.times = recording["time"]
+        self.start_time = float(self.times[0])
+        self.end_time = float(self.times[-1])
+        self.position = self.start_time
+        self.row = 0
+        self.speed = speed
+        self.paused = False
+
+    def row_at(self, t):
+        row = int(np.searchsorted(self.times, t, side="right")) - 1
+        return min(max(row, 0), len(self.recording) - 1)
+
+    def seek(self, t):
+        self.position = min(max(t, self.start_time), self.end_time)
+        self.row = self.row_at(self.position)
+
+    def seek_fraction(self, fraction):
+        self.seek(self.start_time + fraction * (self.end_time - self.start_time))
+
+    def advance(self, wall_dt):
+        if not self.paused:
+            self.seek(self.position + wall_dt * self.speed)
+            if self.position >= self.end_time:
+                self.paused = True  # Hold the last frame at the end of the recording
+
+    def toggle_pause(self):
+        if self.paused and self.position >= self.end_time:
+            self.seek(self.start_time)  # Play again from the start
+        self.paused = not self.paused
+
+    def set_speed(self, speed):
+        self.speed = min(max(speed, REPLAY_SPEEDS[0]), REPLAY_SPEEDS[-1])
+
+    def faster(self):
+        self.set_speed(next((s for s in REPLAY_SPEEDS if s > self.speed), REPLAY_SPEEDS[-1]))
+
+    def slower(self):
+        self.set_speed(next((s for s in reversed(REPLAY_SPEEDS) if s < self.speed), REPLAY_SPEEDS[0]))
+
+    def apply(self, engine):
+        # Put the current row onto the engine the draw functions read from
+        recording = self.recording
+        row = self.row
+        for name in _FLOAT_CHANNELS:
+            setattr(engine, name, float(recording[name][row]))
+        engine.battery_enabled = bool(recording["battery_enabled"][row])
+        engine.sun_dir = get_sun_direction(engine.sun_altitude, engine.sun_azimuth)
+        np.multiply(recording["battery_soc"][row], engine.battery_bank.capacity, out=engine.battery_bank.energy)
+        engine.time = float(recording["time"][row])
+        engine.steps = int(recording["steps"][row])
+
+        # Keeps the control panel stats following the replay
+        engine.exchange.publish(engine.snapshot())
+
+    def status(self):
+        elapsed = self.position - self.start_time
+        hours, rest = divmod(int(elapsed), 3600)
+        minutes, seconds = divmod(rest, 60)
+        state = " [paused]" if self.paused else ""
+        return f"Replay {hours:02d}:{minutes:02d}:{seconds:02d} x{self.speed}{state}"
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+
+
+class RenderScheduler:
+    """Decides on each timer tick whether the scene needs redrawing, and how soon to tick again.
+
+    Callers feed it a snapshot of everything that affects the picture via observe(); a change marks
+    the frame dirty. Without changes the tick interval backs off to idle_interval, and pure animation
+    (the sun pulse) is redrawn at most animation_fps times per second.
+    """
+
+    def __init__(self, active_interval=16, idle_interval=250, animation_fps=10.0, idle_after=1.0):
+        self.active_interval = active_interval  # ms between ticks while things change (~60 FPS)
+        self.idle_interval = idle_interval  # ms between ticks once nothing has changed for a while
+        self.animation_fps = animation_fps  # Redraw budget for animation alone, 0 freezes it when idle
+        self.idle_after = idle_after  # Seconds without changes before backing off
+
+        self.interval = active_interval
+        self.dirty = True
+        self.last_state = None
+        self.last_change = time.perf_counter()
+        self.last_draw = 0.0
+
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+
+    def mark_dirty(self, now=None):
+        self.dirty = True
+        self.last_change = time.perf_counter() if now is None else now
+        self.interval = self.active_interval
+
+    def observe(self, state, now=None):
+        if state != self.last_state:
+            self.last_state = state
+            self.mark_dirty(now)
+
+    def tick(self, now=None):
+        # Returns True if a frame should be drawn for this tick
+        now = time.perf_counter() if now is None else now
+
+        draw = self.dirty
+        if not draw and self.animation_fps > 0:
+            draw = now - self.last_draw >= 1.0 / self.animation_fps
+
+        if not draw:
+            self.frames_skipped += 1
+
+        # Back off gradually once idle
+        if now - self.last_change > self.idle_after:
+            self.interval = min(self.idle_interval, self.interval * 2)
+        return draw
+
+    def frame_drawn(self, now=None):
+        self.dirty = False
+        self.last_draw = time.perf_counter() if now is None else now
+        self.frames_drawn += 1
+
+    def stats(self):
+        return {"drawn": self.frames_drawn, "skipped": self.frames_skipped, "interval_ms": self.interval}
+
+
+def quantize(values, step, previous=None):
+    """Values in whole multiples of step, so change signatures ignore changes too small to see.
+
+    Given the previous result, a value only moves to another multiple once it is a whole step away from
+    the previous one, so noise around a rounding boundary doesn't flip it back and forth.
+    """
+    scaled = np.asarray(values, dtype=float) / step
+    steps = np.round(scaled).astype(int)
+    if previous is None:
+        return steps
+    return np.where(np.abs(scaled - previous) >= 1, steps, previous)
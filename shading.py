@@ -0,0 +1,466 @@
+import argparse
+import math
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from solar import get_panel_normals, get_sun_directions
+
+LEAF_SIZE = 4  # Max occluders per BVH leaf
+SAMPLES_PER_SIDE = 4  # Each panel is sampled on a SAMPLES_PER_SIDE x SAMPLES_PER_SIDE grid of points
+SUN_QUANTUM = 1.0  # Degrees; sun positions are rounded to this before casting / caching
+CACHE_SIZE = 4096  # Shadow masks kept
+RAY_OFFSET = 1e-4  # Start rays this far off the panel surface
+SCENE_PANEL_SIZE = (6.0, 4.0)  # Width and length of the panel draw_panel_surface draws
+BANK_COLUMNS = 10  # Batteries per row of the bank
+BANK_ROW_PITCH = 4.0  # Distance between bank rows, towards the panel
+
+BOX, RECTANGLE = 0, 1
+
+
+def panel_axes(tilt_deg, azimuth_deg):
+    # Unit width axis (horizontal) and length axis (down the slope) of panels, (n, 3) each.
+    # Same rotations as draw_solar_panel: Ry(azimuth) * Rx(tilt) applied to the x and z axes.
+    tilt = np.radians(tilt_deg)
+    azimuth = np.radians(azimuth_deg)
+    zero = np.zeros_like(tilt * azimuth)
+    width_axis = np.stack(np.broadcast_arrays(np.cos(azimuth), zero, -np.sin(azimuth)), axis=-1)
+    length_axis = np.stack(np.broadcast_arrays(np.cos(tilt) * np.sin(azimuth), -np.sin(tilt),
+                                               np.cos(tilt) * np.cos(azimuth)), axis=-1)
+    return width_axis, length_axis
+
+
+def battery_layout(battery_count):
+    """Battery centers in the bank's own frame: rows of BANK_COLUMNS, 2.5 apart, rows BANK_ROW_PITCH apart."""
+    i = np.arange(battery_count)
+    return np.stack((2.0 + (i % BANK_COLUMNS) * 2.5, np.zeros(battery_count), (i // BANK_COLUMNS) * BANK_ROW_PITCH),
+                    axis=-1)
+
+
+def scene_occluders(battery_count=5):
+    """Boxes (mins, maxs) of the house and battery bank as drawn by simulation.py."""
+    boxes = [
+        # House base: translated to (25, -2.6, -5) and scaled 4x in draw_house
+        ((17.0, -2.6, -13.0), (33.0, 5.4, 3.0)),
+        # Gable roof up to y = 11.4, approximated by three narrowing slabs
+        ((19.67, 5.4, -13.0), (30.33, 7.4, 3.0)),
+        ((21.0, 7.4, -13.0), (29.0, 9.4, 3.0)),
+        ((23.67, 9.4, -13.0), (26.33, 11.4, 3.0)),
+    ]
+    # Batteries: 2 x 3 x 3 boxes, rotated -90° about y around (15, -1, -13), so bank x is world z
+    # and bank z is world -x
+    local = battery_layout(battery_count)
+    centers = np.stack((15.0 - local[:, 2], np.full(battery_count, -1.0), -13.0 + local[:, 0]), axis=-1)
+    mins, maxs = zip(*boxes)
+    return (np.concatenate((mins, centers - (1.5, 1.5, 1.0))),
+            np.concatenate((maxs, centers + (1.5, 1.5, 1.0))))
+
+
+def _inverse(direction):
+    # 1 / direction, with a tiny component instead of 0 so slab arithmetic stays finite (no 0 * inf)
+    return 1.0 / np.where(np.asarray(direction) == 0, 1e-12, direction)
+
+
+def _slabs(mins, maxs, inv_direction):
+    # Box bounds as (entry, exit) ray parameters per axis, measured from the world origin
+    a = mins * inv_direction
+    b = maxs * inv_direction
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def _max_xyz(v):
+    # Largest of the x, y, z components (last axis); NumPy reduces a length-3 axis far slower than
+    # it combines the three component arrays
+    return np.maximum(np.maximum(v[..., 0], v[..., 1]), v[..., 2])
+
+
+def _min_xyz(v):
+    return np.minimum(np.minimum(v[..., 0], v[..., 1]), v[..., 2])
+
+
+def _slab_hits(enter, leave, near, far, t_min):
+    # Ray / axis-aligned box test for paired rows, with the slabs already in ray parameter units;
+    # enter and leave are the ray starts in the same units (equal unless the ray is a box)
+    t_near = _max_xyz(near - enter)
+    t_far = _min_xyz(far - leave)
+    return t_far >= np.maximum(t_near, t_min)
+
+
+class BVH:
+    """Bounding volume hierarchy over item AABBs, flattened into arrays.
+
+    Rays are traversed breadth first as a whole batch: each round tests every live (ray, node)
+    pair at once and expands the hits into children, so the Python loop runs once per tree level
+    instead of once per ray.
+    """
+
+    def __init__(self, mins, maxs, leaf_size=LEAF_SIZE):
+        mins = np.asarray(mins, dtype=float)
+        maxs = np.asarray(maxs, dtype=float)
+        centers = (mins + maxs) / 2
+        order = np.arange(len(mins))
+
+        # Built a level at a time, like it is traversed: every node of a level with more than
+        # leaf_size items splits at the median of its item centers along their widest spread,
+        # all in one segmented sort. Nodes are numbered level by level.
+        level_start, level_count = np.zeros(1, dtype=int), np.array([len(order)])
+        start, count, depth, left, right = [], [], [], [], []
+        first_node = 0  # Number of the level's first node
+        while level_start.size:
+            split = level_count > leaf_size
+            splits = int(split.sum())
+            children = first_node + len(level_start) + 2 * np.arange(splits)
+            start.append(level_start)
+            count.append(level_count)
+            depth.append(np.full(len(level_start), len(depth)))
+            left.append(np.full(len(level_start), -1))
+            right.append(np.full(len(level_start), -1))
+            left[-1][split], right[-1][split] = children, children + 1
+            first_node += len(level_start)
+
+            lo, size = level_start[split], level_count[split]
+            offsets = np.cumsum(size) - size
+            segment = np.repeat(np.arange(splits), size)
+            positions = np.repeat(lo, size) + np.arange(size.sum()) - np.repeat(offsets, size)
+            item_centers = centers[order[positions]]
+            if splits:
+                spread = np.maximum.reduceat(item_centers, offsets) - np.minimum.reduceat(item_centers, offsets)
+                key = item_centers[np.arange(len(positions)), spread.argmax(axis=1)[segment]]
+                order[positions] = order[positions[np.lexsort((key, segment))]]
+
+            mid = size // 2
+            level_start = np.stack((lo, lo + mid), axis=1).ravel()
+            level_count = np.stack((mid, size - mid), axis=1).ravel()
+
+        self.order = order
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.start = np.concatenate(start)
+        self.count = np.concatenate(count)
+        self.depth = np.concatenate(depth)
+        self.node_min = np.empty((len(self.start), 3))
+        self.node_max = np.empty((len(self.start), 3))
+        self.refit(mins, maxs)
+
+    def refit(self, mins, maxs):
+        """Moves the items to new boxes, keeping the tree: only node bounds are recomputed.
+
+        Much cheaper than a rebuild, and the tree stays good as long as items move little
+        relative to each other (e.g. panels turning about their own centers).
+        """
+        self.mins = np.asarray(mins, dtype=float)
+        self.maxs = np.asarray(maxs, dtype=float)
+
+        # Leaves, in item order, cover the items in consecutive ranges: one reduceat each
+        leaves = np.flatnonzero(self.left < 0)
+        leaves = leaves[np.argsort(self.start[leaves])]
+        self.node_min[leaves] = np.minimum.reduceat(self.mins[self.order], self.start[leaves])
+        self.node_max[leaves] = np.maximum.reduceat(self.maxs[self.order], self.start[leaves])
+
+        # Inner nodes bottom up, one tree level at a time
+        inner = self.left >= 0
+        for level in range(self.depth.max() - 1, -1, -1):
+            nodes = np.flatnonzero(inner & (self.depth == level))
+            left, right = self.left[nodes], self.right[nodes]
+            self.node_min[nodes] = np.minimum(self.node_min[left], self.node_min[right])
+            self.node_max[nodes] = np.maximum(self.node_max[left], self.node_max[right])
+
+    def candidates(self, origins, direction, t_min=0.0, extents=None):
+        """(ray, item) index pairs whose ray hits the item's bounding box, for rays that all run along `direction`.
+
+        With `extents` (half sizes, (n, 3)) each ray is a box swept along `direction` instead of a
+        point, and hits every item that some point of the box would; that lets a whole bundle of
+        nearby rays traverse the tree once.
+
+        Parallel rays share 1 / direction, so every box converts to ray parameters once per call
+        and a (ray, box) test only subtracts the ray's origin in the same units. Axes the rays run
+        parallel to get a tiny component instead of 0 (see _inverse). Rows are gathered with
+        take(), several times faster than fancy indexing for (n, 3) arrays.
+        """
+        inv_direction = _inverse(direction)
+        starts = origins * inv_direction
+        if extents is None:
+            enter = leave = starts
+        else:
+            # Growing the boxes by the ray's extents is the same as widening the ray
+            widen = np.abs(extents * inv_direction)
+            enter, leave = starts + widen, starts - widen
+        node_near, node_far = _slabs(self.node_min, self.node_max, inv_direction)
+
+        rays = np.arange(len(origins))
+        nodes = np.zeros(len(origins), dtype=int)
+        found_rays, found_items = [], []
+        while rays.size:
+            hit = _slab_hits(enter.take(rays, axis=0), leave.take(rays, axis=0), node_near.take(nodes, axis=0),
+                             node_far.take(nodes, axis=0), t_min)
+            rays, nodes = rays[hit], nodes[hit]
+
+            leaf = self.left[nodes] < 0
+            if leaf.any():
+                # Expand every leaf hit into one pair per item of the leaf
+                leaf_rays, leaf_nodes = rays[leaf], nodes[leaf]
+                counts = self.count[leaf_nodes]
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                found_rays.append(np.repeat(leaf_rays, counts))
+                found_items.append(self.order[np.repeat(self.start[leaf_nodes], counts) + offsets])
+
+            inner_rays, inner_nodes = rays[~leaf], nodes[~leaf]
+            rays = np.concatenate((inner_rays, inner_rays))
+            nodes = np.concatenate((self.left[inner_nodes], self.right[inner_nodes]))
+
+        if not found_rays:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        rays, items = np.concatenate(found_rays), np.concatenate(found_items)
+        item_near, item_far = _slabs(self.mins.take(items, axis=0), self.maxs.take(items, axis=0), inv_direction)
+        hit = _slab_hits(enter.take(rays, axis=0), leave.take(rays, axis=0), item_near, item_far, t_min)
+        return rays[hit], items[hit]
+
+
+def unique_keys(keys):
+    """Distinct rows of an (n, k) array of quantized cache keys, and the index of each row's key among them.
+
+    Consecutive time steps mostly share a key, so runs of equal rows are collapsed first and only
+    the run starts are sorted.
+    """
+    keys = np.asarray(keys, dtype=float)
+    if len(keys) == 0:
+        return keys, np.zeros(0, dtype=np.intp)
+    changed = keys[1:, 0] != keys[:-1, 0]
+    for column in range(1, keys.shape[1]):
+        changed |= keys[1:, column] != keys[:-1, column]
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+    unique, run_index = np.unique(keys[starts], axis=0, return_inverse=True)
+    return unique, np.repeat(run_index.ravel(), np.diff(np.append(starts, len(keys))))
+
+
+class ShadingEngine:
+    """Shaded fraction of each panel for a sun direction, by casting rays from points on the panels.
+
+    Occluders are axis-aligned boxes (buildings, batteries) plus the panels themselves as exact
+    rectangles, so rows shade each other. Results are cached per sun position rounded to
+    `quantum` degrees, which turns a year of time steps into a few thousand distinct casts.
+    """
+
+    def __init__(self, box_mins=None, box_maxs=None, samples=SAMPLES_PER_SIDE, quantum=SUN_QUANTUM,
+                 cache_size=CACHE_SIZE):
+        self.box_mins = np.zeros((0, 3)) if box_mins is None else np.asarray(box_mins, dtype=float).reshape(-1, 3)
+        self.box_maxs = np.zeros((0, 3)) if box_maxs is None else np.asarray(box_maxs, dtype=float).reshape(-1, 3)
+        self.samples = samples
+        # Sample points at the centers of a samples x samples grid on each panel, as coordinates
+        # along its half axes: center + a * half width axis + b * half length axis
+        grid = (np.arange(samples) + 0.5) / samples * 2 - 1
+        self.sample_a, self.sample_b = (g.ravel() for g in np.meshgrid(grid, grid, indexing="ij"))
+        self.quantum = quantum
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.set_panels(np.zeros((0, 3)), 0.0, 0.0, 1.0, 1.0)
+
+    @classmethod
+    def for_plant(cls, plant, box_mins=None, box_maxs=None, panel_width=1.0, **kwargs):
+        # Panels panel_width wide along the row, their length following from the plant's areas
+        shading = cls(box_mins, box_maxs, **kwargs)
+        shading.set_panels(plant.positions, plant.tilt, plant.azimuth, panel_width, plant.area / panel_width)
+        return shading
+
+    def set_panels(self, centers, tilt, azimuth, width, length):
+        """Places the shaded panels (which also occlude); drops cached masks."""
+        centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+        count = len(centers)
+        self.panel_count = count
+        self.rect_centers = centers
+        self.panel_width = np.broadcast_to(width, count)
+        self.panel_length = np.broadcast_to(length, count)
+        self._aim_panels(tilt, azimuth)
+        self.bvh = BVH(self.item_mins, self.item_maxs) if len(self.item_mins) else None
+
+    def set_orientation(self, tilt, azimuth):
+        """Re-aims the panels in place, e.g. after PVPlant.set_orientation.
+
+        Angles are rounded to the quantum like sun positions, so a tracker turning a little every
+        step keeps the cached masks until it has moved a whole quantum. Then the panels turn about
+        their centers, so the BVH is refitted rather than rebuilt, and cached masks are dropped.
+        """
+        q = self.quantum
+        tilt = np.round(np.broadcast_to(tilt, self.panel_count) / q) * q
+        azimuth = np.round(np.broadcast_to(azimuth, self.panel_count) / q) * q
+        if np.array_equal(tilt, self.panel_tilt) and np.array_equal(azimuth, self.panel_azimuth):
+            return
+        self._aim_panels(tilt, azimuth)
+        if self.bvh is not None:
+            self.bvh.refit(self.item_mins, self.item_maxs)
+
+    def _aim_panels(self, tilt, azimuth):
+        # Panel rectangles, occluder boxes and sample points for the current centers and sizes
+        count = self.panel_count
+        centers = self.rect_centers
+        tilt = np.array(np.broadcast_to(tilt, count), dtype=float)
+        azimuth = np.array(np.broadcast_to(azimuth, count), dtype=float)
+        width, length = self.panel_width, self.panel_length
+
+        width_axis, length_axis = panel_axes(tilt, azimuth)
+        self.panel_tilt, self.panel_azimuth = tilt, azimuth
+        self.normals = get_panel_normals(tilt, azimuth).reshape(-1, 3)
+        half_u = width_axis * (width[:, None] / 2)
+        half_v = length_axis * (length[:, None] / 2)
+
+        # Items: boxes first, then panel rectangles (center, half extents, normal)
+        self.first_panel = len(self.box_mins)
+        self.rect_u = half_u
+        self.rect_v = half_v
+        extent = np.abs(half_u) + np.abs(half_v)
+        self.item_mins = np.concatenate((self.box_mins, centers - extent))
+        self.item_maxs = np.concatenate((self.box_maxs, centers + extent))
+        self.cache.clear()
+
+    def quantize(self, sun_direction):
+        # Sun direction -> (altitude, azimuth) rounded to the quantum, the cache key; plain math, as
+        # this runs once per live step
+        x, y, z = sun_direction
+        length = math.sqrt(x * x + y * y + z * z)
+        altitude = math.degrees(math.asin(min(max(y / length, -1.0), 1.0)))
+        azimuth = math.degrees(math.atan2(x, z))
+        q = self.quantum
+        return round(altitude / q) * q, round(azimuth / q) * q
+
+    def quantize_directions(self, sun_directions):
+        # Batched quantize: (n, 3) directions -> (n, 2) keys
+        directions = np.asarray(sun_directions, dtype=float)
+        y = directions[:, 1] / np.linalg.norm(directions, axis=1)
+        altitude = np.degrees(np.arcsin(np.clip(y, -1.0, 1.0)))
+        azimuth = np.degrees(np.arctan2(directions[:, 0], directions[:, 2]))
+        return np.round(np.stack((altitude, azimuth), axis=1) / self.quantum) * self.quantum
+
+    def shaded_fractions(self, sun_direction):
+        """Fraction (0-1) of each panel's surface in shadow; cached by quantized sun position."""
+        return self.mask(self.quantize(sun_direction))
+
+    def mask(self, key):
+        # Shaded fractions for a quantized (altitude, azimuth) key, cast on a cache miss
+        mask = self.cache.get(key)
+        if mask is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return mask
+
+        self.misses += 1
+        mask = self.cast(get_sun_directions(*key))
+        mask.flags.writeable = False
+        self.cache[key] = mask
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return mask
+
+    def cast(self, sun_direction):
+        # Uncached: cast one ray per sample point towards the sun
+        fractions = np.zeros(self.panel_count)
+        if self.bvh is None or self.panel_count == 0 or sun_direction[1] <= 0:
+            return fractions
+
+        # Panels facing away from the sun get no beam anyway. The others traverse the BVH as one
+        # packet each (their bounding box swept towards the sun), giving the few items any of
+        # their sample rays can hit; only those pairs are tested ray by ray.
+        panels = np.flatnonzero(self.normals @ sun_direction > 0)
+        origins = self.rect_centers[panels] + self.normals[panels] * RAY_OFFSET
+        extents = np.abs(self.rect_u[panels]) + np.abs(self.rect_v[panels])
+        packets, items = self.bvh.candidates(origins, sun_direction, 0.0, extents)
+        owners = panels[packets]
+        keep = items != owners + self.first_panel  # A panel does not shade itself
+        owners, items = owners[keep], items[keep]
+
+        # Every sample ray of a pair starts at base + a * u + b * v on the shaded panel, so where it
+        # meets the occluder is affine in (a, b): a few coefficients per pair, then one broadcast
+        # over the samples, instead of gathering points and vectors ray by ray
+        base = self.rect_centers.take(owners, axis=0) + self.normals.take(owners, axis=0) * RAY_OFFSET
+        a, b = self.sample_a, self.sample_b
+        blocked = np.zeros((self.panel_count, len(a)), dtype=bool)
+
+        # Boxes: slab test, with the slab parameters of each pair shifted per sample
+        is_box = items < self.first_panel
+        if is_box.any():
+            box_owners, boxes = owners[is_box], items[is_box]
+            inv_direction = _inverse(sun_direction)
+            low = (self.item_mins.take(boxes, axis=0) - base[is_box]) * inv_direction
+            high = (self.item_maxs.take(boxes, axis=0) - base[is_box]) * inv_direction
+            shift = (a[None, :, None] * (self.rect_u.take(box_owners, axis=0) * inv_direction)[:, None, :] +
+                     b[None, :, None] * (self.rect_v.take(box_owners, axis=0) * inv_direction)[:, None, :])
+            low, high = low[:, None, :] - shift, high[:, None, :] - shift
+            t_near = _max_xyz(np.minimum(low, high))
+            t_far = _min_xyz(np.maximum(low, high))
+            pairs, samples = np.nonzero(t_far >= np.maximum(t_near, RAY_OFFSET))
+            blocked[box_owners[pairs], samples] = True
+
+        # Panels: exact ray / rectangle test, t and the rectangle coordinates (alpha, beta) of the hit
+        # as affine functions of (a, b)
+        panel_owners, panels = owners[~is_box], items[~is_box] - self.first_panel
+        if panel_owners.size:
+            def dot(x, y):
+                return np.einsum("ij,ij->i", x, y)
+
+            u, v = self.rect_u.take(panel_owners, axis=0), self.rect_v.take(panel_owners, axis=0)
+            normal = self.normals.take(panels, axis=0)
+            to_center = self.rect_centers.take(panels, axis=0) - base[~is_box]
+            axis_u, axis_v = self.rect_u.take(panels, axis=0), self.rect_v.take(panels, axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                inv_denom = 1.0 / (normal @ sun_direction)
+                t = [dot(to_center, normal) * inv_denom, dot(u, normal) * inv_denom, dot(v, normal) * inv_denom]
+
+                def coordinate(axis):
+                    # Hit point minus the occluder center, along axis, in units of the half extent
+                    inv_length, along = 1.0 / dot(axis, axis), axis @ sun_direction
+                    return ((t[0] * along - dot(to_center, axis)) * inv_length,
+                            (dot(u, axis) - t[1] * along) * inv_length,
+                            (dot(v, axis) - t[2] * along) * inv_length)
+
+                def at_samples(c0, ca, cb):
+                    return c0[:, None] + ca[:, None] * a + cb[:, None] * b
+
+                hit = at_samples(t[0], -t[1], -t[2]) > RAY_OFFSET
+                hit &= np.abs(at_samples(*coordinate(axis_u))) <= 1
+                hit &= np.abs(at_samples(*coordinate(axis_v))) <= 1
+            pairs, samples = np.nonzero(hit)
+            blocked[panel_owners[pairs], samples] = True
+
+        return blocked.mean(axis=1)
+
+    def cache_info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.cache)}
+
+
+if __name__ == "__main__":
+    from energy_yield import make_time_range
+    from ephemeris import Site, day_of_year, sun_positions
+    from irradiance import clear_sky_irradiance
+    from plant import PVPlant
+
+    parser = argparse.ArgumentParser(description="Row-to-row shading loss of a grid plant over a date range.")
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--columns", type=int, default=50)
+    parser.add_argument("--row-pitch", type=float, default=3.0, help="Distance between rows in m")
+    parser.add_argument("--tilt", type=float, default=30.0)
+    parser.add_argument("--latitude", type=float, default=40.0)
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end", default="2026-01-01")
+    parser.add_argument("--step", type=float, default=60, help="Time step in minutes")
+    parser.add_argument("--quantum", type=float, default=SUN_QUANTUM, help="Sun position rounding in degrees")
+    args = parser.parse_args()
+
+    plant = PVPlant.grid(args.rows, args.columns, row_pitch=args.row_pitch, tilt=args.tilt)
+    times = make_time_range(args.start, args.end, args.step)
+    sun_altitude, sun_azimuth = sun_positions(Site(args.latitude), times)
+    dni, dhi, ghi = clear_sky_irradiance(sun_altitude, day_of_year(times))
+
+    unshaded = plant.output_series(sun_altitude, sun_azimuth, dni, dhi, ghi)
+    started = time.perf_counter()
+    plant.shading = ShadingEngine.for_plant(plant, quantum=args.quantum)
+    shaded = plant.output_series(sun_altitude, sun_azimuth, dni, dhi, ghi)
+    elapsed = time.perf_counter() - started
+
+    info = plant.shading.cache_info()
+    print(f"Panels: {len(plant)}, steps: {len(times)} in {elapsed:.2f} s "
+          f"({info['misses']} distinct sun positions cast)")
+    print(f"Energy: {shaded.sum() * args.step / 60 / 1000:.1f} kWh "
+          f"(unshaded {unshaded.sum() * args.step / 60 / 1000:.1f} kWh)")
+    print(f"Shading Loss: {(1 - shaded.sum() / unshaded.sum()) * 100:.2f}%")
@@ -0,0 +1,39 @@
+import numpy as np
+from OpenGL.GL import *
+
+# Unit cube faces: outward normal and corners counter-clockwise seen from outside
+_CUBE_FACES = (
+    ((1.0, 0.0, 0.0), ((1, -1, 1), (1, -1, -1), (1, 1, -1), (1, 1, 1))),
+    ((-1.0, 0.0, 0.0), ((-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1))),
+    ((0.0, 1.0, 0.0), ((-1, 1, 1), (1, 1, 1), (1, 1, -1), (-1, 1, -1))),
+    ((0.0, -1.0, 0.0), ((-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1))),
+    ((0.0, 0.0, 1.0), ((-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1))),
+    ((0.0, 0.0, -1.0), ((1, -1, -1), (-1, -1, -1), (-1, 1, -1), (1, 1, -1))),
+)
+
+
+# The same faces as flat arrays, for batching many cubes at once (instancing.py)
+CUBE_CORNERS = np.array([corners for _, corners in _CUBE_FACES], dtype=float).reshape(-1, 3)  # (24, 3)
+CUBE_NORMALS = np.repeat([normal for normal, _ in _CUBE_FACES], 4, axis=0)  # (24, 3)
+
+
+# Drop-in replacements for glutSolidCube/glutWireCube that only need a GL context, not glutInit(),
+# so the scene can also be drawn into offscreen contexts
+def solid_cube(size):
+    half = size / 2
+    glBegin(GL_QUADS)
+    for normal, corners in _CUBE_FACES:
+        glNormal3f(*normal)
+        for x, y, z in corners:
+            glVertex3f(x * half, y * half, z * half)
+    glEnd()
+
+
+def wire_cube(size):
+    half = size / 2
+    for normal, corners in _CUBE_FACES:
+        glNormal3f(*normal)
+        glBegin(GL_LINE_LOOP)
+        for x, y, z in corners:
+            glVertex3f(x * half, y * half, z * half)
+        glEnd()
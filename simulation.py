@@ -1,4 +1,6 @@
+import argparse
 import math
+import os
 import random
 import time
 
@@ -7,35 +9,43 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
 
+from engine import FRAME_TIME, SimulationEngine, add_environment_arguments, configure_from_args
+from geometry_cache import GeometryCache
+from instancing import box_batch, box_outline_batch, cylinder_batch, merge_batches, scaled_axes
+from lod import SphereLOD
+from profiler import FrameProfiler
+from replay import ReplayPlayer
+from scheduler import RenderScheduler, quantize
+from shading import BANK_COLUMNS, battery_layout, panel_axes
+from shapes import solid_cube, wire_cube
+from state import RENDERER_RUNNING, RENDERER_STOPPED, SharedStateExchange
+from tracker import SunTracker
 
-def compute_solar_efficiency(panel_normal, sun_direction):
-    # Normalize both vectors
-    def normalize(v):
-        length = np.linalg.norm(v)
-        return v / length if length != 0 else v
 
-    panel_normal = normalize(np.array(panel_normal))
-    sun_direction = normalize(np.array(sun_direction))
+# Physics model; the OpenGL window is only a view on top of it
+engine = SimulationEngine()
+last_step_time = None
+replay = None  # ReplayPlayer when showing a recorded run instead of live physics
+shared_state = None  # SharedStateExchange of the control panel when running as its renderer process
 
-    # Dot product (clipped between 0 and 1)
-    efficiency = max(0.0, np.dot(panel_normal, sun_direction))
-    return efficiency
+# Redraw only when the scene changed; backs off to an idle rate otherwise
+scheduler = RenderScheduler()
+battery_redraw_step = 0.5  # Battery level change (in % of capacity) worth a redraw
+scene_angle_step = 0.1  # Panel or sun movement (in degrees) worth a redraw
+drawn_battery_steps = (None, None)  # Battery bank and the levels last returned by battery_steps
 
+BATTERY_SIZE = (2.0, 3.0, 3.0)  # Width, height and depth of a battery container
+BATTERY_CELLS = 6  # Visual cells stacked in each battery
+PLANT_ORIGIN = (-45.0, -1.5, 8.0)  # First panel of a --plant grid, in the field in front of the house
 
-def get_sun_direction(altitude_deg, azimuth_deg):
-    alt_rad = math.radians(altitude_deg)
-    az_rad = math.radians(azimuth_deg)
+# Display lists for the static parts of the scene, compiled in init_glut()
+geometry = GeometryCache()
 
-    x = math.cos(alt_rad) * math.sin(az_rad)
-    y = math.sin(alt_rad)
-    z = math.cos(alt_rad) * math.cos(az_rad)
+# Pre-tessellated spheres for the sun, clouds and inverter lights, picked by on-screen size
+sphere_lod = SphereLOD()
 
-    return [x, y, z]
-
-
-battery_level = [0.0 for _ in range(5)]
-battery_capacity = 100.0  # Max storage (for simplicity)
-consumption_rate = 0.02  # Power consumed per frame
+# Per-pass render timings shown in the HUD, toggled with 'p' (export with 'P')
+profiler = FrameProfiler(sync=glFinish)
 
 # Camera variables
 camera_yaw = 0.0  # Horizontal rotation (left/right)
@@ -94,113 +104,164 @@ def mouse_motion(x, y):
 
 
 # Sun variables
-sun_pos = [0, 0, 0]
 sun_pulse = 0  # For animation
-sun_pos_x = -10
-latitude = 40.0  # Example latitude (in degrees)
-declination = -23.5  # Starting point, can be calculated based on date
-time_of_day = 12  # 12:00 PM, for example (you can adjust this based on the current time)
 
-# Convert angles to radians
-latitude = math.radians(latitude)
-declination = math.radians(declination)
 
-# Hour angle: how many degrees the sun is from noon
-hour_angle = 15 * (time_of_day - 12)  # 15 degrees per hour difference from noon
+# Function to initialize GLUT
+def init_glut():
+    glutInit(sys.argv)
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)  # Setup display mode
+    glutInitWindowSize(1280, 960)  # Set window size
+    glutCreateWindow("Solar Panel Simulation".encode('ascii'))  # Create the window
+    glutMouseFunc(mouse)
+    glutMotionFunc(mouse_motion)
+    glutKeyboardFunc(keyboard)
+    glutSpecialFunc(special_keys)
+    if shared_state is not None and bool(glutSetOption):
+        # Closing the window ends the main loop instead of the process, so the block is let go of cleanly
+        glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
+    init_gl()
 
-# Sun Altitude (in degrees) - Angle above the horizon
-altitude = math.asin(math.sin(latitude) * math.sin(declination) + math.cos(latitude) * math.cos(declination) * math.cos(
-    math.radians(hour_angle)))
 
-# Sun Azimuth (in degrees) - Direction of the sun on the horizontal plane
-if altitude > 0:  # Sun above horizon
-    azimuth = math.atan2(-math.cos(declination) * math.sin(math.radians(hour_angle)),
-                         math.sin(altitude))
-else:
-    azimuth = 0  # If the sun is below the horizon, azimuth is irrelevant.
+# GL state and cached geometry, shared by the window and offscreen contexts
+def init_gl():
+    glEnable(GL_DEPTH_TEST)
+    glEnable(GL_LIGHTING)
+    glEnable(GL_LIGHT0)
+    glEnable(GL_COLOR_MATERIAL)
+    glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
+    # glLightfv(GL_LIGHT0, GL_POSITION, [1.0, 1.0, 1.0, 0.0])
+    light_pos = [10.0, 10.0, 10.0, 0.0]
+    glLightfv(GL_LIGHT0, GL_POSITION, light_pos)
+    glShadeModel(GL_SMOOTH)
+    glClearColor(1.0, 0.5, 0.0, 1.0)
+    glEnable(GL_RESCALE_NORMAL)  # LOD spheres are unit meshes scaled to their radius
+    sphere_lod.build()
+    build_static_geometry()
 
-# Convert to degrees
-sun_altitude = math.degrees(altitude)  # Sun's tilt angle above the horizon
-sun_azimuth = math.degrees(azimuth)  # Sun's direction along the horizon
 
-# Panel variables
-tilt_angle = 0
-azimuth_angle = 0
-panel_pos_x = -5
-battery_enabled = True
+def battery_steps(battery_bank):
+    # State of charge of each battery in whole battery_redraw_steps. The random load jitters every level on each
+    # step, so a level only moves once it is a whole step away from the drawn one instead of at every rounding
+    global drawn_battery_steps
+    bank, previous = drawn_battery_steps
+    steps = quantize(battery_bank.state_of_charge() * 100, battery_redraw_step,
+                     previous if bank is battery_bank and len(previous) == battery_bank.count else None)
+    drawn_battery_steps = (battery_bank, steps)
+    return steps
 
-p_in = 0
-p_out = 0
-ipo = 0
-efficiency = 0
 
+def scene_state():
+    # Everything the picture depends on apart from the sun pulse animation, in steps large enough to see: the
+    # clock, a tracker and the batteries change a little on every tick. A replay shows up through the engine.
+    angles = (engine.tilt_angle, engine.azimuth_angle, engine.sun_altitude, engine.sun_azimuth)
+    return (camera_yaw, camera_pitch, camera_distance, engine.panel_pos_x, engine.sun_pos_x, engine.battery_enabled,
+            tuple(quantize(angles, scene_angle_step)), tuple(battery_steps(engine.battery_bank)))
 
-def get_panel_normal(tilt_deg, azimuth_deg):
-    tilt_rad = math.radians(tilt_deg)
-    azimuth_rad = math.radians(azimuth_deg)
 
-    nx = math.sin(tilt_rad) * math.sin(azimuth_rad)
-    ny = math.cos(tilt_rad)
-    nz = math.sin(tilt_rad) * math.cos(azimuth_rad)
+# Tracker settings the T key and the menu step through: fixed, then (mode, backtracking)
+TRACKER_CHOICES = (None, ("single", False), ("single", True), ("dual", False))
 
-    return [nx, ny, nz]
 
+def make_tracker(choice):
+    return None if choice is None else SunTracker(choice[0], backtracking=choice[1])
 
-panel_pos = get_panel_normal(30, 45)
 
-# def angle_between(v1, v2):
-#     cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-#     angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))  # Clip for numerical stability
-#     return np.degrees(angle) if np.degrees else angle
+def next_tracker(tracker):
+    current = None if tracker is None else (tracker.mode, tracker.backtracking)
+    return make_tracker(TRACKER_CHOICES[(TRACKER_CHOICES.index(current) + 1) % len(TRACKER_CHOICES)])
 
 
-# angle_deg = angle_between(sun_pos, panel_norm)
+def describe_tracker(tracker):
+    if tracker is None:
+        return "Fixed (sliders)"
+    name = {"single": "Single-axis", "dual": "Dual-axis"}[tracker.mode]
+    return name + (", backtracking" if tracker.backtracking else "")
 
-# print(angle_deg)
 
-sun_dir = get_sun_direction(sun_altitude, sun_azimuth)
+def keyboard(key, x, y):
+    if key == b"t" and replay is None:
+        engine.set_tracker(next_tracker(engine.tracker))
+        scheduler.mark_dirty()
+    elif key == b"p":
+        profiler.toggle()
+        scheduler.mark_dirty()
+    elif key == b"P" and profiler.enabled:
+        print(f"Profile written to {profiler.export(time.strftime('profile_%Y%m%d_%H%M%S.json'))}")
 
+    if replay is None:
+        return
 
-# Function to initialize GLUT
-def init_glut():
-    glutInit(sys.argv)
-    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)  # Setup display mode
-    glutInitWindowSize(1280, 960)  # Set window size
-    glutCreateWindow("Solar Panel Simulation".encode('ascii'))  # Create the window
-    glEnable(GL_DEPTH_TEST)
-    glEnable(GL_LIGHTING)
-    glEnable(GL_LIGHT0)
-    glEnable(GL_COLOR_MATERIAL)
-    glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
-    # glLightfv(GL_LIGHT0, GL_POSITION, [1.0, 1.0, 1.0, 0.0])
-    light_pos = [10.0, 10.0, 10.0, 0.0]
-    glLightfv(GL_LIGHT0, GL_POSITION, light_pos)
-    glShadeModel(GL_SMOOTH)
-    glutMouseFunc(mouse)
-    glutMotionFunc(mouse_motion)
-    glClearColor(1.0, 0.5, 0.0, 1.0)
+    # Replay controls: space pauses, +/- change speed, 0-9 jump to 0%-90% of the recording
+    if key == b" ":
+        replay.toggle_pause()
+    elif key in (b"+", b"="):
+        replay.faster()
+    elif key in (b"-", b"_"):
+        replay.slower()
+    elif key.isdigit():
+        replay.seek_fraction(int(key) / 10)
+    glutPostRedisplay()
 
 
-def update(value):
+def special_keys(key, x, y):
+    if replay is None:
+        return
+
+    # Left/right arrows seek 10 s of playback time back/forward
+    if key == GLUT_KEY_LEFT:
+        replay.seek(replay.position - 10 * replay.speed)
+    elif key == GLUT_KEY_RIGHT:
+        replay.seek(replay.position + 10 * replay.speed)
     glutPostRedisplay()
-    glutTimerFunc(16, update, 0)  # roughly 60 FPS
 
 
-def menu_func(value):
-    global tilt_angle, azimuth_angle, sun_pos_x, sun_altitude, sun_azimuth, panel_pos_x
+def update(value):
+    global last_step_time
+
+    # The control panel asks its renderer process to close the window
+    if shared_state is not None and shared_state.stop_requested():
+        if bool(glutLeaveMainLoop):
+            glutLeaveMainLoop()
+        else:
+            os._exit(0)  # No freeglut, the main loop never returns
+        return
+
+    # Advance the physics by the real time elapsed since the previous tick, drawn or not
+    now = time.perf_counter()
+    dt = FRAME_TIME if last_step_time is None else now - last_step_time
+    last_step_time = now
+    if replay is not None:
+        engine.exchange.apply_controls(engine)  # Drained so they don't pile up; the recording wins
+        replay.advance(dt)
+        replay.apply(engine)
+    else:
+        engine.step(dt)
+    if profiler.enabled:
+        profiler.add("physics", time.perf_counter() - now)
+
+    # Only redraw when something visible changed (or the animation budget allows it)
+    scheduler.observe(scene_state(), now)
+    if scheduler.tick(now):
+        glutPostRedisplay()
+    glutTimerFunc(scheduler.interval, update, 0)
+
 
+def menu_func(value):
     if 180 <= value < 361:  # Panel X (-90 to 90)
-        tilt_angle = (value - 180) - 90
+        engine.tilt_angle = (value - 180) - 90
     elif 540 <= value < 721:  # Panel Y (-90 to 90)
-        azimuth_angle = (value - 540) - 90
+        engine.azimuth_angle = (value - 540) - 90
     elif 900 <= value < 921:  # Panel Position X (-10 to 10)
-        panel_pos_x = (value - 900) - 10
+        engine.panel_pos_x = (value - 900) - 10
     elif 1000 <= value < 1021:  # Sun Position X (-10 to 10)
-        sun_pos_x = (value - 1000) - 10
+        engine.sun_pos_x = (value - 1000) - 10
     elif 945 <= value < 1021:  # Sun Altitude (-45 to 45)
-        sun_altitude = value - 945
+        engine.sun_altitude = value - 945
     elif 1000 <= value < 1061:  # Sun Azimuth (0 to 90)
-        sun_azimuth = value - 1000
+        engine.sun_azimuth = value - 1000
+    elif 1100 <= value < 1100 + len(TRACKER_CHOICES):  # Tracker mode
+        engine.set_tracker(make_tracker(TRACKER_CHOICES[value - 1100]))
 
     glutPostRedisplay()  # Force redraw after updating
     return 0  # callback error without it
@@ -214,16 +275,15 @@ def reshape(w, h):
     glLoadIdentity()
     gluPerspective(45, w / h, 1, 100)
     glMatrixMode(GL_MODELVIEW)
+    sphere_lod.set_view(sphere_lod.camera_pos, h)
 
 
 def draw_sun():
-    global sun_altitude, sun_azimuth, sun_pulse, sun_pos_x
-
     glPushMatrix()
-    sun_pos_world = np.array(sun_dir) * 20 + np.array([sun_pos_x, 8.0, -10.0])
+    sun_pos_world = engine.sun_world_pos()
     glTranslatef(*sun_pos_world)
-    glRotatef(sun_azimuth, 0, 1, 0)  # Rotate the sun for azimuth
-    glRotatef(sun_altitude, 1, 0, 0)  # Apply altitude angle
+    glRotatef(engine.sun_azimuth, 0, 1, 0)  # Rotate the sun for azimuth
+    glRotatef(engine.sun_altitude, 1, 0, 0)  # Apply altitude angle
 
     # Update pulsing radius using a sine wave
     pulse_radius = 2.0 + 0.05 * math.sin(time.time() * 2)
@@ -242,8 +302,11 @@ def draw_sun():
     # Emission for glowing effect
     glMaterialfv(GL_FRONT, GL_EMISSION, [1.0, 1.0, 0.0, 1.0])
 
+    # Tessellation for the outermost glow layer is good enough for all of them
+    slices = sphere_lod.select_level(sun_pos_world, pulse_radius + 0.7, 50)
+
     # Draw pulsing sun sphere
-    glutSolidSphere(pulse_radius, 50, 50)
+    sphere_lod.draw(pulse_radius, slices)
 
     glDisable(GL_LIGHTING)
 
@@ -254,7 +317,7 @@ def draw_sun():
         glow_alpha = 0.15 / (i + 1)
         glow_radius = pulse_radius + 0.3 + i * 0.2
         glColor4f(1.0, 1.0, 0.0, glow_alpha)
-        glutSolidSphere(glow_radius, 50, 50)
+        sphere_lod.draw(glow_radius, slices)
     glDisable(GL_BLEND)
 
     # Sun rays
@@ -413,7 +476,7 @@ def draw_house():
 def draw_cube(w, h, d):
     glPushMatrix()
     glScalef(w, h, d)
-    glutSolidCube(1.0)
+    solid_cube(1.0)
     glPopMatrix()
 
 
@@ -421,71 +484,51 @@ def draw_outline(w, h, d):
     glPushMatrix()
     glScalef(w, h, d)
     glColor3f(0, 0, 0)
-    glutWireCube(1.001)
+    wire_cube(1.001)
     glPopMatrix()
 
 
-def draw_battery_bank(battery_levels, max_capacity):
-    def draw_battery_3d(bat_level, capacity):
-        width = 2
-        depth = 3
-        height_max = 3.0
-        num_cells = 6  # number of visual cells
-
-        charge_ratio = bat_level / capacity
-        height = max(0.01, charge_ratio * height_max)
-
-        # --- Draw battery outer container ---
-        glPushMatrix()
-        glColor3f(0.3, 0.3, 0.1)  # metallic grey
-        draw_cube(width, height_max, depth)
-        draw_outline(width, height_max, depth)
-        glPopMatrix()
-
-        # --- Cell fill properties ---
-        cell_height = height_max / num_cells
-        inner_width = width - 0.2
-        inner_depth = depth - 0.2
+def draw_battery_cases(battery_count):
+    # Containers and their outlines, two draw calls for the whole bank
+    centers = battery_layout(battery_count)
+    box_batch(centers, scaled_axes(BATTERY_SIZE), (0.3, 0.3, 0.1)).draw()  # metallic grey
+    box_outline_batch(centers, scaled_axes(np.multiply(BATTERY_SIZE, 1.001)), (0.0, 0.0, 0.0)).draw()
 
-        for i in range(num_cells):
-            # Y position of current cell center
-            cell_center_y = -height_max / 2 + (i + 0.5) * cell_height
 
-            # Determine how full this cell is
-            cell_fill_ratio = (charge_ratio * num_cells) - i
-            cell_fill_ratio = max(0.0, min(cell_fill_ratio, 1.0))
+def battery_cell_batch(charge_ratios):
+    width, height_max, depth = BATTERY_SIZE
+    cell_height = height_max / BATTERY_CELLS
 
-            if cell_fill_ratio <= 0.0:
-                continue  # skip empty cells
+    # How full each cell of each battery is; empty cells are skipped
+    fill = np.clip(charge_ratios[:, None] * BATTERY_CELLS - np.arange(BATTERY_CELLS), 0.0, 1.0)
+    battery, cell = np.nonzero(fill > 0.0)
+    fill = fill[battery, cell]
 
-            # Set color based on overall charge level
+    # Filled part of each cell, sitting on the bottom of the cell
+    cell_center_y = -height_max / 2 + (cell + 0.5) * cell_height
+    offsets = np.stack((np.zeros(len(fill)), cell_center_y - (1 - fill) * cell_height / 2,
+                        np.full(len(fill), 0.2)), axis=-1)
+    sizes = np.stack((np.full(len(fill), width - 0.2), np.maximum(cell_height * fill - 0.05, 0.0),
+                      np.full(len(fill), depth - 0.2)), axis=-1)
 
-            if charge_ratio > 0.6:
-                glColor3f(0.0, 0.8, 0.0)  # green
-            elif charge_ratio > 0.3:
-                glColor3f(0.9, 0.9, 0.0)  # yellow
-            else:
-                glColor3f(0.9, 0.0, 0.0)  # red
+    # Color based on the battery's overall charge level: green, yellow, red
+    colors = np.where((charge_ratios > 0.6)[:, None], (0.0, 0.8, 0.0),
+                      np.where((charge_ratios > 0.3)[:, None], (0.9, 0.9, 0.0), (0.9, 0.0, 0.0)))
+    return box_batch(battery_layout(len(charge_ratios))[battery] + offsets, scaled_axes(sizes), colors[battery])
 
-            # --- Draw filled part of the cell ---
-            glPushMatrix()
-            glTranslatef(0, cell_center_y - (1 - cell_fill_ratio) * cell_height / 2, 0.2)
-            draw_cube(inner_width, cell_height * cell_fill_ratio - 0.05, inner_depth)
-            glPopMatrix()
 
-    start_x = 2.0  # starting X position
-    spacing = 2.5  # space between batteries
+def draw_battery_bank(battery_bank):
+    count = battery_bank.count
 
     glPushMatrix()
     glTranslatef(15.0, -1.0, -13.0)  # Position the whole bank
     glRotatef(-90, 0.0, 1.0, 0.0)  # Rotate around Y axis
 
-    for i, level in enumerate(battery_levels):
-        bat_x = start_x + i * spacing
-        glPushMatrix()
-        glTranslatef(bat_x, 0.0, 0.0)
-        draw_battery_3d(level, max_capacity)
-        glPopMatrix()
+    # Containers only change with the number of batteries, the cells with the charge levels scene_state redraws on
+    geometry.draw("battery_cases", lambda: draw_battery_cases(count), key=count)
+    steps = battery_steps(battery_bank)
+    geometry.draw("battery_cells", lambda: battery_cell_batch(steps * battery_redraw_step / 100).draw(),
+                  key=(count, hash(steps.tobytes())))
     glPopMatrix()
 
 
@@ -494,25 +537,24 @@ def draw_grasses():
     glDisable(GL_LIGHTING)
     glColor3f(0.1, 0.5, 0.1)
 
-    random.seed(45)  # For consistent results; remove if you want different every run
+    rand = random.Random(45)  # For consistent results; remove the seed if you want different every run
 
+    # All blades go into a single batch, rotated around Z in Python instead of per-blade matrices
+    glBegin(GL_TRIANGLES)
     for i in range(-45, 50, 2):
         for j in range(-45, 50, 2):
-            if random.random() < 5:  # Sparse distribution
-                x = i + random.uniform(-0.5, 0.5)
-                z = j + random.uniform(-0.5, 0.5)
-                height = random.uniform(0.3, 1.5)
-                angle = random.uniform(-10, 10)
-
-                glPushMatrix()
-                glTranslatef(x, -2.6, z)
-                glRotatef(angle, 0, 0, 1)
-                glBegin(GL_TRIANGLES)
-                glVertex3f(0.0, 0.0, 0.0)
-                glVertex3f(-0.05, height, 0.0)
-                glVertex3f(0.05, height, 0.0)
-                glEnd()
-                glPopMatrix()
+            if rand.random() < 5:  # Sparse distribution
+                x = i + rand.uniform(-0.5, 0.5)
+                z = j + rand.uniform(-0.5, 0.5)
+                height = rand.uniform(0.3, 1.5)
+                angle = math.radians(rand.uniform(-10, 10))
+                cos_a = math.cos(angle)
+                sin_a = math.sin(angle)
+
+                glVertex3f(x, -2.6, z)
+                glVertex3f(x - 0.05 * cos_a - height * sin_a, -2.6 - 0.05 * sin_a + height * cos_a, z)
+                glVertex3f(x + 0.05 * cos_a - height * sin_a, -2.6 + 0.05 * sin_a + height * cos_a, z)
+    glEnd()
 
     glEnable(GL_LIGHTING)
     glPopMatrix()
@@ -523,6 +565,9 @@ def draw_cloud(x, y, z, scale=1.0):
     glTranslatef(x, y, z)
     glScalef(scale, scale, scale)
 
+    # The blobs of one cloud are close together, so they share one level of detail
+    slices = sphere_lod.select_level((x, y, z), scale, 40)
+
     glEnable(GL_BLEND)
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
@@ -549,7 +594,7 @@ def draw_cloud(x, y, z, scale=1.0):
         glPushMatrix()
         glTranslatef(*pos)
         glColor4f(*col)
-        glutSolidSphere(1.0, 40, 40)
+        sphere_lod.draw(1.0, slices)
         glPopMatrix()
 
     glDisable(GL_BLEND)
@@ -610,7 +655,7 @@ def draw_horizon():
     glPopMatrix()
 
 
-def draw_solar_panel():
+def draw_panel_stand(panel_pos_x):
     def draw_inverter():
         inverter_x = panel_pos_x  # same X as panel
         inverter_y = -0.8  # a bit below panel center
@@ -623,7 +668,7 @@ def draw_solar_panel():
         glColor3f(0.6, 0.6, 0.6)
         glPushMatrix()
         glScalef(1.0, 0.50, 0.20)
-        glutSolidCube(1.0)
+        solid_cube(1.0)
         glPopMatrix()
 
         # Front display panel - dark rectangle
@@ -631,7 +676,7 @@ def draw_solar_panel():
         glPushMatrix()
         glTranslatef(0, 0.05, 0.085)  # slightly in front
         glScalef(0.6, 0.3, 0.04)
-        glutSolidCube(1.0)
+        solid_cube(1.0)
         glPopMatrix()
 
         # Vents - thin horizontal lines on front below display
@@ -640,31 +685,17 @@ def draw_solar_panel():
             glPushMatrix()
             glTranslatef(0, -0.05 + i * 0.03, 0.086)
             glScalef(0.70, 0.02, 0.04)
-            glutSolidCube(1.0)
-            glPopMatrix()
-
-        # Indicator lights - small colored spheres
-        light_positions = [(-0.15, 0.15, 0.086), (0.0, 0.15, 0.086), (0.15, 0.15, 0.086)]
-        light_colors = [(1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)]  # red, yellow, green
-        for pos, color in zip(light_positions, light_colors):
-            glColor3f(*color)
-            glPushMatrix()
-            glTranslatef(*pos)
-            glutSolidSphere(0.03, 12, 12)
+            solid_cube(1.0)
             glPopMatrix()
 
         glPopMatrix()
 
-    global tilt_angle, azimuth_angle, panel_pos_x
-
-    glPushMatrix()
-
     # --- Stand base ---
     glColor3f(0.3, 0.3, 0.3)
     glPushMatrix()
     glTranslatef(panel_pos_x, -2.5, 0.0)
     glScalef(2.0, 0.2, 2.0)
-    glutSolidCube(1.0)
+    solid_cube(1.0)
     glPopMatrix()
 
     # --- Vertical pole ---
@@ -672,23 +703,37 @@ def draw_solar_panel():
     glPushMatrix()
     glTranslatef(panel_pos_x, -1.25, 0.0)
     glScalef(0.2, 2.5, 0.2)
-    glutSolidCube(1.0)
+    solid_cube(1.0)
     glPopMatrix()
 
     draw_inverter()
 
-    # --- Panel rotation around Y-axis (tracking) ---
-    glTranslatef(panel_pos_x, 0.0, 0.0)
-    glRotatef(azimuth_angle, 0.0, 1.0, 0.0)
 
-    # --- Panel tilt ---
-    glRotatef(tilt_angle, 1.0, 0.0, 0.0)
+def draw_inverter_lights(panel_pos_x):
+    # Indicator lights - small colored spheres, drawn per frame so they can use the sphere LOD
+    inverter_pos = (panel_pos_x, -0.8, 0.2)
+    slices = sphere_lod.select_level(inverter_pos, 0.03, 12)
+
+    light_positions = [(-0.15, 0.15, 0.086), (0.0, 0.15, 0.086), (0.15, 0.15, 0.086)]
+    light_colors = [(1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)]  # red, yellow, green
+
+    glPushMatrix()
+    glTranslatef(*inverter_pos)
+    for pos, color in zip(light_positions, light_colors):
+        glColor3f(*color)
+        glPushMatrix()
+        glTranslatef(*pos)
+        sphere_lod.draw(0.03, slices)
+        glPopMatrix()
+    glPopMatrix()
 
+
+def draw_panel_surface():
     # --- Panel base ---
     glColor3f(0.2, 0.2, 0.2)
     glPushMatrix()
     glScalef(6.0, 0.1, 4.0)
-    glutSolidCube(1.0)
+    solid_cube(1.0)
     glPopMatrix()
 
     # --- Solar cell surface ---
@@ -715,128 +760,96 @@ def draw_solar_panel():
     glEnd()
 
     glPopMatrix()  # End of solar panel
-    glPopMatrix()  # Reset overall
 
 
-def draw_cable(start, end, thickness=0.05):
-    dx = end[0] - start[0]
-    dy = end[1] - start[1]
-    dz = end[2] - start[2]
-    length = math.sqrt(dx * dx + dy * dy + dz * dz)
-
-    if length == 0:
-        return  # no cable if same point
+def draw_solar_panel():
+    panel_pos_x = engine.panel_pos_x
 
-    ax = 57.2957795 * math.acos(dz / length)  # angle in degrees
-    if dz < 0:
-        ax = -ax
-    # Cross product for rotation axis
-    rx = -dy * dz
-    ry = dx * dz
-    rz = 0
+    # Stand, pole and inverter only change when the panel is moved
+    geometry.draw("panel_stand", lambda: draw_panel_stand(panel_pos_x), key=panel_pos_x)
+    draw_inverter_lights(panel_pos_x)
 
     glPushMatrix()
-    glTranslatef(*start)
 
-    # If cable is vertical, no rotation needed
-    if dz < length:
-        glRotatef(ax, rx, ry, rz)
+    # --- Panel rotation around Y-axis (tracking) ---
+    glTranslatef(panel_pos_x, 0.0, 0.0)
+    glRotatef(engine.azimuth_angle, 0.0, 1.0, 0.0)
 
-    # Draw cylinder along z-axis
-    quad = gluNewQuadric()
-    glColor3f(0.1, 0.1, 0.1)  # cable color: dark gray
-    gluCylinder(quad, thickness, thickness, length, 8, 1)
-    gluDeleteQuadric(quad)
+    # --- Panel tilt ---
+    glRotatef(engine.tilt_angle, 1.0, 0.0, 0.0)
 
-    glPopMatrix()
+    # The panel itself is static in its own frame
+    geometry.draw("panel_surface", draw_panel_surface)
+
+    glPopMatrix()  # Reset overall
 
 
-def draw_cables_to_batteries(battery_levels, max_capacity):
+def draw_cables_to_batteries(battery_count):
     # Inverter position (matches your draw_inverter inside draw_solar_panel)
-    inverter_pos = (panel_pos_x, -0.8, 0.2)
+    inverter_pos = (engine.panel_pos_x, -0.8, 0.2)
 
     # Battery bank base and orientation (same as in draw_battery_bank)
-    base_pos = (15.0, -1.0, -13.0)
-    spacing = 2.5
-    start_x = 2.0
-
     glPushMatrix()
-    glTranslatef(*base_pos)
+    glTranslatef(15.0, -1.0, -13.0)
     glRotatef(-90, 0, 1, 0)
 
-    # For each battery, compute battery center position and draw cable
-    for i in range(len(battery_levels)):
-        bat_x = start_x + i * spacing
-        # Batteries are at y=0, z=0 in local battery bank coords
-        battery_pos = (bat_x, 0.0, 0.0)
-        draw_cable(inverter_pos, battery_pos)
+    # Wired like a real bank, in a single batch: a trunk from the inverter to the first battery, a spine down the
+    # first column and a bus through each row, so the cable count and length grow with the rows only
+    if battery_count:
+        centers = battery_layout(battery_count)
+        row_starts = centers[::BANK_COLUMNS]
+        row_ends = centers[np.minimum(np.arange(BANK_COLUMNS - 1, battery_count + BANK_COLUMNS - 1, BANK_COLUMNS),
+                                      battery_count - 1)]
+        starts = np.vstack(([inverter_pos, row_starts[0]], row_starts))
+        ends = np.vstack(([row_starts[0], row_starts[-1]], row_ends))
+        cylinder_batch(starts, ends, 0.05, (0.1, 0.1, 0.1)).draw()  # cable color: dark gray
 
     glPopMatrix()
 
 
-def draw_text(x, y, text, font=globals()["GLUT_BITMAP_HELVETICA_18"]):
-    glWindowPos2f(x, y)
-    for ch in text:
-        glutBitmapCharacter(font, ord(ch))
-
-
-# Display function for GLUT
-def display():
-    global battery_level, battery_capacity, efficiency, p_in, p_out, ipo, sun_dir, sun_pos_x
-
-    # Calculate the sun's position based only on sun parameters (altitude and azimuth)
-    sun_world_pos = np.array(sun_dir) * 20 + np.array([sun_pos_x, 8.0, -10.0])  # Keep sun_pos_x separate
-    panel_world_pos = np.array([panel_pos_x, 0.0, 0.0])
+def panel_array_batch(plant, panel_width=1.0):
+    # Frame and cell surface of every plant panel, oriented like draw_solar_panel orients the single one
+    width_axis, length_axis = panel_axes(plant.tilt, plant.azimuth)
+    length = (plant.area / panel_width)[:, None]
+    frames = np.stack((width_axis * panel_width / 2, plant.normals * 0.05, length_axis * length / 2), axis=1)
+    cells = np.stack((width_axis * panel_width * 0.45, plant.normals * 0.01, length_axis * length * 0.45), axis=1)
+    return merge_batches(box_batch(plant.positions, frames, (0.2, 0.2, 0.2)),
+                         box_batch(plant.positions + plant.normals * 0.06, cells, (0.0, 0.3, 0.8)))
 
-    # Sun direction relative to the panel
-    sun_dir = sun_world_pos - panel_world_pos
-    sun_dir = sun_dir / np.linalg.norm(sun_dir)
 
-    # Get panel normal based on its tilt and azimuth
-    panel_norm = get_panel_normal(tilt_angle, azimuth_angle)
+def draw_panel_array(plant):
+    # Recompiled only when the panels turn (a tracker), otherwise replayed from its display list
+    key = (id(plant), len(plant), hash(plant.tilt.tobytes()), hash(plant.azimuth.tobytes()))
+    geometry.draw("panel_array", lambda: panel_array_batch(plant).draw(), key=key)
 
-    # Calculate the efficiency of the solar panel
-    efficiency = compute_solar_efficiency(panel_norm, sun_dir)
-
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
-    # Dynamic solar power calculations
-    I = 1000  # Solar irradiance in W/m²
-    A = 2  # Panel area in m²
-    eta = 0.18  # Panel efficiency
+def draw_cached_cables(battery_count=None):
+    # Cables only depend on where the panel is and how many batteries there are
+    count = engine.battery_bank.count if battery_count is None else battery_count
+    geometry.draw("cables", lambda: draw_cables_to_batteries(count), key=(engine.panel_pos_x, count))
 
-    # Power incident on the panel surface
-    p_in = I * A * efficiency  # Only effective irradiance based on angle
-    p_out = eta * p_in  # Power output from panel
-    ipo = p_out / (I * A) if I * A != 0 else 0  # Instantaneous power output ratio
 
-    power_generated = efficiency * 0.1  # Shared generation input for now
+def build_static_geometry():
+    # Compile the static meshes once, right after the GL context exists
+    geometry.build("horizon", draw_horizon)
+    geometry.build("field", draw_field)
+    geometry.build("grasses", draw_grasses)
+    geometry.build("house", draw_house)
+    geometry.build("panel_surface", draw_panel_surface)
+    geometry.build("panel_stand", lambda: draw_panel_stand(engine.panel_pos_x), key=engine.panel_pos_x)
+    geometry.build("cables", lambda: draw_cables_to_batteries(engine.battery_bank.count),
+                   key=(engine.panel_pos_x, engine.battery_bank.count))
 
-    if battery_enabled:
-        for i in range(len(battery_level)):
-            # Random solar efficiency per battery (simulate partial shading or dirt)
-            individual_efficiency = efficiency * random.uniform(0.4, 1.1)  # way more variance
 
-            # Random fluctuation in sunlight power per battery
-            fluctuation = random.uniform(0.05, 0.15)
-
-            # Random chance to *not* receive sunlight (like a passing cloud)
-            if random.random() < 0.1:  # 10% chance of total shadow
-                individual_efficiency = 0.0
-
-            power_generated = individual_efficiency * fluctuation
-
-            # Random consumption (maybe a connected device turns on)
-            random_consumption = random.uniform(0.005, 0.02)
+def draw_text(x, y, text, font=globals()["GLUT_BITMAP_HELVETICA_18"]):
+    glWindowPos2f(x, y)
+    for ch in text:
+        glutBitmapCharacter(font, ord(ch))
 
-            # Random sudden drain (simulate battery stress or faulty circuit)
-            if random.random() < 0.05:  # 5% chance of extra power loss
-                random_consumption += random.uniform(0.01, 0.05)
 
-            # Apply to battery
-            battery_level[i] += power_generated
-            battery_level[i] -= random_consumption
-            battery_level[i] = max(0.0, min(battery_level[i], battery_capacity))
+# Draws the 3D scene (no HUD) into the current context
+def render_scene():
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
@@ -849,42 +862,89 @@ def display():
     gluLookAt(cam_x, cam_y, cam_z,  # default values 0, 15, 50,
               0, 0, 0,  # Look at point
               0, 1, 0)  # Up vector
+    sphere_lod.set_view((cam_x, cam_y, cam_z))
 
     # Draw everything in the scene
     glEnable(GL_LIGHTING)
-    draw_horizon()
-    draw_field()
-    draw_grasses()
-    draw_sun()
-    draw_solar_panel()
-    draw_battery_bank(battery_level, battery_capacity)
-    draw_cables_to_batteries(battery_level, battery_capacity)
-    draw_house()
-    draw_sky_with_clouds()
-
-
+    run = profiler.run
+    run("horizon", geometry.draw, "horizon", draw_horizon)
+    run("field", geometry.draw, "field", draw_field)
+    run("grasses", geometry.draw, "grasses", draw_grasses)
+    run("sun", draw_sun)
+    run("solar panel", draw_solar_panel)
+    run("batteries", draw_battery_bank, engine.battery_bank)
+    run("cables", draw_cached_cables)
+    if engine.plant is not None:
+        run("panel array", draw_panel_array, engine.plant)
+    run("house", geometry.draw, "house", draw_house)
+    run("clouds", draw_sky_with_clouds)
+
+
+def draw_hud():
     # Display power and efficiency stats
     glColor3f(1, 1, 1)
-    draw_text(950, 940, f"Sun Altitude: {sun_altitude:.1f}°")
-    draw_text(950, 920, f"Sun Azimuth: {sun_azimuth:.1f}°")
-    draw_text(950, 900, f"Panel Tilt: {tilt_angle:.1f}°")
-    draw_text(950, 880, f"Panel Azimuth: {azimuth_angle:.1f}°")
-    draw_text(950, 860, f"Efficiency: {efficiency * 100:.1f}%")
-    draw_text(950, 840, f"Incident Power: {p_in:.2f} W")
-    draw_text(950, 820, f"Output Power: {p_out:.2f} W")
-    average_battery = sum(battery_level) / 5
-    draw_text(950, 800, f"Battery Level: {average_battery:.1f}%")
+    draw_text(950, 940, f"Sun Altitude: {engine.sun_altitude:.1f}°")
+    draw_text(950, 920, f"Sun Azimuth: {engine.sun_azimuth:.1f}°")
+    draw_text(950, 900, f"Panel Tilt: {engine.tilt_angle:.1f}°")
+    draw_text(950, 880, f"Panel Azimuth: {engine.azimuth_angle:.1f}°")
+    draw_text(950, 860, f"Efficiency: {engine.efficiency * 100:.1f}% ({engine.shaded * 100:.0f}% shaded)")
+    draw_text(950, 840, f"Incident Power: {engine.p_in:.2f} W")
+    draw_text(950, 820, f"Output Power: {engine.p_out:.2f} W")
+    draw_text(950, 800, f"Battery Level: {engine.average_battery():.1f}%")
+    draw_text(950, 780, f"Frames: {scheduler.frames_drawn} drawn / {scheduler.frames_skipped} skipped")
+    if replay is not None:
+        draw_text(950, 760, replay.status())
+    elif engine.clock_start is not None:
+        draw_text(950, 760, f"Clock: {str(engine.clock())[:19].replace('T', ' ')}")
+    if replay is None and engine.tracker is not None:
+        draw_text(950, 740, f"Tracker: {describe_tracker(engine.tracker)}")
+
+    if profiler.enabled:
+        glColor3f(1, 1, 0.6)
+        for i, line in enumerate(profiler.lines()):
+            draw_text(20, 940 - 20 * i, line)
+
+
+# Display function for GLUT
+def display():
+    profiler.begin_frame()
+    scheduler.frame_drawn()
+    render_scene()
+    draw_hud()
     glutSwapBuffers()  # Swap buffers to display the rendered scene
+    profiler.end_frame()
+
+
+def attach_shared_state(name):
+    global engine, shared_state
+
+    # Take controls from and publish frames to the control panel that started this process
+    shared_state = SharedStateExchange.attach(name)
+    if engine.battery_bank.count != shared_state.battery_count:
+        engine = SimulationEngine(battery_count=shared_state.battery_count)
+    engine.exchange = shared_state
+    shared_state.set_status(RENDERER_RUNNING)
+
+
+def load_replay(replay_path):
+    global engine, replay
+
+    # Show a recorded run instead of live physics
+    replay = ReplayPlayer(replay_path)
+    engine = SimulationEngine(battery_count=replay.recording.battery_count)
+    replay.apply(engine)
 
 
 # Function to start simulation (initialize GLUT and run the main loop)
-def sim_start():
+def sim_start(replay_path=None):
+    if replay_path is not None:
+        load_replay(replay_path)
+
     init_glut()  # Initialize GLUT, create window
 
     # Set up GLUT callbacks
     glutDisplayFunc(display)
     glutReshapeFunc(reshape)
-    glutTimerFunc(16, update, 0)
 
     # Set up perspective view
     gluPerspective(45, (800 / 600), 0.1, 50.0)
@@ -892,7 +952,7 @@ def sim_start():
 
     # Register the display callback
     glutDisplayFunc(display)
-    glutTimerFunc(0, update, 0)  # Start animation
+    glutTimerFunc(0, update, 0)  # Start the physics/redraw loop
 
     def create_angle_submenu(base_id, label):
         """Creates a submenu for angles from -90 to +90."""
@@ -935,11 +995,16 @@ def sim_start():
     glutAddSubMenu("Sun Altitude", sun_altitude_menu)  # New Altitude submenu
     glutAddSubMenu("Sun Azimuth", sun_azimuth_menu)  # New Azimuth submenu
 
+    tracker_menu = glutCreateMenu(menu_func)
+    for i, choice in enumerate(TRACKER_CHOICES):
+        glutAddMenuEntry(describe_tracker(make_tracker(choice)), 1100 + i)
+
     # Main menu
     main_menu = glutCreateMenu(menu_func)
     glutAddSubMenu("Solar Panel", panel_menu)
     glutAddSubMenu("Panel Position X", panel_pos_x_menu)
     glutAddSubMenu("Sun", sun_menu)
+    glutAddSubMenu("Tracker", tracker_menu)
 
     # Attach the main menu to the right mouse button
     glutAttachMenu(GLUT_RIGHT_BUTTON)
@@ -949,4 +1014,22 @@ def sim_start():
 
 
 if __name__ == "__main__":
-    sim_start()
+    parser = argparse.ArgumentParser(description="OpenGL solar panel simulation.")
+    parser.add_argument("--replay", default=None, help="Recording directory to play back instead of live physics")
+    add_environment_arguments(parser, time_scale=600.0)
+    parser.add_argument("--batteries", type=int, default=5, help="Number of batteries in the bank")
+    parser.add_argument("--shared-state", default=None, help=argparse.SUPPRESS)  # Set by controls.py
+    args = parser.parse_args()
+
+    if args.batteries != engine.battery_bank.count:
+        engine = SimulationEngine(battery_count=args.batteries)
+    if args.shared_state:
+        attach_shared_state(args.shared_state)
+
+    configure_from_args(engine, args, PLANT_ORIGIN)
+    try:
+        sim_start(args.replay)
+    finally:
+        if shared_state is not None:
+            shared_state.set_status(RENDERER_STOPPED)
+            shared_state.close()
@@ -0,0 +1,130 @@
+import math
+
+import numpy as np
+
+# Default panel characteristics shared by the live engine and the batch models
+IRRADIANCE = 1000  # Solar irradiance in W/m²
+PANEL_AREA = 2  # Panel area in m²
+PANEL_EFFICIENCY = 0.18
+
+
+def compute_solar_efficiencies(panel_normals, sun_directions):
+    # Batched version: inputs are (..., 3) arrays that broadcast against each other
+    panel_normals = np.asarray(panel_normals, dtype=float)
+    sun_directions = np.asarray(sun_directions, dtype=float)
+
+    # Normalize both vectors (zero-length vectors are left as they are)
+    def normalize(v):
+        length = np.linalg.norm(v, axis=-1, keepdims=True)
+        return v / np.where(length != 0, length, 1.0)
+
+    cosines = np.einsum("...i,...i->...", normalize(panel_normals), normalize(sun_directions))
+
+    # Dot product (clipped between 0 and 1)
+    return np.clip(cosines, 0.0, 1.0)
+
+
+def compute_angle_efficiencies(tilt_deg, panel_azimuth_deg, sun_altitude_deg, sun_azimuth_deg):
+    # Same result as compute_solar_efficiencies(get_panel_normals(...), get_sun_directions(...))
+    # but expanded into one trig expression, so no (..., 3) intermediates are built:
+    # cos(incidence) = sin(tilt) * cos(alt) * cos(panel_az - sun_az) + cos(tilt) * sin(alt)
+    tilt = np.radians(tilt_deg)
+    altitude = np.radians(sun_altitude_deg)
+    azimuth_diff = np.radians(np.subtract(panel_azimuth_deg, sun_azimuth_deg))
+
+    cosines = np.sin(tilt) * np.cos(altitude) * np.cos(azimuth_diff) + np.cos(tilt) * np.sin(altitude)
+    return np.clip(cosines, 0.0, 1.0)
+
+
+def get_sun_directions(altitude_deg, azimuth_deg):
+    # Batched version: altitude and azimuth broadcast, result has a trailing axis of 3
+    alt_rad = np.radians(altitude_deg)
+    az_rad = np.radians(azimuth_deg)
+
+    cos_alt = np.cos(alt_rad)
+    x = cos_alt * np.sin(az_rad)
+    y = np.broadcast_to(np.sin(alt_rad), np.shape(x))
+    z = cos_alt * np.cos(az_rad)
+
+    return np.stack(np.broadcast_arrays(x, y, z), axis=-1)
+
+
+def get_panel_normals(tilt_deg, azimuth_deg):
+    # Batched version: tilt and azimuth broadcast, result has a trailing axis of 3
+    tilt_rad = np.radians(tilt_deg)
+    azimuth_rad = np.radians(azimuth_deg)
+
+    sin_tilt = np.sin(tilt_rad)
+    nx = sin_tilt * np.sin(azimuth_rad)
+    ny = np.cos(tilt_rad)
+    nz = sin_tilt * np.cos(azimuth_rad)
+
+    return np.stack(np.broadcast_arrays(nx, ny, nz), axis=-1)
+
+
+# Scalar versions, for the live engine's one panel per step: plain math on 3-lists, since NumPy's
+# per-call overhead is many times the arithmetic for a single vector. Same results as the batched ones.
+
+def compute_solar_efficiency(panel_normal, sun_direction):
+    nx, ny, nz = panel_normal
+    sx, sy, sz = sun_direction
+    length = math.sqrt(nx * nx + ny * ny + nz * nz) * math.sqrt(sx * sx + sy * sy + sz * sz)
+    if length == 0:
+        return 0.0
+    return min(max((nx * sx + ny * sy + nz * sz) / length, 0.0), 1.0)
+
+
+def get_sun_direction(altitude_deg, azimuth_deg):
+    alt_rad = math.radians(altitude_deg)
+    az_rad = math.radians(azimuth_deg)
+
+    cos_alt = math.cos(alt_rad)
+    return [cos_alt * math.sin(az_rad), math.sin(alt_rad), cos_alt * math.cos(az_rad)]
+
+
+def get_panel_normal(tilt_deg, azimuth_deg):
+    tilt_rad = math.radians(tilt_deg)
+    azimuth_rad = math.radians(azimuth_deg)
+
+    sin_tilt = math.sin(tilt_rad)
+    return [sin_tilt * math.sin(azimuth_rad), math.cos(tilt_rad), sin_tilt * math.cos(azimuth_rad)]
+
+
+def solar_declination(day_of_year):
+    # Cooper's approximation of the sun's declination (degrees) for a day of the year (1-365)
+    return 23.45 * np.sin(np.radians(360.0 / 365.0 * (284 + np.asarray(day_of_year))))
+
+
+def equation_of_time(day_of_year):
+    # Spencer's series for apparent minus mean solar time (minutes) on a day of the year (1-366)
+    b = np.radians(360.0 / 365.0 * (np.asarray(day_of_year) - 1))
+    return 229.18 * (0.000075 + 0.001868 * np.cos(b) - 0.032077 * np.sin(b) -
+                     0.014615 * np.cos(2 * b) - 0.04089 * np.sin(2 * b))
+
+
+def compute_sun_positions(latitude_deg, declination_deg, time_of_day):
+    # Batched version: arguments broadcast, returns (altitude, azimuth) arrays in degrees
+    latitude = np.radians(latitude_deg)
+    declination = np.radians(declination_deg)
+
+    # Hour angle: how many degrees the sun is from noon
+    hour_angle = np.radians(15 * (np.asarray(time_of_day) - 12))  # 15 degrees per hour difference from noon
+
+    # Sun Altitude - Angle above the horizon
+    sin_altitude = (np.sin(latitude) * np.sin(declination) +
+                    np.cos(latitude) * np.cos(declination) * np.cos(hour_angle))
+    altitude = np.arcsin(np.clip(sin_altitude, -1.0, 1.0))
+
+    # Sun Azimuth - Direction of the sun on the horizontal plane, 0 due south and positive towards east
+    south = (np.cos(declination) * np.cos(hour_angle) * np.sin(latitude) -
+             np.sin(declination) * np.cos(latitude))
+    azimuth = np.arctan2(-np.cos(declination) * np.sin(hour_angle), south)
+    azimuth = np.where(altitude > 0, azimuth, 0.0)  # Below the horizon azimuth is irrelevant
+
+    # Convert to degrees
+    return np.degrees(altitude), np.degrees(azimuth)
+
+
+def compute_sun_position(latitude_deg, declination_deg, time_of_day):
+    altitude, azimuth = compute_sun_positions(latitude_deg, declination_deg, time_of_day)
+    return float(altitude), float(azimuth)
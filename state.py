@@ -0,0 +1,243 @@
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+# Engine attributes the GUI is allowed to change
+CONTROL_NAMES = frozenset({"tilt_angle", "azimuth_angle", "panel_pos_x", "sun_pos_x",
+                           "sun_altitude", "sun_azimuth", "battery_enabled"})
+
+
+class FrameSnapshot(NamedTuple):
+    """Complete, immutable view of the simulation after one step."""
+    time: float
+    steps: int
+    tilt_angle: float
+    azimuth_angle: float
+    panel_pos_x: float
+    sun_pos_x: float
+    sun_altitude: float
+    sun_azimuth: float
+    battery_enabled: bool
+    efficiency: float
+    p_in: float
+    p_out: float
+    ipo: float
+    battery_soc: np.ndarray  # Read-only copy, state of charge per battery (0..1)
+    average_battery: float  # %
+
+
+# Layout of a SharedStateExchange block, all little-endian 8-byte words:
+#   header    int64   battery_count, control sequence, output sequence, renderer status, stop request
+#   controls  float64 one value per control name (sorted), then int64 one version per control
+#   outputs   float64 every scalar FrameSnapshot field in field order, then battery_soc
+CONTROL_ORDER = tuple(sorted(CONTROL_NAMES))
+SCALAR_FIELDS = tuple(name for name in FrameSnapshot._fields if name != "battery_soc")
+HEADER_WORDS = 5
+RENDERER_IDLE, RENDERER_RUNNING, RENDERER_STOPPED = 0, 1, 2
+SPIN_LIMIT = 1000  # Reads retried while the writer is mid-update before the last good copy is used
+
+
+def snapshot_from_frame(frame):
+    # FrameSnapshot from a frame array laid out as the exchanges publish it
+    values = {name: FrameSnapshot.__annotations__[name](value) for name, value in zip(SCALAR_FIELDS, frame)}
+    battery_soc = frame[len(SCALAR_FIELDS):]
+    battery_soc.flags.writeable = False
+    return FrameSnapshot(battery_soc=battery_soc, **values)
+
+
+class StateExchange:
+    """Hands state between the physics/render thread and the GUI thread without locks.
+
+    The physics side publishes every step into one preallocated frame array, guarded by a
+    sequence counter like SharedStateExchange: the writer makes it odd, writes, and makes it even
+    again. A reader copies the frame, retries if the counter was odd or moved meanwhile, and only
+    then builds the FrameSnapshot, so publishing allocates nothing and a reader always gets one
+    complete frame. Control inputs are queued on a deque and applied by the physics side at the
+    start of the next step; repeated inputs to the same control coalesce, so dragging a slider
+    costs the GUI thread one append per event.
+    """
+
+    def __init__(self, snapshot):
+        self._frame = np.zeros(len(SCALAR_FIELDS) + len(snapshot.battery_soc))
+        self._sequence = 0
+        self._read_sequence = None  # Sequence of the frame _last was built from
+        self._last = None
+        self._controls = deque()
+        self.publish(snapshot)
+        self.latest()  # Nobody writes yet, so a reader the writer later starves still has a whole frame
+
+    def publish(self, snapshot):
+        self.publish_frame([getattr(snapshot, name) for name in SCALAR_FIELDS], snapshot.battery_soc)
+
+    def publish_frame(self, scalars, battery_soc):
+        # One frame's values without a FrameSnapshot: scalars in SCALAR_FIELDS order, then battery_soc
+        self._sequence += 1
+        self._frame[:len(SCALAR_FIELDS)] = scalars
+        self._frame[len(SCALAR_FIELDS):] = battery_soc
+        self._sequence += 1
+
+    def latest(self):
+        for _ in range(SPIN_LIMIT):
+            before = self._sequence
+            if before == self._read_sequence:
+                return self._last
+            if before & 1:
+                continue
+            frame = self._frame.copy()
+            if self._sequence == before:
+                self._read_sequence, self._last = before, snapshot_from_frame(frame)
+                return self._last
+        return self._last
+
+    def submit(self, name, value):
+        if name not in CONTROL_NAMES:
+            raise ValueError(f"Unknown control: {name}")
+        self._controls.append((name, value))
+
+    def apply_controls(self, target):
+        # Called by the physics side between steps; returns how many controls changed
+        if not self._controls:
+            return 0
+
+        pending = {}
+        while True:
+            try:
+                name, value = self._controls.popleft()
+            except IndexError:
+                break
+            pending[name] = value
+
+        for name, value in pending.items():
+            setattr(target, name, value)
+        return len(pending)
+
+
+class SharedStateExchange:
+    """StateExchange across processes: a fixed-layout multiprocessing.shared_memory block.
+
+    Each half of the block has a single writer - control inputs come from the GUI process,
+    snapshots from the renderer process - guarded by a sequence counter (a seqlock): the writer
+    makes it odd, writes, and makes it even again; a reader copies the data and retries if the
+    counter was odd or moved meanwhile. Neither side ever waits for the other. Controls keep a
+    version per name, so the renderer applies each input once and the newest value wins.
+    The header also carries the renderer status and a stop request for shutting it down.
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner  # The creating process unlinks the block on close()
+        self.name = shm.name
+        header = np.ndarray(HEADER_WORDS, dtype="<i8", buffer=shm.buf)
+        self.battery_count = int(header[0])
+
+        count = len(CONTROL_ORDER)
+        offset = header.nbytes
+        self._header = header
+        self._control_values = np.ndarray(count, dtype="<f8", buffer=shm.buf, offset=offset)
+        self._control_versions = np.ndarray(count, dtype="<i8", buffer=shm.buf, offset=offset + 8 * count)
+        self._outputs = np.ndarray(len(SCALAR_FIELDS) + self.battery_count, dtype="<f8", buffer=shm.buf,
+                                   offset=offset + 16 * count)
+
+        self._applied_sequence = 0
+        self._applied_versions = np.zeros(count, dtype=np.int64)
+        self._last = None  # Newest snapshot read, returned while the writer stays mid-update
+
+    @staticmethod
+    def size(battery_count):
+        return 8 * (HEADER_WORDS + 2 * len(CONTROL_ORDER) + len(SCALAR_FIELDS) + battery_count)
+
+    @classmethod
+    def create(cls, snapshot):
+        """New block holding `snapshot` as the first published frame."""
+        battery_count = len(snapshot.battery_soc)
+        shm = shared_memory.SharedMemory(create=True, size=cls.size(battery_count))
+        np.ndarray(1, dtype="<i8", buffer=shm.buf)[0] = battery_count
+        exchange = cls(shm, owner=True)
+        exchange.publish(snapshot)
+        return exchange
+
+    @classmethod
+    def attach(cls, name):
+        shm = shared_memory.SharedMemory(name=name)
+        # Before Python 3.13 attaching also registers the block with this process's resource tracker,
+        # which would unlink it when this process exits; only the creator owns it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        exchange = cls(shm)
+        if exchange._header[2] & 1:
+            exchange._header[2] += 1  # A previous renderer was killed mid-publish
+        return exchange
+
+    def _read(self, sequence, *arrays):
+        # Consistent copies of arrays guarded by the header word `sequence`, or None if they never settle
+        for _ in range(SPIN_LIMIT):
+            before = self._header[sequence]
+            if before & 1:
+                continue
+            copies = [array.copy() for array in arrays]
+            if self._header[sequence] == before:
+                return before, copies
+        return None
+
+    def publish(self, snapshot):
+        self.publish_frame([getattr(snapshot, name) for name in SCALAR_FIELDS], snapshot.battery_soc)
+
+    def publish_frame(self, scalars, battery_soc):
+        # Same as StateExchange.publish_frame
+        self._header[2] += 1
+        self._outputs[:len(SCALAR_FIELDS)] = scalars
+        self._outputs[len(SCALAR_FIELDS):] = battery_soc
+        self._header[2] += 1
+
+    def latest(self):
+        read = self._read(2, self._outputs)
+        if read is None:
+            return self._last
+        self._last = snapshot_from_frame(read[1][0])
+        return self._last
+
+    def submit(self, name, value):
+        if name not in CONTROL_NAMES:
+            raise ValueError(f"Unknown control: {name}")
+        index = CONTROL_ORDER.index(name)
+        self._header[1] += 1
+        self._control_values[index] = value
+        self._control_versions[index] += 1
+        self._header[1] += 1
+
+    def apply_controls(self, target):
+        # Called by the physics side between steps; a single header read when nothing changed
+        if self._header[1] == self._applied_sequence:
+            return 0
+        read = self._read(1, self._control_values, self._control_versions)
+        if read is None:
+            return 0
+
+        sequence, (values, versions) = read
+        changed = np.flatnonzero(versions != self._applied_versions)
+        for index in changed:
+            name = CONTROL_ORDER[index]
+            setattr(target, name, FrameSnapshot.__annotations__[name](values[index]))
+        self._applied_sequence = sequence
+        self._applied_versions = versions
+        return len(changed)
+
+    def status(self):
+        return int(self._header[3])
+
+    def set_status(self, status):
+        self._header[3] = status
+
+    def stop_requested(self):
+        return bool(self._header[4])
+
+    def request_stop(self, stop=True):
+        self._header[4] = int(stop)
+
+    def close(self):
+        # The arrays have to let go of the buffer before the mapping can be closed
+        self._header = self._control_values = self._control_versions = self._outputs = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
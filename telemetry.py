@@ -0,0 +1,45 @@
+import time
+from collections import deque
+
+
+class TelemetryPublisher:
+    """Pushes simulation snapshots into a bounded queue at a fixed rate for a GUI to drain.
+
+    offer() only queues a sample once per interval, and due() tells the simulation when that is,
+    so it is cheap at any step rate. When the consumer falls behind, the oldest samples
+    are dropped. A rate of 0 turns publishing off.
+    """
+
+    def __init__(self, rate_hz=0.0, maxlen=64):
+        self.samples = deque(maxlen=maxlen)
+        self.interval = 0.0
+        self.next_sample = 0.0
+        self.published = 0
+        self.set_rate(rate_hz)
+
+    def set_rate(self, rate_hz):
+        self.rate_hz = rate_hz
+        self.interval = 1.0 / rate_hz if rate_hz > 0 else float("inf")
+        self.next_sample = 0.0 if rate_hz > 0 else float("inf")
+
+    def due(self, now=None):
+        # Whether offer() would queue a sample now, so the caller only builds one when it is
+        return (time.perf_counter() if now is None else now) >= self.next_sample
+
+    def offer(self, snapshot, now=None):
+        now = time.perf_counter() if now is None else now
+        if now < self.next_sample:
+            return False
+        self.samples.append(snapshot)
+        self.published += 1
+        self.next_sample = now + self.interval
+        return True
+
+    def drain(self):
+        # Everything queued since the last drain, oldest first
+        drained = []
+        while True:
+            try:
+                drained.append(self.samples.popleft())
+            except IndexError:
+                return drained
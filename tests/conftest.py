@@ -0,0 +1,24 @@
+import pytest
+
+# offscreen picks the window-less GL platform, which has to happen before any test module imports OpenGL
+try:
+    import offscreen
+except ImportError:
+    offscreen = None
+
+
+@pytest.fixture(scope="session")
+def gl_renderer():
+    # One offscreen context for every test that draws, skipped where none can be created
+    if offscreen is None:
+        pytest.skip("no offscreen GL: PyOpenGL with EGL is not available")
+    from OpenGL.error import Error as GLError
+
+    try:
+        renderer = offscreen.OffscreenRenderer(64, 48)
+    except RuntimeError as error:
+        pytest.skip(f"no offscreen GL: {error}")
+    except GLError as error:
+        pytest.skip(f"no offscreen GL: {getattr(error.baseOperation, '__name__', 'GL call')} failed")
+    yield renderer
+    renderer.close()
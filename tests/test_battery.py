@@ -0,0 +1,22 @@
+import numpy as np
+
+from battery import BatteryBank
+
+
+def test_run_matches_stepping_through_both_limits():
+    rng = np.random.default_rng(0)
+    charge = rng.uniform(0, 2600, (5000, 5))
+    discharge = rng.uniform(0, 2000, (5000, 5))
+    discharge[:2500] *= 1.6  # Drains to empty first, then fills up
+    batched = BatteryBank(5, 1.0, max_charge_c_rate=2000, initial_soc=0.3)
+    stepped = BatteryBank(5, 1.0, max_charge_c_rate=2000, initial_soc=0.3)
+
+    energy = batched.run(charge, discharge, 0.016)
+    expected = []
+    for c, d in zip(charge, discharge):
+        stepped.step(c, d, 0.016)
+        expected.append(stepped.energy.copy())
+
+    np.testing.assert_allclose(energy, expected, atol=1e-12)
+    np.testing.assert_array_equal(batched.energy, energy[-1])
+    assert (energy == 0).any() and (energy == 1).any()
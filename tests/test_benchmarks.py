@@ -0,0 +1,43 @@
+import pytest
+
+import benchmarks
+from benchmarks import SkipBenchmark, compare, run_benchmarks
+
+
+def test_compare_flags_only_slowdowns_beyond_the_threshold():
+    baseline = {"a": {"min_us": 100.0}, "b": {"min_us": 100.0}, "c": {"min_us": 100.0}}
+    results = {"a": {"min_us": 119.0}, "b": {"min_us": 150.0}, "c": {"min_us": 50.0}, "new": {"min_us": 1.0}}
+
+    rows, regressions = compare(results, baseline, threshold=20.0)
+
+    assert regressions == ["b"]
+    deltas = {name: delta for name, _, _, delta in rows}
+    assert deltas["c"] == -50.0 and deltas["new"] is None
+
+
+def test_benchmarks_that_cannot_run_are_left_out(monkeypatch):
+    def unavailable():
+        raise SkipBenchmark("no display")
+
+    monkeypatch.setattr(benchmarks, "BENCHMARKS", {
+        "test.skipped": ("kernels", unavailable),
+        "test.runs": ("kernels", lambda: lambda: None),
+    })
+
+    results = run_benchmarks(min_time=0.01, rounds=2)
+
+    assert list(results) == ["test.runs"]
+    assert results["test.runs"]["rounds"] == 2
+
+
+def test_draw_passes_skip_when_no_gl_context_can_be_created(monkeypatch):
+    offscreen = pytest.importorskip("offscreen")
+
+    def no_context(width, height):
+        raise RuntimeError("Could not initialize EGL")
+
+    monkeypatch.setattr(offscreen, "OffscreenRenderer", no_context)
+    monkeypatch.setattr(benchmarks, "_renderer", None)
+
+    with pytest.raises(SkipBenchmark, match="no offscreen GL: Could not initialize EGL"):
+        benchmarks.bench_draw_house()
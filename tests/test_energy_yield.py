@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from energy_yield import simulate_weather_yield, simulate_yield
+from solar import (compute_solar_efficiency, compute_sun_position, get_panel_normal, get_sun_direction,
+                   solar_declination)
+from weather import WeatherData
+
+TMY3_COLUMNS = "Date (MM/DD/YYYY),Time (HH:MM),GHI (W/m^2),DNI (W/m^2),DHI (W/m^2),Dry-bulb (C)"
+
+
+def test_fixed_beam_yield_matches_the_scalar_model():
+    result = simulate_yield(40.0, "2025-03-01", "2025-03-03", step_minutes=30, tilt=30.0, azimuth=20.0,
+                            clear_sky=False)
+
+    assert len(result.times) == 96
+    for i in range(0, 96, 5):
+        time_of_day = i % 48 / 2
+        altitude, azimuth = compute_sun_position(40.0, float(solar_declination(60 + i // 48)), time_of_day)
+        efficiency = compute_solar_efficiency(get_panel_normal(30.0, 20.0), get_sun_direction(altitude, azimuth))
+        efficiency = efficiency if altitude > 0 else 0.0
+        assert result.efficiency[i] == pytest.approx(efficiency, abs=1e-9)
+        assert result.energy[i] == pytest.approx(0.18 * 2 * 1000 * efficiency * 0.5, abs=1e-6)
+    assert result.total_energy == pytest.approx(result.energy.sum())
+
+
+def test_yield_converges_with_the_time_step():
+    hourly = simulate_yield(40.0, "2025-06-01", "2025-06-08", step_minutes=60, tilt=30.0)
+    minutely = simulate_yield(40.0, "2025-06-01", "2025-06-08", step_minutes=1, tilt=30.0)
+
+    assert minutely.total_energy == pytest.approx(hourly.total_energy, rel=0.02)
+    assert np.all(minutely.energy[minutely.sun_altitude <= 0] == 0.0)
+
+
+@pytest.fixture
+def five_hours_tmy3(tmp_path):
+    # Five hourly samples around noon with a constant sky
+    path = tmp_path / "five_TYA.CSV"
+    rows = [f"06/21/2003,{hour:02d}:00,800,700,100,25.0" for hour in range(10, 15)]
+    path.write_text("\n".join(["724666,DENVER CENTENNIAL,CO,-7.0,39.570,-104.850,1793", TMY3_COLUMNS] + rows) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 4])
+def test_weather_yield_does_not_depend_on_the_chunking(five_hours_tmy3, chunk_rows):
+    whole = simulate_weather_yield(WeatherData(five_hours_tmy3), tilt=30.0)
+    weather = WeatherData(five_hours_tmy3)
+    weather.chunk_rows = chunk_rows  # 4 and 1 leave a single-row final chunk
+
+    chunked = simulate_weather_yield(weather, tilt=30.0)
+
+    assert chunked.samples == whole.samples == 5
+    assert chunked.total_energy == pytest.approx(whole.total_energy)
+    assert chunked.total_energy > 4 * whole.peak_p_out  # The last hour counts too
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from engine import SimulationEngine
+from plant import PVPlant
+from recorder import Recorder, Recording
+from shading import ShadingEngine
+from tracker import SunTracker
+
+
+def _engine(recording=None):
+    engine = SimulationEngine(seed=0)
+    engine.clock_start = np.datetime64("2025-06-21T05:00")
+    engine.time_scale = 60.0
+    engine.tracker = SunTracker("dual", slew_rate=0.05)
+    engine.battery_enabled = False  # Battery noise is drawn in another order by run_batch
+    if recording is not None:
+        engine.recorder = Recorder(recording, engine.battery_bank.count, chunk_rows=256)
+    return engine
+
+
+def test_run_batch_matches_stepping(tmp_path):
+    stepped, batched = _engine(tmp_path / "stepped"), _engine(tmp_path / "batched")
+    for _ in range(600):
+        stepped.step(1.0)
+    batched.run_batch(400, 1.0)
+    batched.run_batch(200, 1.0)
+    stepped.recorder.close()
+    batched.recorder.close()
+
+    for name in ("tilt_angle", "azimuth_angle", "sun_altitude", "efficiency", "shaded", "p_in", "p_out"):
+        assert getattr(batched, name) == pytest.approx(getattr(stepped, name), abs=1e-6), name
+    assert (batched.steps, batched.time) == (stepped.steps, pytest.approx(stepped.time))
+
+    expected, actual = Recording(tmp_path / "stepped"), Recording(tmp_path / "batched")
+    assert len(actual) == len(expected) == 600
+    for name in ("steps", "time", "tilt_angle", "sun_azimuth", "efficiency", "p_out", "battery_soc"):
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-4, atol=1e-4, err_msg=name)
+
+
+def test_run_batch_keeps_batteries_in_range():
+    engine = SimulationEngine(seed=0)
+    engine.run_batch(5000)
+    soc = engine.battery_bank.state_of_charge()
+    assert engine.steps == 5000
+    assert np.all((soc >= 0) & (soc <= 1))
+    assert engine.exchange.latest().steps == 5000
+
+
+@pytest.mark.parametrize("tracker", [None, SunTracker("dual", slew_rate=0.05)])
+def test_run_batch_with_a_shaded_plant_matches_stepping(tmp_path, tracker):
+    def plant_engine(recording):
+        engine = SimulationEngine(seed=0)
+        engine.clock_start = np.datetime64("2025-12-21T08:00")
+        engine.time_scale = 60.0
+        engine.tilt_angle = 30.0
+        engine.tracker = tracker
+        engine.battery_enabled = False
+        engine.plant = PVPlant.grid(4, 6, row_pitch=2.0, tilt=30.0)
+        engine.plant.shading = ShadingEngine.for_plant(engine.plant)
+        engine.recorder = Recorder(recording, engine.battery_bank.count, chunk_rows=256)
+        return engine
+
+    stepped, batched = plant_engine(tmp_path / "stepped"), plant_engine(tmp_path / "batched")
+    shaded = 0.0
+    for _ in range(300):
+        stepped.step(1.0)
+        shaded = max(shaded, stepped.plant.shading.shaded_fractions(stepped.sun_dir).max())
+    batched.run_batch(300, 1.0)
+    stepped.recorder.close()
+    batched.recorder.close()
+
+    expected, actual = Recording(tmp_path / "stepped"), Recording(tmp_path / "batched")
+    for name in ("p_in", "p_out"):
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-5, err_msg=name)
+    np.testing.assert_allclose(batched.plant.panel_power, stepped.plant.panel_power)
+    np.testing.assert_array_equal(batched.plant.tilt, stepped.plant.tilt)
+    assert shaded > 0  # Rows do shade each other
@@ -0,0 +1,30 @@
+import pytest
+
+from engine import SimulationEngine
+from ensemble import panel_efficiency_at, run_ensemble
+
+
+def test_fewer_steps_than_record_every_is_rejected():
+    with pytest.raises(ValueError, match="record_every"):
+        run_ensemble(10, steps=5, record_every=10, efficiency=0.5, workers=1)
+
+
+def test_zero_realizations_is_rejected():
+    with pytest.raises(ValueError, match="realization"):
+        run_ensemble(0, steps=10, efficiency=0.5, workers=1)
+
+
+def test_smallest_valid_ensemble_records_one_sample():
+    result = run_ensemble(1, steps=10, record_every=10, efficiency=0.5, workers=1)
+    assert result.realizations == 1
+    assert len(result.times) == 1
+
+
+def test_panel_efficiency_includes_the_shading_loss_of_the_live_engine():
+    engine = SimulationEngine(battery_count=50)
+    engine.azimuth_angle = -30.0
+    engine.battery_enabled = False
+    engine.step()
+    assert engine.shaded > 0  # The bank shades part of the panel
+
+    assert panel_efficiency_at(0.0, -30.0, battery_count=50) == pytest.approx(engine.efficiency * (1 - engine.shaded))
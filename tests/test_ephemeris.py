@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import ephemeris
+from ephemeris import Site, day_table, solar_time, sun_position_at, sun_positions, sun_positions_at
+from solar import compute_sun_positions, equation_of_time, solar_declination
+
+
+def test_positions_follow_solar_time_on_the_zone_meridian():
+    # On its time zone's meridian a site's solar time is the clock plus the equation of time
+    site = Site(45.0, 15.0, 1.0)
+    times = np.arange("2025-02-10T06:00", "2025-02-10T18:00", 30, dtype="datetime64[m]")
+
+    day, hours = solar_time(site, times)
+    clock = np.arange(len(times)) * 0.5 + 6.0
+    np.testing.assert_allclose(hours, clock + equation_of_time(41) / 60)
+
+    altitude, azimuth = sun_positions(site, times)
+    expected = compute_sun_positions(45.0, solar_declination(41), hours)
+    np.testing.assert_allclose(altitude, expected[0])
+    np.testing.assert_allclose(azimuth, expected[1])
+
+
+@pytest.mark.parametrize("site, start", [
+    (Site(40.0, -3.7, 1.0), "2025-06-20T00:00"),
+    (Site(-33.9, 18.4, 2.0), "2025-12-30T00:00"),  # Across the new year, sun in the north
+    (Site(70.0, 25.0, 2.0), "2025-06-20T00:00"),  # Midnight sun: the azimuth passes due north above the horizon
+])
+def test_cached_tables_match_the_direct_series(site, start):
+    times = np.datetime64(start) + np.arange(0, 3 * 86400, 137) * np.timedelta64(1, "s")
+
+    altitude, azimuth = sun_positions_at(site, times)
+    expected_altitude, expected_azimuth = sun_positions(site, times)
+
+    # The declination steps once a day, which the last minute before midnight interpolates towards
+    np.testing.assert_allclose(altitude, expected_altitude, atol=0.02)
+    up = expected_altitude > 0.1
+    np.testing.assert_allclose(((azimuth - expected_azimuth + 180) % 360 - 180)[up], 0.0, atol=0.05)
+
+
+def test_single_lookup_matches_the_array_version():
+    site = Site(52.5, 13.4, 1.0)
+    times = np.array(["2025-04-01T07:13:20", "2025-04-01T12:00", "2025-04-02T16:45:05"], dtype="datetime64[s]")
+
+    altitude, azimuth = sun_positions_at(site, times)
+    for i, when in enumerate(times):
+        assert sun_position_at(site, when) == (pytest.approx(altitude[i]), pytest.approx(azimuth[i]))
+
+
+def test_day_tables_are_cached_and_read_only():
+    ephemeris.cache_clear()
+    site = Site(40.0)
+    table = day_table(site, "2025-05-05")
+
+    assert day_table(site, np.datetime64("2025-05-05T13:00")) is table
+    assert ephemeris.cache_info().hits == 1
+    assert len(table.altitude) == 86400 // table.step + 1
+    with pytest.raises(ValueError):
+        table.altitude[0] = 0.0
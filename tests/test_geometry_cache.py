@@ -0,0 +1,72 @@
+import numpy as np
+from OpenGL.GL import *
+
+from geometry_cache import GeometryCache
+
+
+def _quad(color):
+    def draw():
+        draw.calls += 1
+        glColor3f(*color)
+        glBegin(GL_QUADS)
+        for x, y in ((-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)):
+            glVertex3f(x, y, 0.0)
+        glEnd()
+    draw.calls = 0
+    return draw
+
+
+def _pixels(renderer, draw):
+    glBindFramebuffer(GL_FRAMEBUFFER, renderer.framebuffer)
+    glViewport(0, 0, renderer.width, renderer.height)
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+    glPushAttrib(GL_ENABLE_BIT)
+    glDisable(GL_LIGHTING)
+    glDisable(GL_DEPTH_TEST)
+    glClearColor(0.0, 0.0, 0.0, 1.0)
+    glClear(GL_COLOR_BUFFER_BIT)
+    draw()
+    glPopAttrib()
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    out = np.empty((renderer.height, renderer.width, 3), np.uint8)
+    glReadPixels(0, 0, renderer.width, renderer.height, GL_RGB, GL_UNSIGNED_BYTE, out)
+    return out
+
+
+def test_display_list_is_only_recompiled_when_its_key_changes(gl_renderer):
+    geometry = GeometryCache()
+    red = _quad((1.0, 0.0, 0.0))
+
+    geometry.draw("quad", red, key=1)
+    list_id = geometry.lists["quad"][0]
+    geometry.draw("quad", red, key=1)
+    assert red.calls == 1 and geometry.lists["quad"][0] == list_id
+
+    geometry.draw("quad", red, key=2)
+    assert red.calls == 2
+    assert geometry.lists["quad"][1] == 2
+
+    geometry.invalidate()
+    assert geometry.lists == {}
+
+
+def test_replayed_list_draws_the_same_pixels_as_the_function(gl_renderer):
+    geometry = GeometryCache()
+    green = _quad((0.0, 1.0, 0.0))
+
+    direct = _pixels(gl_renderer, green)
+    geometry.build("quad", green)
+    cached = _pixels(gl_renderer, lambda: geometry.draw("quad", green))
+
+    assert green.calls == 2  # Once directly, once compiled; the cached draw only replays
+    assert direct[..., 1].max() == 255
+    np.testing.assert_array_equal(cached, direct)
+    geometry.invalidate("quad")
@@ -0,0 +1,107 @@
+import numpy as np
+from OpenGL.GL import *
+
+from instancing import box_batch, box_outline_batch, cylinder_batch, merge_batches, scaled_axes
+from shapes import CUBE_CORNERS, solid_cube
+
+CENTERS = np.array([[0.0, 0.0, 0.0], [3.0, 1.0, -2.0], [-4.0, 0.5, 1.0]])
+SIZES = np.array([[1.0, 2.0, 3.0], [2.0, 2.0, 2.0], [0.5, 1.0, 4.0]])
+COLORS = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+
+
+def test_axis_aligned_boxes_are_scaled_unit_cubes():
+    batch = box_batch(CENTERS, scaled_axes(SIZES), COLORS)
+
+    assert len(batch) == 3 * 24
+    expected = CENTERS[:, None, :] + CUBE_CORNERS * SIZES[:, None, :] / 2
+    np.testing.assert_allclose(batch.vertices.reshape(3, 24, 3), expected, atol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(batch.normals, axis=-1), 1.0, atol=1e-6)
+    np.testing.assert_array_equal(batch.colors.reshape(3, 24, 3), np.repeat(COLORS[:, None], 24, axis=1))
+
+
+def test_rotated_box_follows_its_axes():
+    angle = np.radians(30.0)
+    rotation = np.array([[np.cos(angle), 0.0, -np.sin(angle)], [0.0, 1.0, 0.0], [np.sin(angle), 0.0, np.cos(angle)]])
+    batch = box_batch([1.0, 2.0, 3.0], (rotation * [[2.0], [1.0], [0.5]])[None], (0.5, 0.5, 0.5))
+
+    local = (batch.vertices - [1.0, 2.0, 3.0]) @ rotation.T  # Back into the box's own frame
+    np.testing.assert_allclose(np.abs(local), np.broadcast_to([2.0, 1.0, 0.5], local.shape), atol=1e-5)
+    faces = batch.normals.reshape(6, 4, 3)[:, 0]
+    np.testing.assert_allclose(np.abs(faces @ rotation.T).max(axis=1), 1.0, atol=1e-6)
+
+
+def test_outlines_are_the_box_edges():
+    batch = box_outline_batch(CENTERS[:1], scaled_axes(SIZES[:1]), COLORS[0])
+
+    edges = batch.vertices.reshape(-1, 2, 3)
+    lengths = np.sort(np.linalg.norm(edges[:, 1] - edges[:, 0], axis=-1))
+    assert len(edges) == 24  # 4 per face, like wire_cube
+    np.testing.assert_allclose(lengths, np.repeat([1.0, 2.0, 3.0], 8), atol=1e-6)
+
+
+def test_cylinders_run_between_their_points_at_the_radius():
+    starts = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0], [2.0, 0.0, 0.0]])
+    ends = np.array([[0.0, 5.0, 0.0], [1.0, 1.0, 1.0], [5.0, 4.0, 0.0]])  # The second has no length
+    batch = cylinder_batch(starts, ends, 0.1, COLORS, slices=6)
+
+    assert len(batch) == 2 * 6 * 4
+    vertices = batch.vertices.reshape(2, -1, 3)
+    for vertex, start, end in zip(vertices, starts[[0, 2]], ends[[0, 2]]):
+        axis = (end - start) / np.linalg.norm(end - start)
+        along = (vertex - start) @ axis
+        across = np.linalg.norm(vertex - start - along[:, None] * axis, axis=-1)
+        np.testing.assert_allclose(np.unique(np.round(along, 5)), [0.0, np.linalg.norm(end - start)], atol=1e-5)
+        np.testing.assert_allclose(across, 0.1, atol=1e-6)
+    np.testing.assert_array_equal(batch.colors.reshape(2, -1, 3)[:, 0], COLORS[[0, 2]])
+
+
+def test_merged_batches_keep_every_instance():
+    boxes = box_batch(CENTERS, scaled_axes(SIZES), COLORS)
+    more = box_batch(CENTERS + 10, scaled_axes(SIZES), COLORS)
+
+    merged = merge_batches(boxes, more)
+
+    assert merged.mode == GL_QUADS and len(merged) == len(boxes) + len(more)
+    np.testing.assert_array_equal(merged.vertices[len(boxes):], more.vertices)
+
+
+def _draw_pixels(renderer, draw):
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glOrtho(-8, 8, -6, 6, -20, 20)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+    glRotatef(30, 1, 1, 0)
+    glPushAttrib(GL_ENABLE_BIT)
+    glDisable(GL_LIGHTING)
+    glEnable(GL_DEPTH_TEST)
+    glClearColor(0.0, 0.0, 0.0, 1.0)
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    draw()
+    glPopAttrib()
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    out = np.empty((renderer.height, renderer.width, 3), np.uint8)
+    glReadPixels(0, 0, renderer.width, renderer.height, GL_RGB, GL_UNSIGNED_BYTE, out)
+    return out
+
+
+def test_batch_draws_like_one_cube_per_instance(gl_renderer):
+    def per_cube():
+        for center, size, color in zip(CENTERS, SIZES, COLORS):
+            glPushMatrix()
+            glTranslatef(*center)
+            glScalef(*size)
+            glColor3f(*color)
+            solid_cube(1.0)
+            glPopMatrix()
+
+    batched = _draw_pixels(gl_renderer, box_batch(CENTERS, scaled_axes(SIZES), COLORS).draw)
+    expected = _draw_pixels(gl_renderer, per_cube)
+
+    assert np.count_nonzero(expected.any(axis=-1)) > 100
+    assert np.count_nonzero((batched != expected).any(axis=-1)) <= 0.01 * batched.shape[0] * batched.shape[1]
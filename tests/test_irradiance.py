@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from irradiance import (SOLAR_CONSTANT, air_mass, clear_sky_irradiance, extraterrestrial_irradiance, plane_of_array,
+                        poa_irradiance)
+
+
+def test_air_mass_known_values():
+    assert air_mass(90.0) == pytest.approx(1.0, abs=1e-3)
+    assert air_mass(30.0) == pytest.approx(1.994, abs=1e-3)  # Close to 1 / sin(30)
+    assert air_mass(1e-9) == pytest.approx(37.92, abs=0.01)  # Kasten & Young's horizon value
+    assert air_mass(0.0) == air_mass(-5.0) == np.inf  # On or below the horizon counts as down
+
+
+def test_extraterrestrial_irradiance_follows_the_orbit():
+    assert extraterrestrial_irradiance() == SOLAR_CONSTANT
+    assert extraterrestrial_irradiance(3) == pytest.approx(1412, abs=1)  # Near perihelion
+    assert extraterrestrial_irradiance(185) == pytest.approx(1322, abs=1)  # Near aphelion
+
+
+def test_clear_sky_known_values():
+    dni, dhi, ghi = clear_sky_irradiance(np.array([90.0, 30.0, 0.0, -10.0]))
+
+    # Meinel: 1367 * 0.7 ** (AM ** 0.678)
+    np.testing.assert_allclose(dni[:2], [957.0, 773.4], atol=0.1)
+    np.testing.assert_allclose(dhi, 0.1 * dni)
+    np.testing.assert_allclose(ghi[:2], dni[:2] * [1.0, 0.5] + dhi[:2])
+    assert dni[3] == dhi[3] == ghi[3] == 0.0
+
+
+def test_plane_of_array_transposition():
+    dni, dhi, ghi = 800.0, 80.0, 480.0
+
+    flat = plane_of_array(0.5, 1.0, dni, dhi, ghi)  # Horizontal: sees the whole sky and no ground
+    assert (flat.beam, flat.sky_diffuse, flat.ground_reflected) == (400.0, 80.0, 0.0)
+
+    wall = plane_of_array(1.0, 0.0, dni, dhi, ghi, albedo=0.25)  # Vertical, facing the sun
+    assert (wall.beam, wall.sky_diffuse, wall.ground_reflected) == (800.0, 40.0, 60.0)
+    assert wall.total == 900.0
+
+
+def test_horizontal_panel_receives_the_global_irradiance():
+    altitude = np.linspace(-5, 85, 19)
+    azimuth = np.linspace(-120, 120, 19)
+
+    poa = poa_irradiance(0.0, 0.0, altitude, azimuth)
+
+    np.testing.assert_allclose(poa.total, clear_sky_irradiance(altitude)[2], atol=1e-9)
@@ -0,0 +1,46 @@
+import pytest
+
+from lod import SPHERE_LEVELS, SphereLOD
+
+
+@pytest.mark.parametrize("distance, slices", [
+    (10.0, 40),  # ~116 px radius needs pi * sqrt(116) ~ 34 slices
+    (100.0, 12),  # ~11.6 px needs ~11
+    (1000.0, 6),  # ~1.2 px, the coarsest level
+])
+def test_level_follows_the_projected_size(distance, slices):
+    lod = SphereLOD()
+    lod.set_view((0.0, 0.0, distance), viewport_height=960)
+
+    assert lod.select_level((0.0, 0.0, 0.0), 1.0) == slices
+
+
+def test_level_never_exceeds_the_callers_maximum():
+    lod = SphereLOD()
+    lod.set_view((0.0, 0.0, 2.0), viewport_height=960)
+
+    assert lod.select_level((0.0, 0.0, 0.0), 1.0) == SPHERE_LEVELS[-1]
+    assert lod.select_level((0.0, 0.0, 0.0), 1.0, max_slices=16) == 16
+    assert lod.select_level((0.0, 0.0, 0.0), 5.0, max_slices=20) == 20  # Camera inside the sphere
+
+
+def test_levels_get_coarser_with_distance_and_smaller_viewports():
+    lod = SphereLOD()
+    levels = []
+    for distance in (5.0, 20.0, 80.0, 320.0):
+        lod.set_view((distance, 0.0, 0.0), viewport_height=960)
+        levels.append(lod.select_level((0.0, 0.0, 0.0), 1.0))
+    assert levels == sorted(levels, reverse=True) and levels[0] > levels[-1]
+
+    lod.set_view((20.0, 0.0, 0.0), viewport_height=240)
+    assert lod.select_level((0.0, 0.0, 0.0), 1.0) < levels[1]
+
+
+def test_draw_compiles_every_level_once(gl_renderer):
+    lod = SphereLOD()
+    lod.draw(1.0, 10)
+    lists = dict(lod.lists)
+    lod.draw(2.0, 50)
+
+    assert sorted(lists) == list(SPHERE_LEVELS)
+    assert lod.lists == lists
@@ -0,0 +1,30 @@
+import pytest
+
+from energy_yield import simulate_yield
+from optimizer import optimize_orientation
+
+
+def test_equinox_beam_optimum_faces_south_at_the_latitude():
+    # Cooper's declination is 0 on day 81: the sun moves in the equator's plane all day,
+    # so a south-facing panel tilted by the latitude faces it squarely from sunrise to sunset
+    result = optimize_orientation(40.0, "2025-03-22", "2025-03-23", step_minutes=10, workers=1, clear_sky=False)
+
+    assert result.tilt == pytest.approx(40.0, abs=0.2)
+    assert result.azimuth == pytest.approx(0.0, abs=0.2)
+    assert result.energy == pytest.approx(result.surface_energy.max(), rel=0.01)
+
+
+def test_optimum_energy_matches_the_yield_model():
+    result = optimize_orientation(40.0, "2025-06-01", "2025-06-08", workers=1)
+
+    expected = simulate_yield(40.0, "2025-06-01", "2025-06-08", tilt=result.tilt, azimuth=result.azimuth)
+    assert result.energy == pytest.approx(expected.total_energy, rel=1e-9)
+    assert result.energy >= simulate_yield(40.0, "2025-06-01", "2025-06-08", tilt=30.0).total_energy
+
+
+def test_process_pool_finds_the_same_optimum():
+    serial = optimize_orientation(35.0, "2025-01-01", "2025-02-01", coarse_step=15.0, workers=1)
+    parallel = optimize_orientation(35.0, "2025-01-01", "2025-02-01", coarse_step=15.0, workers=2)
+
+    assert (parallel.tilt, parallel.azimuth) == pytest.approx((serial.tilt, serial.azimuth))
+    assert parallel.energy == pytest.approx(serial.energy)
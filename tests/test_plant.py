@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import plant as plant_module
+from ephemeris import Site, sun_positions
+from irradiance import clear_sky_irradiance, plane_of_array
+from plant import PVPlant
+from shading import ShadingEngine
+from solar import PANEL_AREA, PANEL_EFFICIENCY, compute_solar_efficiency, get_panel_normal, get_sun_directions
+
+
+def _day(step_minutes=20):
+    times = np.arange("2025-06-21T04:00", "2025-06-21T20:00", step_minutes, dtype="datetime64[m]")
+    altitude, azimuth = sun_positions(Site(40.0), times)
+    return get_sun_directions(altitude, azimuth), clear_sky_irradiance(altitude, 172)
+
+
+def test_uniform_plant_is_that_many_single_panels():
+    plant = PVPlant.grid(3, 4, tilt=25.0, azimuth=-10.0)
+    sun = get_sun_directions(50.0, 30.0)
+    dni, dhi, ghi = clear_sky_irradiance(50.0)
+
+    p_in, p_out = plant.step(sun, dni, dhi, ghi)
+
+    efficiency = compute_solar_efficiency(get_panel_normal(25.0, -10.0), sun.tolist())
+    single = float(plane_of_array(efficiency, np.cos(np.radians(25.0)), dni, dhi, ghi).total) * PANEL_AREA
+    assert p_in == pytest.approx(12 * single)
+    assert p_out == pytest.approx(12 * single * PANEL_EFFICIENCY)
+    np.testing.assert_allclose(plant.panel_power, single * PANEL_EFFICIENCY)
+
+
+def test_grid_lays_rows_along_z_and_panels_along_x():
+    plant = PVPlant.grid(2, 3, row_pitch=4.0, column_pitch=1.5, origin=(10.0, 0.0, 0.0))
+
+    assert len(plant) == 6 and plant.total_area == 6 * PANEL_AREA
+    np.testing.assert_allclose(plant.positions[[0, 2, 3]], [[10.0, 0, 0], [13.0, 0, 0], [10.0, 0, 4.0]])
+
+
+@pytest.mark.parametrize("shaded", [False, True])
+def test_power_series_matches_stepping_in_blocks(monkeypatch, shaded):
+    monkeypatch.setattr(plant_module, "MAX_BLOCK_SIZE", 50)  # Several blocks of timestamps
+    rng = np.random.default_rng(0)
+    plant = PVPlant.grid(4, 5, row_pitch=2.0, tilt=rng.uniform(0, 40, 20), azimuth=rng.uniform(-30, 30, 20),
+                         efficiency=rng.uniform(0.15, 0.2, 20))
+    if shaded:
+        plant.shading = ShadingEngine.for_plant(plant)
+    suns, (dni, dhi, ghi) = _day()
+
+    p_in, p_out = plant.power_series(suns, dni, dhi, ghi)
+
+    expected = np.array([plant.step(sun, *c) for sun, *c in zip(suns, dni, dhi, ghi)]).T
+    np.testing.assert_allclose(p_in, expected[0], rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(p_out, expected[1], rtol=1e-9, atol=1e-9)
+
+
+def test_tracked_series_matches_turning_the_plant_every_step():
+    plant = PVPlant.grid(3, 3, row_pitch=2.0, tilt=20.0)
+    plant.shading = ShadingEngine.for_plant(plant)
+    suns, (dni, dhi, ghi) = _day()
+    tilt, azimuth = np.linspace(0, 60, len(suns)), np.linspace(-90, 90, len(suns))
+
+    p_in, p_out = plant.power_series(suns, dni, dhi, ghi, tilt=tilt, azimuth=azimuth)
+
+    np.testing.assert_array_equal(plant.tilt, 20.0)  # Back to its own orientation
+    expected = []
+    for i, sun in enumerate(suns):
+        plant.set_orientation(tilt[i], azimuth[i])
+        expected.append(plant.step(sun, dni[i], dhi[i], ghi[i]))
+    np.testing.assert_allclose(np.stack((p_in, p_out), axis=1), expected, rtol=1e-9, atol=1e-9)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from profiler import FrameProfiler
+
+
+def test_disabled_profiler_only_calls_through():
+    synced = []
+    profiler = FrameProfiler(sync=lambda: synced.append(True))
+
+    assert profiler.run("pass", lambda x: x * 2, 21) == 42
+    assert profiler.stats() == {} and synced == []
+
+    profiler.toggle()
+    assert profiler.run("pass", lambda x: x * 2, 21) == 42
+    assert profiler.stats()["pass"]["count"] == 1 and synced == [True]
+
+
+def test_stats_cover_the_last_window_slowest_first():
+    profiler = FrameProfiler(window=4)
+    for ms in (100, 1, 2, 3, 4, 5):  # The first two fall out of the window
+        profiler.add("draw", ms / 1000)
+    profiler.add("physics", 0.010)
+
+    stats = profiler.stats()
+    assert list(stats) == ["physics", "draw"]
+    assert stats["draw"]["min"] == pytest.approx(2.0)
+    assert stats["draw"]["avg"] == pytest.approx(3.5)
+    assert stats["draw"]["count"] == 6
+    assert profiler._recent(profiler.samples, profiler.counts, "draw") * 1000 == pytest.approx([2, 3, 4, 5])
+
+
+def test_frame_stats_from_frame_spacing_and_drawing_time():
+    profiler = FrameProfiler()
+    profiler.toggle()
+    for frame in range(11):
+        start = frame * 0.020  # 50 FPS
+        profiler.begin_frame(start)
+        profiler.end_frame(start + 0.005)
+
+    frame = profiler.frame_stats()
+    assert frame["fps"] == pytest.approx(50.0)
+    assert frame["frame_ms"] == pytest.approx(5.0)
+    assert frame["frames"] == 11
+    assert profiler.lines()[0].startswith("FPS: 50.0  frame: 5.00 ms")
+
+
+def test_export_writes_the_summary_and_raw_samples(tmp_path):
+    profiler = FrameProfiler(window=8)
+    profiler.toggle()
+    for ms in (1, 2, 3):
+        profiler.add("sky", ms / 1000)
+
+    with open(profiler.export(tmp_path / "profile.json")) as f:
+        document = json.load(f)
+
+    assert document["window"] == 8
+    assert document["samples_ms"]["sky"] == pytest.approx([1, 2, 3])
+    assert document["passes"]["sky"]["avg"] == pytest.approx(2.0)
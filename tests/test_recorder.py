@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+import pytest
+
+from engine import SimulationEngine
+from recorder import Recorder, Recording
+
+
+def test_recording_reads_back_every_step_across_chunks(tmp_path):
+    engine = SimulationEngine(battery_count=3, seed=0)
+    snapshots = []
+    with Recorder(tmp_path, battery_count=3, chunk_rows=16, max_pending=1) as recorder:
+        for _ in range(50):
+            engine.step()
+            snapshot = engine.snapshot()
+            recorder.record(snapshot)
+            snapshots.append(snapshot)
+
+    recording = Recording(tmp_path)
+    assert len(recording) == 50
+    np.testing.assert_array_equal(recording["steps"], np.arange(1, 51))
+    np.testing.assert_allclose(recording["time"], [s.time for s in snapshots])
+    np.testing.assert_allclose(recording["p_out"], [s.p_out for s in snapshots], rtol=1e-6)
+    np.testing.assert_allclose(recording["battery_soc"], [s.battery_soc for s in snapshots], rtol=1e-6)
+    assert isinstance(recording["p_out"], np.memmap)
+
+
+def test_stepping_records_without_building_snapshots(tmp_path, monkeypatch):
+    engine = SimulationEngine(seed=0)
+    engine.recorder = Recorder(tmp_path, engine.battery_bank.count, chunk_rows=8)
+    monkeypatch.setattr(engine, "snapshot", lambda: pytest.fail("snapshot built while stepping"))
+
+    for _ in range(20):
+        engine.step()
+    engine.recorder.close()
+
+    recording = Recording(tmp_path)
+    assert recording["steps"][-1] == 20
+    assert recording["p_out"][-1] == pytest.approx(engine.p_out, rel=1e-6)
+    np.testing.assert_allclose(recording["battery_soc"][-1], engine.battery_bank.state_of_charge(), rtol=1e-6)
+    latest = engine.exchange.latest()
+    assert (latest.steps, latest.average_battery) == (20, pytest.approx(engine.average_battery()))
+
+
+def test_batches_and_single_frames_interleave_across_chunks(tmp_path):
+    engine = SimulationEngine(battery_count=2, seed=0)
+    with Recorder(tmp_path, battery_count=2, chunk_rows=8) as recorder:
+        engine.recorder = recorder
+        engine.step()
+        engine.run_batch(20)
+        engine.step()
+
+        # Readable while it grows: the two full chunks are on disk, the open one isn't yet
+        deadline = time.monotonic() + 10
+        while recorder.rows_written < 16 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        growing = Recording(tmp_path)
+        assert len(growing) == 16
+        np.testing.assert_array_equal(growing["steps"], np.arange(1, 17))
+
+    recording = Recording(tmp_path)
+    assert len(recording) == 22
+    np.testing.assert_array_equal(recording["steps"], np.arange(1, 23))
+    assert np.all(np.diff(recording["time"]) > 0)
+    np.testing.assert_allclose(recording["battery_soc"][-1], engine.battery_bank.state_of_charge(), rtol=1e-6)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from engine import SimulationEngine
+from recorder import Recorder, Recording
+from replay import REPLAY_SPEEDS, ReplayPlayer
+
+
+@pytest.fixture
+def recording(tmp_path):
+    # 100 steps of 0.1 s: times 0.1 .. 10.0
+    engine = SimulationEngine(battery_count=3, seed=0)
+    with Recorder(tmp_path, battery_count=3, chunk_rows=32) as recorder:
+        engine.recorder = recorder
+        for _ in range(100):
+            engine.step(0.1)
+    return Recording(tmp_path)
+
+
+def test_playback_advances_by_wall_time_times_speed(recording):
+    player = ReplayPlayer(recording, speed=5)
+
+    player.advance(1.0)
+    assert player.position == pytest.approx(5.1)
+    assert recording["time"][player.row] <= player.position < recording["time"][player.row + 1]
+    assert player.row == 50
+
+    player.toggle_pause()
+    player.advance(1.0)
+    assert player.position == pytest.approx(5.1)
+
+
+def test_seek_clamps_to_the_recording(recording):
+    player = ReplayPlayer(recording)
+
+    player.seek(-100.0)
+    assert (player.position, player.row) == (pytest.approx(0.1), 0)
+    player.seek_fraction(0.5)
+    assert player.position == pytest.approx(5.05)
+    assert player.row == 49
+    player.seek(1e9)
+    assert (player.position, player.row) == (pytest.approx(10.0), 99)
+
+
+def test_end_of_recording_holds_then_restarts(recording):
+    player = ReplayPlayer(recording, speed=1000)
+
+    player.advance(1.0)
+    assert player.paused and player.row == 99
+    player.toggle_pause()
+    assert not player.paused and player.row == 0
+
+
+def test_speed_steps_through_the_presets(recording):
+    player = ReplayPlayer(recording)
+    player.set_speed(3)
+    player.faster()
+    assert player.speed == 5
+    player.slower()
+    assert player.speed == 2
+    player.set_speed(1e6)
+    player.faster()
+    assert player.speed == REPLAY_SPEEDS[-1]
+    player.set_speed(0)
+    player.slower()
+    assert player.speed == REPLAY_SPEEDS[0]
+
+
+def test_apply_puts_the_recorded_row_on_the_engine(recording):
+    player = ReplayPlayer(recording)
+    player.seek(3.05)
+    engine = SimulationEngine(battery_count=3, seed=1)
+
+    player.apply(engine)
+
+    row = player.row
+    assert engine.steps == recording["steps"][row] == 30
+    assert engine.p_out == pytest.approx(float(recording["p_out"][row]))
+    np.testing.assert_allclose(engine.battery_bank.state_of_charge(), recording["battery_soc"][row], rtol=1e-6)
+    assert engine.exchange.latest().steps == 30
@@ -0,0 +1,56 @@
+import numpy as np
+
+from engine import FRAME_TIME, SimulationEngine
+from scheduler import RenderScheduler, quantize
+from tracker import SunTracker
+
+
+def test_scheduler_backs_off_and_only_animates_without_changes():
+    scheduler = RenderScheduler(active_interval=16, idle_interval=250, animation_fps=10.0, idle_after=1.0)
+    drawn = []
+    for tick in range(300):
+        now = tick * 0.016
+        scheduler.observe(("unchanged",), now)
+        if scheduler.tick(now):
+            scheduler.frame_drawn(now)
+            drawn.append(now)
+
+    assert scheduler.interval == 250
+    assert len(drawn) <= 1 + 300 * 0.016 * 10  # The first frame, then the animation budget only
+    scheduler.observe(("changed",), 5.0)
+    assert scheduler.tick(5.0) and scheduler.interval == 16
+
+
+def test_quantize_ignores_noise_around_a_step_boundary():
+    noisy = 1.25 + np.array([0.01, -0.01, 0.02, -0.02, 0.01])
+    steps = None
+    seen = set()
+    for value in noisy:
+        steps = quantize([value], 0.5, steps)
+        seen.add(int(steps[0]))
+    assert len(seen) == 1
+    assert quantize([2.1], 0.5, steps)[0] == 4  # A whole step away does move it
+
+
+def test_live_scene_signature_goes_idle_once_the_bank_is_full():
+    # The clock, a tracker and the random battery load change the engine on every tick
+    engine = SimulationEngine(seed=0)
+    engine.clock_start = np.datetime64("2025-03-21T10:00")
+    engine.set_tracker(SunTracker("dual"))
+    for _ in range(int(120 / FRAME_TIME)):
+        engine.step(FRAME_TIME)
+
+    scheduler = RenderScheduler()
+    levels = None
+    changes = 0
+    for tick in range(int(30 / FRAME_TIME)):
+        engine.step(FRAME_TIME)
+        levels = quantize(engine.battery_bank.state_of_charge() * 100, 0.5, levels)
+        angles = quantize((engine.tilt_angle, engine.azimuth_angle, engine.sun_altitude, engine.sun_azimuth), 0.1)
+        state = (tuple(angles), tuple(levels))
+        changes += state != scheduler.last_state
+        scheduler.observe(state, tick * FRAME_TIME)
+        scheduler.tick(tick * FRAME_TIME)
+
+    assert changes <= 10
+    assert scheduler.interval == scheduler.idle_interval
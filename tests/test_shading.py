@@ -0,0 +1,42 @@
+import numpy as np
+
+import shading
+from engine import SimulationEngine
+from plant import PVPlant
+from shading import ShadingEngine
+from solar import get_sun_direction
+from tracker import SunTracker
+
+
+def _shaded_plant():
+    plant = PVPlant.grid(4, 5, row_pitch=2.0, tilt=30.0)
+    plant.shading = ShadingEngine.for_plant(plant)
+    return plant
+
+
+def test_tracker_step_with_unchanged_angles_keeps_bvh_and_masks(monkeypatch):
+    engine = SimulationEngine(seed=0)
+    engine.plant = _shaded_plant()
+    engine.tracker = SunTracker("dual")
+    engine.step()  # Turns the plant to the (fixed) sun once
+
+    builds = []
+    monkeypatch.setattr(shading.BVH, "__init__", lambda *args, **kwargs: builds.append(args))
+    bvh = engine.plant.shading.bvh
+    misses = engine.plant.shading.misses
+    engine.step()
+
+    assert builds == []
+    assert engine.plant.shading.bvh is bvh
+    assert engine.plant.shading.misses == misses
+
+
+def test_refitted_bvh_casts_like_a_rebuilt_one():
+    sun = get_sun_direction(25.0, 20.0)
+    turned = _shaded_plant()
+    turned.set_orientation(45.0, 10.0)
+    rebuilt = ShadingEngine.for_plant(turned)
+
+    assert turned.shading.bvh is not rebuilt.bvh
+    np.testing.assert_array_equal(turned.shading.cast(sun), rebuilt.cast(sun))
+    assert turned.shading.cast(sun).any()
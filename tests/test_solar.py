@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from solar import compute_sun_position, compute_sun_positions
+
+
+# (latitude, declination, solar time) -> (altitude, azimuth): azimuth 0 due south, positive towards east.
+# Off noon the azimuth follows cos(az) = (sin(alt) sin(lat) - sin(dec)) / (cos(alt) cos(lat)).
+@pytest.mark.parametrize("latitude, declination, time_of_day, altitude, azimuth", [
+    (40.0, 0.0, 12.0, 50.0, 0.0),  # Equinox noon
+    (40.0, -23.45, 12.0, 26.55, 0.0),  # Winter solstice noon
+    (0.0, 0.0, 9.0, 45.0, 90.0),  # Equator, equinox morning: due east
+    (40.0, 23.45, 9.0, 48.8277, 80.1929),
+    (40.0, 23.45, 15.0, 48.8277, -80.1929),  # Afternoon mirrors the morning towards west
+    (40.0, 23.45, 6.0, 14.8208, 108.3812),  # Summer sunrise side, north of due east
+])
+def test_known_sun_positions(latitude, declination, time_of_day, altitude, azimuth):
+    assert compute_sun_position(latitude, declination, time_of_day) == pytest.approx((altitude, azimuth), abs=1e-3)
+
+
+def test_noon_sun_stands_north_in_the_southern_hemisphere():
+    altitude, azimuth = compute_sun_position(-33.9, 23.45, 12.0)
+    assert altitude == pytest.approx(32.65)
+    assert abs(azimuth) == pytest.approx(180.0)
+
+
+def test_batched_positions_match_the_scalar_ones():
+    times = np.linspace(0.0, 24.0, 49)
+    altitude, azimuth = compute_sun_positions(40.0, 10.0, times)
+
+    expected = np.array([compute_sun_position(40.0, 10.0, t) for t in times]).T
+    np.testing.assert_allclose(altitude, expected[0])
+    np.testing.assert_allclose(azimuth, expected[1])
+    assert np.all(azimuth[altitude <= 0] == 0.0)  # Below the horizon
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("OpenGL", "simulation", "tkinter")
+
+
+def _loaded_after(code):
+    # Heavy modules a fresh interpreter has loaded after running code
+    check = f"import sys\n{code}\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True)
+    return result.returncode, result.stdout.split(), result.stderr
+
+
+@pytest.mark.parametrize("module", ["engine", "energy_yield", "ensemble", "optimizer", "plant", "recorder"])
+def test_physics_modules_load_no_gui_or_gl(module):
+    returncode, loaded, stderr = _loaded_after(f"import {module}")
+
+    assert returncode == 0, stderr
+    assert loaded == []
+
+
+def test_control_panel_window_loads_neither_gl_nor_the_engine():
+    returncode, loaded, stderr = _loaded_after(
+        "import controls\ncontrols.root.update_idletasks()\nassert controls.engine is None\ncontrols.root.destroy()")
+    if returncode and "TclError" in stderr:
+        pytest.skip("no display for Tk")
+
+    assert returncode == 0, stderr
+    assert loaded == ["tkinter"]
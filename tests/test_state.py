@@ -0,0 +1,158 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from engine import SimulationEngine
+from state import RENDERER_RUNNING, SCALAR_FIELDS, SharedStateExchange, StateExchange, snapshot_from_frame
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+BATTERIES = 100_000  # Large frames take long enough to copy that an unguarded reader tears them
+
+
+def _frame(value):
+    # Every scalar and every battery of one frame carry the same value, so a torn frame shows up as a mix
+    return [value] * len(SCALAR_FIELDS), np.full(BATTERIES, value)
+
+
+def _publish_until(exchange, stop):
+    value = 0
+    while not stop.is_set():
+        value += 1
+        exchange.publish_frame(*_frame(value))
+
+
+def _assert_whole(snapshot):
+    assert snapshot.p_out == snapshot.time == snapshot.steps
+    assert np.all(snapshot.battery_soc == snapshot.time)
+
+
+def test_reader_never_sees_a_torn_frame():
+    exchange = StateExchange(snapshot_from_frame(np.zeros(len(SCALAR_FIELDS) + BATTERIES)))
+    stop = threading.Event()
+    writer = threading.Thread(target=_publish_until, args=(exchange, stop))
+    writer.start()
+    try:
+        seen = set()
+        deadline = time.perf_counter() + 0.5
+        while time.perf_counter() < deadline:
+            snapshot = exchange.latest()
+            _assert_whole(snapshot)
+            seen.add(snapshot.steps)
+    finally:
+        stop.set()
+        writer.join()
+    assert len(seen) > 1  # The reader did race the writer
+
+
+def test_latest_reuses_the_snapshot_until_the_next_publish():
+    engine = SimulationEngine(seed=0)
+    exchange = StateExchange(engine.snapshot())
+
+    first = exchange.latest()
+    assert exchange.latest() is first
+    assert not first.battery_soc.flags.writeable
+
+    engine.step()
+    exchange.publish(engine.snapshot())
+    assert exchange.latest() is not first
+    assert exchange.latest().steps == 1
+
+
+def test_controls_coalesce_and_apply_between_steps():
+    exchange = StateExchange(SimulationEngine(seed=0).snapshot())
+    for tilt in (10.0, 20.0, 30.0):
+        exchange.submit("tilt_angle", tilt)
+    exchange.submit("battery_enabled", False)
+    target = types.SimpleNamespace()
+
+    assert exchange.apply_controls(target) == 2
+    assert (target.tilt_angle, target.battery_enabled) == (30.0, False)
+    assert exchange.apply_controls(target) == 0
+    with pytest.raises(ValueError):
+        exchange.submit("time", 0.0)
+
+
+def _publish_from_renderer(name):
+    # Renderer process side: attach by name and publish until the panel asks to stop
+    exchange = SharedStateExchange.attach(name)
+    exchange.set_status(RENDERER_RUNNING)
+    value = 0
+    while not exchange.stop_requested():
+        value += 1
+        exchange.publish_frame(*_frame(value))
+    exchange.close()
+
+
+def _attach(name):
+    SharedStateExchange.attach(name).close()
+
+
+def _in_process(function, name):
+    # Its own interpreter, like the renderer process, so it has its own shared-memory resource tracker
+    path = os.pathsep.join((TESTS, os.path.dirname(TESTS)))
+    return subprocess.Popen([sys.executable, "-c", f"import test_state; test_state.{function}({name!r})"],
+                            env=dict(os.environ, PYTHONPATH=path))
+
+
+def _empty_snapshot():
+    return snapshot_from_frame(np.zeros(len(SCALAR_FIELDS) + BATTERIES))
+
+
+def test_other_process_never_sees_a_torn_frame():
+    exchange = SharedStateExchange.create(_empty_snapshot())
+    exchange.latest()  # Held while the writer keeps every read from settling
+    renderer = _in_process("_publish_from_renderer", exchange.name)
+    try:
+        deadline = time.perf_counter() + 10
+        while exchange.status() != RENDERER_RUNNING and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        seen = set()
+        deadline = time.perf_counter() + 0.5
+        while time.perf_counter() < deadline:
+            snapshot = exchange.latest()
+            _assert_whole(snapshot)
+            seen.add(snapshot.steps)
+    finally:
+        exchange.request_stop()
+        returncode = renderer.wait(10)
+        exchange.close()
+    assert returncode == 0
+    assert len(seen) > 1
+
+
+def test_shared_controls_apply_once_with_the_newest_value():
+    panel = SharedStateExchange.create(SimulationEngine(seed=0).snapshot())
+    renderer = SharedStateExchange(panel.shm)  # A second view of the block, as the renderer process has
+    try:
+        panel.submit("tilt_angle", 10.0)
+        panel.submit("tilt_angle", 35.0)
+        panel.submit("battery_enabled", False)
+        target = types.SimpleNamespace()
+
+        assert renderer.apply_controls(target) == 2
+        assert (target.tilt_angle, target.battery_enabled) == (35.0, False)
+        assert renderer.apply_controls(target) == 0
+        panel.submit("sun_pos_x", 3.0)
+        assert renderer.apply_controls(target) == 1 and target.sun_pos_x == 3.0
+    finally:
+        panel.close()
+
+
+def test_attaching_repairs_a_frame_left_mid_publish():
+    exchange = SharedStateExchange.create(_empty_snapshot())
+    try:
+        exchange.publish_frame(*_frame(7))
+        exchange._header[2] += 1  # A renderer killed between the two sequence increments
+        assert exchange.latest() is None  # Nothing whole to read yet
+
+        assert _in_process("_attach", exchange.name).wait(10) == 0
+        _assert_whole(exchange.latest())
+        assert exchange.latest().steps == 7
+    finally:
+        exchange.close()
@@ -0,0 +1,48 @@
+from engine import SimulationEngine
+from telemetry import TelemetryPublisher
+
+
+def test_samples_are_queued_at_most_once_per_interval():
+    telemetry = TelemetryPublisher(rate_hz=10.0)
+    offered = [telemetry.offer(i, now=i * 0.03) for i in range(10)]  # 0.27 s of offers
+
+    assert offered == [True, False, False, False, True, False, False, False, True, False]
+    assert telemetry.drain() == [0, 4, 8]  # The interval restarts from each queued sample
+    assert telemetry.drain() == []
+    assert telemetry.due(now=0.35) and not telemetry.due(now=0.33)
+
+
+def test_a_slow_consumer_only_loses_the_oldest_samples():
+    telemetry = TelemetryPublisher(rate_hz=1.0, maxlen=3)
+    for i in range(5):
+        telemetry.offer(i, now=float(i))
+
+    assert telemetry.drain() == [2, 3, 4]
+    assert telemetry.published == 5
+
+
+def test_rate_zero_turns_publishing_off():
+    telemetry = TelemetryPublisher(rate_hz=5.0)
+    telemetry.set_rate(0.0)
+
+    assert not telemetry.due(now=1e9)
+    assert not telemetry.offer("sample", now=1e9)
+    assert telemetry.drain() == []
+
+
+def test_engine_only_builds_snapshots_when_telemetry_is_due(monkeypatch):
+    engine = SimulationEngine(seed=0)
+    built = []
+    snapshot = engine.snapshot
+    monkeypatch.setattr(engine, "snapshot", lambda: built.append(engine.steps) or snapshot())
+
+    for _ in range(10):
+        engine.step()
+    assert built == []  # Off until a GUI sets a rate
+
+    engine.telemetry.set_rate(1e9)  # Due on every step
+    for _ in range(3):
+        engine.step()
+    samples = engine.telemetry.drain()
+    assert built == [11, 12, 13]
+    assert [sample.steps for sample in samples] == [11, 12, 13]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from engine import SimulationEngine
+from ephemeris import Site, sun_positions
+from solar import get_sun_directions
+from tracker import SunTracker, limit_slew, slew_series
+
+
+def _stepwise(tracker, suns, seconds, tilt=0.0, azimuth=0.0):
+    # Reference: the live engine's recurrence, one sample at a time
+    angles = []
+    for sun in suns:
+        tilt, azimuth = tracker.step(sun, seconds, tilt, azimuth)
+        angles.append((tilt, azimuth))
+    return np.array(angles).T
+
+
+def test_slew_limited_series_matches_stepwise_tracking():
+    times = np.arange("2025-06-21T00:00", "2025-06-23T00:00", 7, dtype="datetime64[m]")
+    suns = get_sun_directions(*sun_positions(Site(40.0, 0.0, 0.0), times))
+    tracker = SunTracker("dual", slew_rate=0.01)
+
+    tilt, azimuth = tracker.series(suns, 420.0, tilt=10.0, azimuth=-20.0)
+    expected = _stepwise(tracker, suns, 420.0, 10.0, -20.0)
+
+    np.testing.assert_allclose(tilt, expected[0], atol=1e-9)
+    np.testing.assert_allclose(azimuth, expected[1], atol=1e-9)
+    assert np.any(np.abs(tilt - tracker.targets(suns)[0]) > 1.0)  # The limit did bind
+
+
+def test_slew_limited_series_per_panel_and_per_sample_seconds():
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(-90, 90, (200, 3))
+    seconds = rng.uniform(0.5, 2.0, 200)
+    tracker = SunTracker("dual", slew_rate=5.0)
+    expected, current = np.empty_like(targets), np.zeros(3)
+    for i in range(len(targets)):
+        current = limit_slew(targets[i], current, tracker.slew_rate * seconds[i])
+        expected[i] = current
+
+    np.testing.assert_allclose(slew_series(targets, np.zeros(3), tracker.slew_rate * seconds),
+                               expected, atol=1e-9)
+
+
+def test_single_axis_azimuth_stays_on_the_axis():
+    times = np.arange("2025-06-21T04:00", "2025-06-21T20:00", 10, dtype="datetime64[m]")
+    suns = get_sun_directions(*sun_positions(Site(40.0, 0.0, 0.0), times))
+    tracker = SunTracker("single", slew_rate=0.01)
+
+    tilt, azimuth = tracker.series(suns, 600.0, tilt=0.0, azimuth=0.0)
+    np.testing.assert_array_equal(azimuth, 90.0)
+    assert tracker.step(suns[40], 1.0, 0.0, 0.0)[1] == 90.0
+
+    engine = SimulationEngine()
+    engine.clock_start = times[0]
+    engine.set_tracker(tracker)
+    assert engine.azimuth_angle == 90.0
+    for _ in range(10):
+        engine.step(1.0)
+    assert engine.azimuth_angle == 90.0
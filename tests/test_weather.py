@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from weather import TMY_YEAR, WeatherData
+
+TMY3_COLUMNS = "Date (MM/DD/YYYY),Time (HH:MM),GHI (W/m^2),DNI (W/m^2),DHI (W/m^2),Dry-bulb (C)"
+
+
+def write_tmy3(path, rows):
+    lines = ["724666,DENVER CENTENNIAL,CO,-7.0,39.570,-104.850,1793", TMY3_COLUMNS]
+    lines += [",".join(map(str, row)) for row in rows]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def mixed_year_tmy3(tmp_path):
+    # Like a real typical-year file: January from 1988, June from 2003, December from 1995
+    return write_tmy3(tmp_path / "mixed_TYA.CSV", [
+        ("01/01/1988", "01:00", 0, 0, 0, -5.0),
+        ("01/01/1988", "02:00", 0, 0, 0, -6.0),
+        ("06/21/2003", "12:00", 900, 800, 100, 25.0),
+        ("06/21/2003", "13:00", 700, 600, 100, 27.0),
+        ("12/31/1995", "23:00", 0, 0, 0, -3.0),
+        ("12/31/1995", "24:00", 0, 0, 0, -4.0),
+    ])
+
+
+def test_tmy3_rows_are_moved_to_one_nominal_year(mixed_year_tmy3):
+    weather = WeatherData(mixed_year_tmy3)
+
+    times = weather.times
+    assert np.all(np.diff(times) > np.timedelta64(0, "s"))
+    assert times[0] == np.datetime64(f"{TMY_YEAR}-01-01T01:00")
+    assert times[-1] == np.datetime64(f"{TMY_YEAR + 1}-01-01T00:00")  # 24:00 ends the last day
+    assert weather.site.utc_offset == -7.0
+
+
+def test_tmy3_conditions_interpolate_within_the_nominal_year(mixed_year_tmy3):
+    weather = WeatherData(mixed_year_tmy3)
+
+    ghi, dni, dhi, temp_air = weather.conditions_at(f"{TMY_YEAR}-06-21T12:30")
+    assert (ghi, dni, dhi) == pytest.approx((800.0, 700.0, 100.0))
+    assert temp_air == pytest.approx(26.0)
+
+
+def test_cache_with_source_years_is_converted_again(mixed_year_tmy3):
+    WeatherData(mixed_year_tmy3)
+    header = mixed_year_tmy3 + ".cache/header.json"
+    with open(header) as f:
+        text = f.read()
+    with open(header, "w") as f:
+        f.write(text.replace('"layout"', '"old_layout"'))
+
+    assert WeatherData(mixed_year_tmy3).times[0] == np.datetime64(f"{TMY_YEAR}-01-01T01:00")
+
+
+def test_conditions_series_matches_conditions_at(mixed_year_tmy3):
+    weather = WeatherData(mixed_year_tmy3)
+    times = np.arange(f"{TMY_YEAR - 1}-12-31T23:00", f"{TMY_YEAR + 1}-01-01T02:00", 17, dtype="datetime64[m]")
+
+    series = np.array(weather.conditions_series(times))
+    expected = np.array([weather.conditions_at(when) for when in times]).T
+    np.testing.assert_allclose(series, expected, equal_nan=True)
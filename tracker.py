@@ -0,0 +1,202 @@
+import argparse
+import time
+
+import numpy as np
+
+TRACKER_MODES = ("single", "dual")
+MAX_ANGLE = 90.0  # Tilt and azimuth limit, the range of the control panel sliders
+GROUND_COVERAGE_RATIO = 0.4  # Panel width across the axis / distance between tracker rows
+
+
+def dual_axis_angles(sun_directions, max_angle=MAX_ANGLE):
+    """(tilt, azimuth) in degrees that point the panel normal straight at the sun; flat at night.
+
+    With azimuths limited to ±90°, a sun behind the panel's reach (north of the east-west line)
+    is followed with a negative tilt and the azimuth turned by 180°, which is the same normal.
+    """
+    sun = np.asarray(sun_directions, dtype=float)
+    up = sun[..., 1] > 0
+    tilt = np.degrees(np.arccos(np.clip(sun[..., 1], -1.0, 1.0)))
+    azimuth = np.degrees(np.arctan2(sun[..., 0], sun[..., 2]))
+    behind = np.abs(azimuth) > 90.0
+    azimuth = np.where(behind, azimuth - np.copysign(180.0, azimuth), azimuth)
+    tilt = np.where(behind, -tilt, tilt)
+    return (np.where(up, np.clip(tilt, -max_angle, max_angle), 0.0),
+            np.where(up, np.clip(azimuth, -max_angle, max_angle), 0.0))
+
+
+def single_axis_angles(sun_directions, azimuth=90.0, gcr=None, max_angle=MAX_ANGLE):
+    """(tilt, azimuth) in degrees of a panel turning about one horizontal axis; flat at night.
+
+    The axis is perpendicular to `azimuth` (the default 90° is a north-south axis turning east to
+    west), so the tilt is the rotation angle: the sun's elevation in the plane the panel turns in.
+    With `gcr` (ground coverage ratio of the rows) the rotation backtracks at low sun so that no
+    row shades the next one.
+    """
+    sun = np.asarray(sun_directions, dtype=float)
+    up = sun[..., 1] > 0
+    a = np.radians(azimuth)
+    across = sun[..., 0] * np.sin(a) + sun[..., 2] * np.cos(a)
+    rotation = np.degrees(np.arctan2(across, np.maximum(sun[..., 1], 0.0)))
+
+    if gcr is not None:
+        # Turn back towards flat until the shadow of each row just reaches the foot of the next one
+        # (the usual closed form for rows on level ground)
+        reach = np.abs(np.cos(np.radians(rotation))) / gcr
+        correction = np.degrees(np.arccos(np.minimum(reach, 1.0)))
+        rotation = rotation - np.sign(rotation) * correction
+
+    tilt = np.where(up, np.clip(rotation, -max_angle, max_angle), 0.0)
+    return tilt, np.broadcast_to(float(azimuth), tilt.shape).copy()
+
+
+def limit_slew(target, current, max_step):
+    # Moves current towards target by at most max_step (degrees, may be an array)
+    return current + np.clip(np.subtract(target, current), -max_step, max_step)
+
+
+def slew_series(targets, start, max_step):
+    """limit_slew applied sample after sample along the first axis, from `start`; max_step is per sample.
+
+    The motor either follows the targets exactly or turns at full speed towards them, so the series
+    splits into segments: followed stretches are copies of the targets, up to the next step larger
+    than the motor's, and slewing stretches are cumulative sums of max_step, up to where they catch
+    up with or overshoot the target. Python only loops over those segments; each end is found in
+    windows doubling in size, so the cost stays proportional to the segment lengths.
+    """
+    targets = np.asarray(targets, dtype=float)
+    if targets.ndim > 1:
+        # Columns (e.g. panels) slew independently
+        columns = targets.reshape(len(targets), -1)
+        starts = np.broadcast_to(start, columns.shape[1:])
+        angles = np.stack([slew_series(column, s, max_step) for column, s in zip(columns.T, starts)], axis=1)
+        return angles.reshape(targets.shape)
+
+    count = len(targets)
+    max_step = np.broadcast_to(np.asarray(max_step, dtype=float).ravel(), count)
+    reach = np.concatenate(([0.0], np.cumsum(max_step)))  # Total turn possible before each sample
+    jumps = np.flatnonzero(np.abs(np.diff(targets, prepend=targets[:1])) > max_step)
+    angles = np.empty(count)
+    current = float(start)
+    i = 0
+    while i < count:
+        if abs(targets[i] - current) <= max_step[i]:
+            # Following: the targets themselves until the next step the motor cannot make
+            end = jumps[np.searchsorted(jumps, i, side="right")] if jumps.size and jumps[-1] > i else count
+            angles[i:end] = targets[i:end]
+            current = targets[end - 1]
+            i = end
+            continue
+
+        # Slewing at full speed until the ramp reaches (or passes) the target
+        sign = 1.0 if targets[i] > current else -1.0
+        end, lo, width = count, i, 64
+        while lo < count:
+            hi = min(lo + width, count)
+            ramp = current + sign * (reach[lo + 1:hi + 1] - reach[i])
+            done = np.flatnonzero(sign * (targets[lo:hi] - ramp) <= 0)
+            if done.size:
+                end = lo + int(done[0])
+                break
+            lo, width = hi, width * 2
+        angles[i:end] = current + sign * (reach[i + 1:end + 1] - reach[i])
+        current = angles[end - 1]
+        i = end
+    return angles
+
+
+class SunTracker:
+    """Orientation control that follows the sun instead of the sliders.
+
+    targets() is the closed-form orientation for any array of sun directions; step() and series()
+    add the motor: from the current angles the panel turns at most slew_rate degrees per second
+    (None for an unlimited motor). A single-axis tracker only turns its tilt; its azimuth is the
+    fixed facing of the axis. Everything broadcasts, so the same law drives a single panel,
+    every panel of a plant at once, or a whole time series.
+    """
+
+    def __init__(self, mode="single", azimuth=90.0, backtracking=False, gcr=GROUND_COVERAGE_RATIO,
+                 slew_rate=None, max_angle=MAX_ANGLE):
+        if mode not in TRACKER_MODES:
+            raise ValueError(f"Unknown tracker mode {mode!r}, expected one of {', '.join(TRACKER_MODES)}")
+        if backtracking and mode != "single":
+            raise ValueError("Backtracking needs rows of single-axis trackers")
+        self.mode = mode
+        self.azimuth = azimuth  # Facing of a positive single-axis rotation
+        self.backtracking = backtracking
+        self.gcr = gcr
+        self.slew_rate = slew_rate  # Degrees per second
+        self.max_angle = max_angle
+
+    def targets(self, sun_directions):
+        """(tilt, azimuth) the tracker heads for, without the motor limit."""
+        if self.mode == "dual":
+            return dual_axis_angles(sun_directions, self.max_angle)
+        gcr = self.gcr if self.backtracking else None
+        return single_axis_angles(sun_directions, self.azimuth, gcr, self.max_angle)
+
+    def step(self, sun_direction, dt, tilt, azimuth):
+        """Next (tilt, azimuth) from the current angles after dt seconds of turning."""
+        target_tilt, target_azimuth = self.targets(sun_direction)
+        if self.slew_rate is not None:
+            target_tilt = limit_slew(target_tilt, tilt, self.slew_rate * dt)
+            if self.mode == "dual":  # A single-axis azimuth is the fixed facing of the axis
+                target_azimuth = limit_slew(target_azimuth, azimuth, self.slew_rate * dt)
+        if np.ndim(target_tilt) == 0:
+            return float(target_tilt), float(target_azimuth)
+        return target_tilt, target_azimuth
+
+    def series(self, sun_directions, seconds, tilt=0.0, azimuth=0.0):
+        """(tilt, azimuth) arrays for a time series of sun directions along the first axis.
+
+        seconds is the time the motor has to reach each sample (scalar or per sample); tilt/azimuth
+        are the angles before the first sample. The motor limit is a recurrence over time, solved
+        segment by segment (see slew_series) only when the unlimited targets would outrun the motor.
+        """
+        target_tilt, target_azimuth = self.targets(sun_directions)
+        if self.slew_rate is None or len(target_tilt) == 0:
+            return target_tilt, target_azimuth
+
+        max_step = np.broadcast_to(self.slew_rate * np.asarray(seconds, dtype=float), len(target_tilt))
+        limited = []
+        slewed = ((target_tilt, tilt), (target_azimuth, azimuth)) if self.mode == "dual" else ((target_tilt, tilt),)
+        for targets, start in slewed:
+            steps = np.abs(np.diff(targets, axis=0, prepend=np.asarray(start, dtype=float)[None]))
+            if np.all(steps <= max_step.reshape((-1,) + (1,) * (targets.ndim - 1))):
+                limited.append(targets)
+            else:
+                limited.append(slew_series(targets, start, max_step))
+        if self.mode == "single":
+            limited.append(target_azimuth)
+        return tuple(limited)
+
+
+if __name__ == "__main__":
+    from energy_yield import simulate_yield
+
+    parser = argparse.ArgumentParser(description="Annual clear-sky yield of sun trackers against a fixed panel.")
+    parser.add_argument("--latitude", type=float, default=40.0)
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end", default="2026-01-01")
+    parser.add_argument("--step", type=float, default=60, help="Time step in minutes")
+    parser.add_argument("--tilt", type=float, default=30.0, help="Tilt of the fixed panel")
+    parser.add_argument("--gcr", type=float, default=GROUND_COVERAGE_RATIO,
+                        help="Ground coverage ratio of the rows, for backtracking")
+    parser.add_argument("--slew-rate", type=float, default=None, help="Motor limit in degrees per second")
+    args = parser.parse_args()
+
+    runs = (
+        ("Fixed", None),
+        ("Single-axis", SunTracker("single", slew_rate=args.slew_rate)),
+        ("Single-axis, backtracking",
+         SunTracker("single", backtracking=True, gcr=args.gcr, slew_rate=args.slew_rate)),
+        ("Dual-axis", SunTracker("dual", slew_rate=args.slew_rate)),
+    )
+    fixed_energy = None
+    for name, tracker in runs:
+        started = time.perf_counter()
+        result = simulate_yield(args.latitude, args.start, args.end, args.step, tilt=args.tilt, tracker=tracker)
+        elapsed = time.perf_counter() - started
+        fixed_energy = fixed_energy or result.total_energy
+        print(f"{name}: {result.total_energy / 1000:.1f} kWh ({result.total_energy / fixed_energy * 100 - 100:+.1f}%) "
+              f"in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,276 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from ephemeris import Site
+from recorder import FORMAT_VERSION, HEADER_FILE, Recording
+
+CHUNK_ROWS = 65536  # Rows parsed and handed out per chunk
+CACHE_SUFFIX = ".cache"  # The converted columns live in <source>.cache/ next to the source
+
+# Converted channels: name, dtype. Irradiance in W/m², temperature in °C, wind in m/s
+CHANNELS = (
+    ("time", "<M8[s]"),
+    ("ghi", "<f4"),
+    ("dni", "<f4"),
+    ("dhi", "<f4"),
+    ("temp_air", "<f4"),
+    ("wind_speed", "<f4"),
+)
+REQUIRED_CHANNELS = ("ghi", "dni", "dhi")
+
+# Accepted source column names (compared lower-case) for each channel
+COLUMN_ALIASES = {
+    "time": ("time", "timestamp", "datetime", "date_time", "date"),
+    "ghi": ("ghi", "ghi (w/m^2)", "global_horizontal", "global horizontal irradiance"),
+    "dni": ("dni", "dni (w/m^2)", "direct_normal", "direct normal irradiance"),
+    "dhi": ("dhi", "dhi (w/m^2)", "diffuse_horizontal", "diffuse horizontal irradiance"),
+    "temp_air": ("temp_air", "temperature", "temp", "air_temperature", "dry-bulb (c)", "t2m"),
+    "wind_speed": ("wind_speed", "wind speed", "wspd (m/s)", "ws10m"),
+}
+TMY3_DATE = "date (mm/dd/yyyy)"
+TMY3_TIME = "time (hh:mm)"
+TMY_YEAR = 2025  # Typical-year files pick each month from a different year; all rows are put in this one
+CACHE_LAYOUT = 2  # Bumped when converted columns change meaning (2: TMY3 rows moved to TMY_YEAR)
+
+
+def cache_path(source):
+    return source + CACHE_SUFFIX
+
+
+def _source_stamp(source):
+    stat = os.stat(source)
+    return {"path": os.path.abspath(source), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_header(f):
+    """Column names and, for TMY3 files, the site from the metadata line above them."""
+    reader = csv.reader(f)
+    first = next(reader)
+    if len(first) >= 7 and not any(name.strip().lower() in COLUMN_ALIASES["ghi"] for name in first):
+        # TMY3: USAF, name, state, time zone, latitude, longitude, elevation; column names follow
+        site = Site(float(first[4]), float(first[5]), float(first[3]))
+        return next(reader), site
+    return first, None
+
+
+def _column_indices(names):
+    lower = [name.strip().lower() for name in names]
+    indices = {}
+    for channel, aliases in COLUMN_ALIASES.items():
+        indices[channel] = next((lower.index(alias) for alias in aliases if alias in lower), None)
+    if TMY3_DATE in lower and TMY3_TIME in lower:
+        indices["time"] = (lower.index(TMY3_DATE), lower.index(TMY3_TIME))
+
+    missing = [channel for channel in ("time",) + REQUIRED_CHANNELS if indices[channel] is None]
+    if missing:
+        raise ValueError(f"Weather file has no column for {', '.join(missing)} (columns: {', '.join(names)})")
+    return indices
+
+
+def _nan_if_empty(value):
+    value = value.strip()
+    return float(value) if value else np.nan
+
+
+def _parse_floats(lines, columns):
+    # NumPy's C parser; empty cells (missing values) fall back to a per-cell converter for this chunk
+    try:
+        return np.loadtxt(lines, dtype=np.float32, delimiter=",", quotechar='"', usecols=columns, ndmin=2)
+    except ValueError:
+        return np.loadtxt(lines, dtype=np.float32, delimiter=",", quotechar='"', usecols=columns, ndmin=2,
+                          converters=_nan_if_empty)
+
+
+def _parse_times(lines, index):
+    if isinstance(index, tuple):
+        # TMY3 local standard time: MM/DD/YYYY plus HH:MM, where 24:00 ends the day. The months come
+        # from different source years, so the year is replaced to keep the rows in calendar order
+        fields = np.loadtxt(lines, dtype=str, delimiter=",", quotechar='"', usecols=index, ndmin=2)
+        dates = [f"{TMY_YEAR:04d}-{d[0:2]}-{d[3:5]}" for d in fields[:, 0]]
+        clock = [t.split(":") for t in fields[:, 1]]
+        seconds = np.array([int(h) * 3600 + int(m) * 60 for h, m in clock], dtype="timedelta64[s]")
+        return np.array(dates, dtype="datetime64[D]") + seconds
+    return np.loadtxt(lines, dtype="datetime64[s]", delimiter=",", quotechar='"', usecols=index)
+
+
+def parse_chunks(source, chunk_rows=CHUNK_ROWS):
+    """Yields {channel: array} for successive blocks of rows of a CSV/TMY3 file, never the whole file."""
+    with open(source, newline="") as f:
+        names, _ = _read_header(f)
+        indices = _column_indices(names)
+        present = [channel for channel, _ in CHANNELS[1:] if indices[channel] is not None]
+        while True:
+            lines = [line for line in itertools.islice(f, chunk_rows) if line.strip()]
+            if not lines:
+                return
+            chunk = {"time": _parse_times(lines, indices["time"])}
+            values = _parse_floats(lines, [indices[channel] for channel in present])
+            for channel, _ in CHANNELS[1:]:
+                chunk[channel] = (values[:, present.index(channel)] if channel in present
+                                  else np.full(len(lines), np.nan, dtype=np.float32))
+            yield chunk
+
+
+def convert(source, target=None, chunk_rows=CHUNK_ROWS):
+    """Converts a weather file into memory-mappable column files, one chunk at a time."""
+    target = target or cache_path(source)
+    with open(source, newline="") as f:
+        _, site = _read_header(f)
+
+    # Build into a temporary directory so an interrupted conversion never looks like a valid cache
+    building = target + ".tmp"
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+    files = {name: open(os.path.join(building, f"{name}.bin"), "wb") for name, _ in CHANNELS}
+    rows = 0
+    last_time = None
+    try:
+        for chunk in parse_chunks(source, chunk_rows):
+            times = chunk["time"]
+            if np.any(times[1:] < times[:-1]) or (last_time is not None and times[0] < last_time):
+                raise ValueError(f"Timestamps in {source} are not in ascending order")
+            last_time = times[-1]
+            for name, dtype in CHANNELS:
+                chunk[name].astype(dtype, copy=False).tofile(files[name])
+            rows += len(times)
+    finally:
+        for f in files.values():
+            f.close()
+
+    header = {
+        "version": FORMAT_VERSION,
+        "layout": CACHE_LAYOUT,
+        "rows": rows,
+        "channels": {name: {"dtype": np.dtype(dtype).str, "shape": []} for name, dtype in CHANNELS},
+        "source": _source_stamp(source),
+        "site": site._asdict() if site is not None else None,
+    }
+    with open(os.path.join(building, HEADER_FILE), "w") as f:
+        json.dump(header, f, indent=2)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(building, target)
+    return target
+
+
+def _cache_is_current(source, target):
+    try:
+        with open(os.path.join(target, HEADER_FILE)) as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return False
+    stamp = _source_stamp(source)
+    cached = header.get("source") or {}
+    return (header.get("version") == FORMAT_VERSION and header.get("layout") == CACHE_LAYOUT and
+            cached.get("size") == stamp["size"] and cached.get("mtime_ns") == stamp["mtime_ns"])
+
+
+class WeatherData:
+    """Measured weather as memory-mapped columns, converted from a CSV/TMY3 file on first use.
+
+    Later opens of the same (unchanged) source map the cached columns directly, so nothing is parsed
+    or loaded up front; chunks() and conditions_at() only touch the rows they need.
+    """
+
+    def __init__(self, source, chunk_rows=CHUNK_ROWS, rebuild=False):
+        self.source = source
+        if os.path.isdir(source):
+            target = source  # Already a converted cache
+        else:
+            target = cache_path(source)
+            if rebuild or not _cache_is_current(source, target):
+                convert(source, target, chunk_rows)
+
+        self.recording = Recording(target)
+        with open(os.path.join(target, HEADER_FILE)) as f:
+            site = json.load(f).get("site")
+        self.site = Site(**site) if site else None
+        self.chunk_rows = chunk_rows
+        self.times = self.recording["time"]
+        self._row = 0  # Last row looked up, so a clock moving forward rarely needs a search
+
+    def __len__(self):
+        return len(self.recording)
+
+    def __getitem__(self, name):
+        return self.recording[name]
+
+    def chunks(self, start=None, end=None, rows=None):
+        # (first row, {channel: memmap slice}) blocks between the local times start (inclusive) and end (exclusive)
+        first = 0 if start is None else int(np.searchsorted(self.times, np.datetime64(start, "s")))
+        last = len(self) if end is None else int(np.searchsorted(self.times, np.datetime64(end, "s")))
+        rows = rows or self.chunk_rows
+        for i in range(first, last, rows):
+            j = min(i + rows, last)
+            yield i, {name: self.recording[name][i:j] for name, _ in CHANNELS}
+
+    def row_at(self, when):
+        # Last row at or before `when`
+        when = np.datetime64(when, "s")
+        row = self._row
+        times = self.times
+        if not (times[row] <= when and (row + 1 == len(times) or when < times[row + 1])):
+            row = max(int(np.searchsorted(times, when, side="right")) - 1, 0)
+        self._row = row
+        return row
+
+    def conditions_at(self, when):
+        """(ghi, dni, dhi, temp_air) at a local time, linear between samples; missing irradiance is 0."""
+        when = np.datetime64(when, "us")
+        row = self.row_at(when)
+        fraction = 0.0
+        if row + 1 < len(self):
+            span = (self.times[row + 1] - self.times[row]) / np.timedelta64(1, "s")
+            fraction = min(max(((when - self.times[row]) / np.timedelta64(1, "s")) / span, 0.0), 1.0)
+
+        def value(name):
+            column = self.recording[name]
+            a = float(column[row])
+            b = float(column[row + 1]) if fraction > 0 else a
+            return a + (b - a) * fraction
+
+        ghi, dni, dhi = (np.nan_to_num(value(name)) for name in REQUIRED_CHANNELS)
+        return float(ghi), float(dni), float(dhi), float(value("temp_air"))
+
+    def conditions_series(self, times):
+        """Array version of conditions_at: (ghi, dni, dhi, temp_air) arrays for an array of local times."""
+        times = np.asarray(times, dtype="datetime64[us]")
+        rows = np.maximum(np.searchsorted(self.times, times.astype("datetime64[s]"), side="right") - 1, 0)
+        following = np.minimum(rows + 1, len(self) - 1)
+        span = (self.times[following] - self.times[rows]) / np.timedelta64(1, "s")
+        elapsed = (times - self.times[rows]) / np.timedelta64(1, "s")
+        fraction = np.clip(np.divide(elapsed, span, out=np.zeros(len(times)), where=following > rows), 0.0, 1.0)
+
+        def value(name):
+            # Fancy indexing reads only the rows needed from the memory map
+            column = self.recording[name]
+            a = column[rows].astype(float)
+            b = np.where(fraction > 0, column[following], a)
+            return a + (b - a) * fraction
+
+        ghi, dni, dhi = (np.nan_to_num(value(name)) for name in REQUIRED_CHANNELS)
+        return ghi, dni, dhi, value("temp_air")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CSV/TMY3 weather file into its memory-mapped cache.")
+    parser.add_argument("source")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--rebuild", action="store_true", help="Convert even if the cache is current")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    weather = WeatherData(args.source, args.chunk_rows, args.rebuild)
+    elapsed = time.perf_counter() - started
+
+    print(f"Rows: {len(weather)} from {weather.times[0]} to {weather.times[-1]} in {elapsed:.2f} s")
+    if weather.site is not None:
+        print(f"Site: {weather.site.latitude}°, {weather.site.longitude}°, UTC{weather.site.utc_offset:+g}")
+    print(f"Cache: {weather.recording.path}")